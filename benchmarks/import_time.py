@@ -0,0 +1,58 @@
+"""Benchmark of the time taken by `import crux`.
+
+Each import runs in a new interpreter, so that nothing is imported already.
+The best time of the runs is kept. With --max-ms, the exit status is 1 when
+the import is slower than that.
+
+Usage:
+    PYTHONPATH=. python benchmarks/import_time.py
+    PYTHONPATH=. python benchmarks/import_time.py --max-ms 50
+"""
+
+from __future__ import division, print_function
+
+import argparse
+import subprocess
+import sys
+
+# Measured in the new interpreter, around the import only, so that the
+# interpreter start up isn't counted.
+IMPORT_CODE = """
+import sys, timeit
+start = timeit.default_timer()
+import crux
+print((timeit.default_timer() - start) * 1000, len(sys.modules))
+"""
+
+
+def measure(repeat):
+    """Returns the best time of `import crux` in ms, and the modules loaded then."""
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", IMPORT_CODE])
+        elapsed, modules = output.decode().split()
+        runs.append((float(elapsed), int(modules)))
+    return min(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="Imports measured, the best is kept"
+    )
+    parser.add_argument(
+        "--max-ms", type=float, default=None, help="Slowest import allowed, in ms"
+    )
+    args = parser.parse_args()
+
+    elapsed, modules = measure(args.repeat)
+    print("import crux: {:.1f} ms, {} modules loaded".format(elapsed, modules))
+    if args.max_ms is not None and elapsed > args.max_ms:
+        print(
+            "import crux is slower than {:.1f} ms".format(args.max_ms), file=sys.stderr
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Micro-benchmark of decoding a resource listing in CruxClient.api_call.
+
+It compares the former decoding, which called response.json() twice on a
+listing, with the single decode by the configured JSON codec.
+
+Usage:
+    PYTHONPATH=. python benchmarks/json_listing.py --items 10000 --repeat 5
+"""
+
+import argparse
+import os
+import timeit
+
+from requests.models import Response
+
+from crux._client import _decode_json_once
+from crux._json import CODEC_NAMES, JSONCodec
+from crux.models import Resource
+
+
+def make_listing(items):
+    codec = JSONCodec("json")
+    return codec.dumps(
+        [
+            {
+                "resourceId": "resource-{}".format(i),
+                "datasetId": "dataset-1",
+                "folderId": "folder-1",
+                "name": "file_{}.csv".format(i),
+                "type": "file",
+                "size": 1024 * i,
+                "mediaType": "text/csv",
+                "createdAt": "2019-06-01T12:00:00Z",
+                "modifiedAt": "2019-06-01T12:00:00Z",
+                "tags": ["tag1", "tag2"],
+                "description": None,
+                "labels": [{"labelKey": "key1", "labelValue": str(i)}],
+            }
+            for i in range(items)
+        ]
+    )
+
+
+def make_response(content):
+    response = Response()
+    response.status_code = 200
+    response._content = content  # pylint: disable=protected-access
+    return response
+
+
+def decode_twice(content):
+    # Former api_call: once for the list check, once for the iteration.
+    response = make_response(content)
+    if isinstance(response.json(), list):
+        return [Resource.from_dict(item) for item in response.json()]
+    return None
+
+
+def decode_once(content, codec):
+    response = make_response(content)
+    _decode_json_once(response, codec)
+    payload = response.json()
+    return [Resource.from_dict(item) for item in payload]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Models create a default connection when none is given.
+    os.environ.setdefault("CRUX_API_KEY", "benchmark")
+
+    content = make_listing(args.items)
+    print(
+        "Decoding a listing of {items} resources ({size} KiB), best of {repeat}".format(
+            items=args.items, size=len(content) // 1024, repeat=args.repeat
+        )
+    )
+
+    baseline = min(
+        timeit.repeat(lambda: decode_twice(content), number=1, repeat=args.repeat)
+    )
+    print("{:<24} {:8.1f} ms".format("response.json() x2", baseline * 1000))
+
+    for name in CODEC_NAMES:
+        try:
+            codec = JSONCodec(name)
+        except ImportError:
+            print("{:<24} not installed".format(name))
+            continue
+        best = min(
+            timeit.repeat(
+                lambda: decode_once(content, codec), number=1, repeat=args.repeat
+            )
+        )
+        print(
+            "{:<24} {:8.1f} ms  {:4.1f}x".format(
+                name + " x1", best * 1000, baseline / best
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,505 @@
+"""Benchmarks of the client against the fake Crux API of crux.testing.
+
+It measures metadata calls, listing and label search paging, small and large
+file transfers, download chunk sizes, memory peaks and the time of
+`import crux`. The fake API runs in a separate process, so that it doesn't
+compete with the client for the GIL nor count in its memory. Results can be
+saved as a JSON baseline, and compared with a baseline to find regressions, in
+which case the exit status is 1.
+
+Usage:
+    PYTHONPATH=. python benchmarks/suite.py --quick
+    PYTHONPATH=. python benchmarks/suite.py --save benchmarks/baseline.json
+    PYTHONPATH=. python benchmarks/suite.py --compare benchmarks/baseline.json
+"""
+
+from __future__ import division, print_function
+
+import argparse
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+from import_time import measure as measure_import
+
+from crux.__version__ import __version__
+from crux.testing import FakeCruxServer
+
+
+MIB = 1024 * 1024
+
+SIZES = {
+    "full": {
+        "metadata_ops": 2000,
+        "listing": 100000,
+        "small_files": 200,
+        "small_size": 16384,
+        "large_size": 64 * MIB,
+        "chunk_sizes": [256 * 1024, MIB, 4 * MIB, 16 * MIB],
+    },
+    "quick": {
+        "metadata_ops": 200,
+        "listing": 10000,
+        "small_files": 50,
+        "small_size": 16384,
+        "large_size": 8 * MIB,
+        "chunk_sizes": [256 * 1024, MIB, 4 * MIB],
+    },
+}
+
+# One in SEARCH_EVERY listed resources is labelled with the searched value.
+SEARCH_EVERY = 10
+
+PAGE_SIZE = 1000
+WORKERS = 8
+RANGED_CONNECTIONS = 4
+
+# Changes of import_time up to this many ms are run to run jitter.
+IMPORT_NOISE_MS = 3.0
+
+
+def seed(store, sizes):
+    """Creates the datasets of the benchmarks, returns their IDs."""
+    listing_id = store.create_dataset("listing")["datasetId"]
+    for index in range(sizes["listing"]):
+        resource = store.create_resource(
+            listing_id, {"name": "file-{}.csv".format(index)}
+        )
+        store.set_labels(
+            resource["resourceId"], {"group": str(index % SEARCH_EVERY)}
+        )
+
+    transfers_id = store.create_dataset("transfers")["datasetId"]
+    store.create_resource(transfers_id, {"name": "small", "type": "folder"})
+    small_ids = []
+    for index in range(sizes["small_files"]):
+        resource = store.create_resource(
+            transfers_id, {"name": "file-{}.csv".format(index), "folder": "/small"}
+        )
+        store.set_content(resource["resourceId"], os.urandom(sizes["small_size"]))
+        small_ids.append(resource["resourceId"])
+    large = store.create_resource(transfers_id, {"name": "large.bin"})
+    store.set_content(large["resourceId"], os.urandom(sizes["large_size"]))
+
+    return {
+        "listing": listing_id,
+        "transfers": transfers_id,
+        "small_ids": small_ids,
+        "large_id": large["resourceId"],
+    }
+
+
+def serve(sizes, latency, bandwidth, ready, stop):
+    """Runs the fake API until stop is set, in the server process."""
+    server = FakeCruxServer(latency=latency, bandwidth=bandwidth)
+    seeded = seed(server.store, sizes)
+    server.start()
+    ready.put((server.url, server.api_key, seeded))
+    stop.wait()
+    server.stop()
+
+
+class Context(object):
+    """Connection and seeded data handed to the benchmarks."""
+
+    def __init__(self, url, api_key, seeded, sizes, workdir):
+        self.url = url
+        self.api_key = api_key
+        self.conn = self.connect()
+        self.seeded = seeded
+        self.sizes = sizes
+        self.workdir = workdir
+        self.runs = 0
+
+    def connect(self):
+        """Returns a new connection, whose caches are empty."""
+        from crux import Crux  # pylint: disable=import-outside-toplevel
+
+        return Crux(
+            api_key=self.api_key, api_host=self.url, only_use_crux_domains=False
+        )
+
+    def unique(self, prefix):
+        # Names differ across the repeated runs, which share the fake API.
+        self.runs += 1
+        return "{}-{}".format(prefix, self.runs)
+
+    def new_dir(self, prefix):
+        path = os.path.join(self.workdir, self.unique(prefix))
+        os.makedirs(path)
+        return path
+
+
+def result(value, unit, higher_is_better=True, noise=0.0):
+    """Returns a benchmark result, changes up to noise aren't counted as changes."""
+    return {
+        "value": value,
+        "unit": unit,
+        "higher_is_better": higher_is_better,
+        "noise": noise,
+    }
+
+
+def timed(func):
+    started = timeit.default_timer()
+    value = func()
+    return value, timeit.default_timer() - started
+
+
+def bench_metadata(ctx):
+    resource_id = ctx.seeded["small_ids"][0]
+    operations = ctx.sizes["metadata_ops"]
+
+    def get():
+        for _ in range(operations):
+            ctx.conn.get_resource(resource_id)
+
+    _, get_seconds = timed(get)
+
+    dataset = ctx.conn.get_dataset(ctx.seeded["transfers"])
+    folder = "/" + ctx.unique("created")
+    dataset.create_folder(folder)
+
+    def create():
+        for index in range(operations // 4):
+            dataset.create_file("{}/file-{}.csv".format(folder, index))
+
+    _, create_seconds = timed(create)
+
+    return {
+        "metadata_get_resource": result(operations / get_seconds, "ops/s"),
+        "metadata_create_file": result(operations // 4 / create_seconds, "ops/s"),
+    }
+
+
+def bench_listing(ctx):
+    dataset = ctx.conn.get_dataset(ctx.seeded["listing"])
+    results = {}
+    for compact in (False, True):
+        count, seconds = timed(
+            lambda: sum(
+                1 for _ in dataset.iter_resources(page_size=PAGE_SIZE, compact=compact)
+            )
+        )
+        assert count == ctx.sizes["listing"], count
+        name = "listing_compact" if compact else "listing"
+        results[name] = result(count / seconds, "resources/s")
+    return results
+
+
+def bench_search(ctx):
+    dataset = ctx.conn.get_dataset(ctx.seeded["listing"])
+    predicates = [{"op": "eq", "key": "group", "val": "0"}]
+    count, seconds = timed(
+        lambda: sum(
+            1
+            for _ in dataset.find_resources_by_label(
+                predicates, max_per_page=PAGE_SIZE, compact=True
+            )
+        )
+    )
+    assert count == -(-ctx.sizes["listing"] // SEARCH_EVERY), count
+    return {"label_search": result(count / seconds, "resources/s")}
+
+
+def bench_small_files(ctx):
+    dataset = ctx.conn.get_dataset(ctx.seeded["transfers"])
+    total = ctx.sizes["small_files"] * ctx.sizes["small_size"]
+
+    local_path = ctx.new_dir("small")
+    downloaded, download_seconds = timed(
+        lambda: dataset.download_files("/small", local_path, workers=WORKERS)
+    )
+    assert len(downloaded) == ctx.sizes["small_files"], len(downloaded)
+
+    folder = "/" + os.path.basename(local_path)
+    dataset.create_folder(folder)
+    uploaded, upload_seconds = timed(
+        lambda: dataset.upload_files(local_path, folder, workers=WORKERS)
+    )
+    assert len(uploaded) == ctx.sizes["small_files"], len(uploaded)
+
+    return {
+        "small_download": result(total / MIB / download_seconds, "MiB/s"),
+        "small_download_files": result(len(downloaded) / download_seconds, "files/s"),
+        "small_upload": result(total / MIB / upload_seconds, "MiB/s"),
+        "small_upload_files": result(len(uploaded) / upload_seconds, "files/s"),
+    }
+
+
+def download_large(ctx, chunk_size, connections=None):
+    file_resource = ctx.conn.get_resource(ctx.seeded["large_id"])
+    dest = os.path.join(ctx.new_dir("large"), "large.bin")
+    _, seconds = timed(
+        lambda: file_resource.download(
+            dest, chunk_size=chunk_size, connections=connections
+        )
+    )
+    assert os.path.getsize(dest) == ctx.sizes["large_size"]
+    os.remove(dest)
+    return ctx.sizes["large_size"] / MIB / seconds
+
+
+def bench_large_file(ctx):
+    dataset = ctx.conn.get_dataset(ctx.seeded["transfers"])
+    chunk_size = max(ctx.sizes["chunk_sizes"])
+    results = {
+        "large_download": result(download_large(ctx, chunk_size), "MiB/s"),
+        "large_download_ranged": result(
+            download_large(ctx, chunk_size, connections=RANGED_CONNECTIONS), "MiB/s"
+        ),
+    }
+
+    content = io.BytesIO(os.urandom(ctx.sizes["large_size"]))
+    path = "/{}.bin".format(ctx.unique("large-upload"))
+    _, seconds = timed(
+        lambda: dataset.upload_file(
+            content, path, media_type="application/octet-stream"
+        )
+    )
+    results["large_upload"] = result(ctx.sizes["large_size"] / MIB / seconds, "MiB/s")
+    return results
+
+
+def bench_chunk_sizes(ctx):
+    return {
+        "chunk_size_{}k".format(chunk_size // 1024): result(
+            download_large(ctx, chunk_size), "MiB/s"
+        )
+        for chunk_size in ctx.sizes["chunk_sizes"]
+    }
+
+
+def traced_memory(func):
+    """Returns the MiB allocated while the result of func is alive, and the peak."""
+    tracemalloc.start()
+    try:
+        kept = func()  # noqa: F841 pylint: disable=unused-variable
+        current, peak = tracemalloc.get_traced_memory()
+        return current / MIB, peak / MIB
+    finally:
+        tracemalloc.stop()
+
+
+def bench_memory(ctx):
+    if tracemalloc is None:
+        print(
+            "Skipping memory benchmarks, tracemalloc isn't available", file=sys.stderr
+        )
+        return {}
+
+    results = {}
+    for compact in (False, True):
+        # The caches filled by the other benchmarks would hide allocations.
+        ctx.conn = ctx.connect()
+        dataset = ctx.conn.get_dataset(ctx.seeded["listing"])
+        # The materialized listing is what compact records shrink, the peak
+        # also counts the pages decoded while it's built.
+        retained, peak = traced_memory(
+            lambda: list(
+                dataset.iter_resources(page_size=PAGE_SIZE, compact=compact)
+            )
+        )
+        name = "memory_listing_compact" if compact else "memory_listing"
+        results[name] = result(retained, "MiB", higher_is_better=False)
+        results[name + "_peak"] = result(peak, "MiB", higher_is_better=False)
+
+    _, peak = traced_memory(
+        lambda: download_large(ctx, max(ctx.sizes["chunk_sizes"]))
+    )
+    results["memory_large_download"] = result(peak, "MiB", higher_is_better=False)
+    return results
+
+
+def bench_import(ctx):  # pylint: disable=unused-argument
+    elapsed, _ = measure_import(repeat=10)
+    # A few ms, whose run to run jitter is a large share of it.
+    return {
+        "import_time": result(
+            elapsed, "ms", higher_is_better=False, noise=IMPORT_NOISE_MS
+        )
+    }
+
+
+BENCHMARKS = (
+    ("metadata", bench_metadata),
+    ("listing", bench_listing),
+    ("search", bench_search),
+    ("small_files", bench_small_files),
+    ("large_file", bench_large_file),
+    ("chunk_sizes", bench_chunk_sizes),
+    ("memory", bench_memory),
+    ("import", bench_import),
+)
+
+
+def best(runs):
+    """Merges repeated runs, keeping the best value of each benchmark."""
+    merged = {}
+    for run in runs:
+        for name, measured in run.items():
+            kept = merged.get(name)
+            if (
+                kept is None
+                or (measured["higher_is_better"] and measured["value"] > kept["value"])
+                or (not measured["higher_is_better"] and measured["value"] < kept["value"])
+            ):
+                merged[name] = measured
+    return merged
+
+
+def run(args, sizes):
+    ready = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=serve, args=(sizes, args.latency, args.bandwidth, ready, stop)
+    )
+    server.daemon = True
+    server.start()
+    url, api_key, seeded = ready.get(timeout=600)
+
+    workdir = tempfile.mkdtemp(prefix="crux-benchmarks-")
+    ctx = Context(url, api_key, seeded, sizes, workdir)
+
+    results = {}
+    try:
+        for name, bench in BENCHMARKS:
+            if args.only and name not in args.only:
+                continue
+            print("Running {}".format(name), file=sys.stderr)
+            results.update(best(bench(ctx) for _ in range(args.repeat)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        stop.set()
+        server.join()
+
+    return results
+
+
+def compare(baseline, current, threshold):
+    """Prints the change of each benchmark, returns the names of the regressions."""
+    regressions = []
+    row = "{:<28} {:>14} {:>14} {:>9}  {}"
+    print(row.format("benchmark", "baseline", "current", "change", "status"))
+    for name in sorted(set(baseline) | set(current)):
+        if name not in current:
+            value = "{:.1f}".format(baseline[name]["value"])
+            print(row.format(name, value, "", "", "missing"))
+            continue
+        measured = current[name]
+        if name not in baseline:
+            print(row.format(name, "", "{:.1f}".format(measured["value"]), "", "new"))
+            continue
+
+        expected = baseline[name]["value"]
+        change = (measured["value"] - expected) / expected if expected else 0.0
+        gain = change if measured["higher_is_better"] else -change
+        # Older baselines have no noise, the current run's applies then.
+        noise = max(baseline[name].get("noise", 0.0), measured.get("noise", 0.0))
+        if abs(measured["value"] - expected) <= noise:
+            status = "ok"
+        elif gain < -threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif gain > threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        print(
+            row.format(
+                name,
+                "{:.1f}".format(expected),
+                "{:.1f}".format(measured["value"]),
+                "{:+.1f}%".format(change * 100),
+                "{} ({})".format(status, measured["unit"]),
+            )
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--quick", action="store_true", help="Use smaller datasets and files"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs of each benchmark, the best is kept"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=[name for name, _ in BENCHMARKS],
+        help="Benchmarks to run, all by default",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to each request"
+    )
+    parser.add_argument(
+        "--bandwidth", type=float, default=None, help="Bytes per second per connection"
+    )
+    parser.add_argument("--save", help="Path of the JSON baseline to write")
+    parser.add_argument("--compare", help="Path of the JSON baseline to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative change counted as a regression, 0.2 by default",
+    )
+    args = parser.parse_args()
+
+    sizes = SIZES["quick" if args.quick else "full"]
+    results = run(args, sizes)
+
+    report = {
+        "created_at": datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "crux_version": __version__,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {
+            "sizes": sizes,
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "bandwidth": args.bandwidth,
+        },
+        "results": results,
+    }
+
+    if args.save:
+        with open(args.save, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print("Saved baseline to {}".format(args.save), file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline["options"] != report["options"]:
+            print(
+                "Warning: the baseline was measured with other options",
+                file=sys.stderr,
+            )
+        regressions = compare(baseline["results"], results, args.threshold)
+        if regressions:
+            print("Regressions: {}".format(", ".join(regressions)), file=sys.stderr)
+            sys.exit(1)
+        return
+
+    for name, measured in sorted(results.items()):
+        print("{:<28} {:>14.1f} {}".format(name, measured["value"], measured["unit"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,27 @@
 """
 Module packages root level crux objects.
+
+The objects are imported on first use, so that importing crux doesn't import
+requests and the models.
 """
 import logging
 from logging import NullHandler
+from typing import TYPE_CHECKING
+
+from crux._lazy import lazy_exports
+
+if TYPE_CHECKING:  # pragma: no cover
+    from crux._retry import RetryPolicy  # noqa: F401
+    from crux._utils import TRACE  # noqa: F401
+    from crux.apis import Crux  # noqa: F401
 
-from crux._utils import TRACE
-from crux.apis import Crux
+__all__ = ("Crux", "RetryPolicy", "TRACE")
 
-__all__ = ("Crux", "TRACE")
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {"Crux": "crux.apis", "RetryPolicy": "crux._retry", "TRACE": "crux._utils"},
+    submodules=("apis", "exceptions", "models", "tracing"),
+)
 
 # Set default logging handler to avoid "No handler found" warnings.
 logging.getLogger(__name__).addHandler(NullHandler())
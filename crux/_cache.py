@@ -0,0 +1,371 @@
+"""Module contains client side caches."""
+
+from collections import OrderedDict
+import threading
+import time
+from typing import (  # noqa: F401
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+)
+
+# time.monotonic isn't available in Python 2.
+monotonic = getattr(time, "monotonic", time.time)
+
+
+class TTLCache(object):
+    """Thread safe cache whose entries expire after ttl seconds.
+
+    When the cache is full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        # type: (int, Optional[float]) -> None
+        """
+        Args:
+            maxsize (int): Maximum number of entries. Defaults to 1024.
+            ttl (float): Number of seconds an entry stays valid. None keeps entries
+                until they are evicted, 0 disables the cache. Defaults to None.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be copied, copies start with a fresh lock.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def enabled(self):
+        """bool: False if the cache doesn't store entries."""
+        return self.ttl != 0 and self.maxsize > 0
+
+    def get(self, key, default=None):
+        # type: (Hashable, Any) -> Any
+        """Gets the value of an entry which hasn't expired.
+
+        Args:
+            key (hashable): Key of the entry.
+            default: Value returned if there is no valid entry. Defaults to None.
+
+        Returns:
+            Value of the entry or default.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or (entry[1] is not None and entry[1] <= monotonic()):
+                self.misses += 1
+                return default
+            # Re-inserting marks the entry as the most recently used one.
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        # type: (Hashable, Any, Optional[float]) -> None
+        """Sets the value of an entry.
+
+        Args:
+            key (hashable): Key of the entry.
+            value: Value of the entry.
+            ttl (float): Overrides the ttl of the cache for this entry.
+                Defaults to None.
+        """
+        if not self.enabled:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, expires_at)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        # type: (Hashable, Any) -> Any
+        """Removes an entry.
+
+        Args:
+            key (hashable): Key of the entry.
+            default: Value returned if there is no entry. Defaults to None.
+
+        Returns:
+            Value of the removed entry or default.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def evict(self, predicate):
+        # type: (Callable[[Hashable, Any], bool]) -> int
+        """Removes the entries matching a predicate.
+
+        Args:
+            predicate (callable): Called with the key and value of every entry,
+                entries for which it returns True are removed.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        with self._lock:
+            keys = [
+                key for key, entry in self._entries.items() if predicate(key, entry[0])
+            ]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        # type: () -> None
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        # type: () -> Dict[str, int]
+        """Returns the cache counters.
+
+        Returns:
+            dict: Number of ``hits``, ``misses`` and stored ``entries``.
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+
+def _model_ids(segments):
+    # type: (List[str]) -> List[Tuple[str, str]]
+    """Returns the ("datasets", id) and ("resources", id) pairs of URL segments."""
+    return [
+        (kind, model_id)
+        for kind, model_id in zip(segments, segments[1:])
+        if kind in ("datasets", "resources")
+    ]
+
+
+class CachedResponse(object):
+    """Body and validators of a cached GET response."""
+
+    __slots__ = ("content", "headers", "etag", "last_modified", "stored_at")
+
+    def __init__(self, content, headers, etag=None, last_modified=None):
+        # type: (bytes, Dict[str, str], Optional[str], Optional[str]) -> None
+        """
+        Args:
+            content (bytes): Body of the response.
+            headers (dict): Headers of the response.
+            etag (str): ETag header of the response. Defaults to None.
+            last_modified (str): Last-Modified header of the response.
+                Defaults to None.
+        """
+        self.content = content
+        self.headers = headers
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = monotonic()
+
+
+class ConditionalCache(object):
+    """Thread safe cache of GET responses, revalidated with conditional requests.
+
+    Responses with an ETag or Last-Modified header are stored with their
+    validators, which are sent back in If-None-Match and If-Modified-Since
+    headers. A 304 response is then served from the cache. With a ttl, responses
+    without validators are stored too, and stored responses are served without
+    any request for ttl seconds. When the cache is full, the least recently used
+    response is evicted.
+    """
+
+    def __init__(self, maxsize=0, ttl=None):
+        # type: (int, Optional[float]) -> None
+        """
+        Args:
+            maxsize (int): Maximum number of responses. 0 disables the cache.
+                Defaults to 0.
+            ttl (float): Number of seconds a response is served without
+                revalidation. None always revalidates. Defaults to None.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._responses = TTLCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be copied, copies start with a fresh lock.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._responses)
+
+    @property
+    def enabled(self):
+        """bool: False if the cache doesn't store responses."""
+        return self.maxsize > 0 and self.ttl != 0
+
+    def _count(self, counter):
+        # type: (str) -> None
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def fetch(self, key, send):
+        # type: (Hashable, Callable[[Dict[str, str]], Any]) -> Any
+        """Serves a GET request from the cache, or sends it.
+
+        Args:
+            key (hashable): Key of the request.
+            send (callable): Sends the request with the additional headers it's
+                called with, and returns the requests.Response.
+
+        Returns:
+            CachedResponse or requests.Response: Stored response, if it's fresh or
+                the server replied 304, otherwise the response of the request.
+        """
+        cached = self._responses.get(key)
+        if cached is not None and (
+            self.ttl is not None and monotonic() - cached.stored_at < self.ttl
+        ):
+            self._count("hits")
+            return cached
+
+        headers = {}  # type: Dict[str, str]
+        if cached is not None:
+            if cached.etag:
+                headers["if-none-match"] = cached.etag
+            if cached.last_modified:
+                headers["if-modified-since"] = cached.last_modified
+
+        response = send(headers)
+
+        if response.status_code == 304 and cached is not None:
+            self._count("revalidations")
+            # The ttl of the confirmed response starts again.
+            cached.stored_at = monotonic()
+            return cached
+
+        self._count("misses")
+        if response.status_code == 200:
+            self.set(key, response.content, response.headers)
+        return response
+
+    def set(self, key, content, headers):
+        # type: (Hashable, bytes, Dict[str, str]) -> None
+        """Stores a response which has validators, or any response with a ttl.
+
+        Args:
+            key (hashable): Key of the request.
+            content (bytes): Body of the response.
+            headers (dict): Headers of the response.
+        """
+        if not self.enabled or "no-store" in headers.get("cache-control", ""):
+            return
+
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if etag or last_modified or self.ttl is not None:
+            self._responses.set(
+                key, CachedResponse(content, dict(headers), etag, last_modified)
+            )
+
+    def invalidate(self, url):
+        # type: (str) -> int
+        """Removes the responses of a URL and of the URLs below it.
+
+        Args:
+            url (str): URL which was modified.
+
+        Returns:
+            int: Number of removed responses.
+        """
+        base = url.rstrip("/")
+
+        def is_below(key, _):
+            # type: (Any, Any) -> bool
+            # Compared by path segment, resources/1 isn't above resources/10.
+            cached_url = key[0]
+            return cached_url.rstrip("/") == base or cached_url.startswith(base + "/")
+
+        return self._responses.evict(is_below)
+
+    def invalidate_related(self, url):
+        # type: (str) -> int
+        """Removes the responses of a URL, and of the dataset or resource it writes.
+
+        Besides the URLs below it, the responses of any URL of the written
+        dataset or resource, the innermost one of the URL, are removed, such as
+        ``resources/{id}`` after a write to ``datasets/{id}/resources/{id}/labels``.
+        A write to a resource also removes the ``datasets/{id}/resources``
+        listings, which include it.
+
+        Args:
+            url (str): URL which was modified.
+
+        Returns:
+            int: Number of removed responses.
+        """
+        base = url.rstrip("/")
+        # The innermost model of the URL is the written one.
+        written = _model_ids(base.split("/"))[-1:]
+        writes_resource = any(kind == "resources" for kind, _ in written)
+
+        def is_related(key, _):
+            # type: (Any, Any) -> bool
+            cached_url = key[0].rstrip("/")
+            if cached_url == base or cached_url.startswith(base + "/"):
+                return True
+            segments = cached_url.split("/")
+            if any(model in written for model in _model_ids(segments)):
+                return True
+            # datasets/{id}/resources lists the resources of a dataset.
+            return (
+                writes_resource
+                and len(segments) > 2
+                and segments[-1] == "resources"
+                and segments[-3] == "datasets"
+            )
+
+        return self._responses.evict(is_related)
+
+    def clear(self):
+        # type: () -> None
+        """Removes all responses."""
+        self._responses.clear()
+
+    def stats(self):
+        # type: () -> Dict[str, int]
+        """Returns the cache counters.
+
+        Returns:
+            dict: Number of ``hits`` served without request, ``revalidations``
+                served from a 304 response, ``misses`` and stored ``entries``.
+        """
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "entries": len(self),
+        }
@@ -3,6 +3,7 @@
 from typing import (  # noqa: F401 pylint: disable=unused-import
     Any,
     Dict,
+    Iterator,
     List,
     MutableMapping,
     Optional,
@@ -11,6 +12,7 @@ from typing import (  # noqa: F401 pylint: disable=unused-import
     Union,
 )
 
+from requests import Response
 from requests.exceptions import (
     ConnectTimeout,
     HTTPError,
@@ -19,8 +21,19 @@ from requests.exceptions import (
     SSLError,
     TooManyRedirects,
 )
+from requests.structures import CaseInsensitiveDict
 
+from crux._cache import CachedResponse, ConditionalCache, monotonic, TTLCache
+from crux._compat import unicode
+from crux._concurrency import AdaptiveLimiter, parse_retry_after, SingleFlight
 from crux._config import CruxConfig
+from crux._json import (  # noqa: F401 pylint: disable=unused-import
+    iter_json_array,
+    JSONCodec,
+)
+from crux._mapping import copy_json
+from crux._metrics import body_size, endpoint_template, MetricsRegistry
+from crux._retry import OVERLOAD_STATUS_CODES
 from crux._utils import create_logger, Headers, url_builder
 from crux.exceptions import (
     CruxAPIError,
@@ -30,10 +43,20 @@ from crux.exceptions import (
     CruxClientTooManyRedirects,
     CruxResourceNotFoundError,
 )
+from crux.tracing import current_span, traced
 
 
 log = create_logger(__name__)
 
+SIGNED_URL_CACHE_SIZE = 10000
+FOLDER_PATH_CACHE_SIZE = 10000
+RESOURCE_ID_CACHE_SIZE = 10000
+
+# Bytes read at a time from list responses decoded while they're received.
+ITER_CHUNK_SIZE = 65536
+
+DEFAULT_INITIAL_CONCURRENCY = 8
+
 
 class CruxClient(object):
     """Crux HTTP REST client."""
@@ -47,6 +70,51 @@ class CruxClient(object):
             log.debug("Using the passed crux_config object")
             self.crux_config = crux_config
 
+        # Signed download URLs of file resources, keyed by resource ID.
+        self.signed_url_cache = TTLCache(
+            maxsize=SIGNED_URL_CACHE_SIZE, ttl=self.crux_config.signed_url_ttl
+        )
+
+        # Paths of folders, keyed by folder ID.
+        self.folder_path_cache = TTLCache(
+            maxsize=FOLDER_PATH_CACHE_SIZE, ttl=self.crux_config.folder_path_ttl
+        )
+
+        # IDs of resources, keyed by dataset ID and resource path.
+        self.resource_id_cache = TTLCache(
+            maxsize=RESOURCE_ID_CACHE_SIZE, ttl=self.crux_config.resource_id_ttl
+        )
+
+        # GET responses revalidated with their ETag or Last-Modified validators,
+        # keyed by URL, query string and accepted media type.
+        self.metadata_cache = ConditionalCache(
+            maxsize=self.crux_config.metadata_cache_size,
+            ttl=self.crux_config.metadata_cache_ttl,
+        )
+
+        # Requests in flight, bounded by the server overload feedback.
+        self.limiter = (
+            AdaptiveLimiter(
+                initial_limit=min(
+                    DEFAULT_INITIAL_CONCURRENCY, self.crux_config.max_concurrency
+                ),
+                max_limit=self.crux_config.max_concurrency,
+            )
+            if self.crux_config.adaptive_concurrency
+            else None
+        )  # type: Optional[AdaptiveLimiter]
+
+        # Concurrent identical GET requests, which share a single response.
+        self.single_flight = (
+            SingleFlight() if self.crux_config.single_flight else None
+        )  # type: Optional[SingleFlight]
+
+        # Latency, status codes and sizes of the requests, by endpoint template.
+        self.metrics = (
+            MetricsRegistry() if self.crux_config.metrics else None
+        )  # type: Optional[MetricsRegistry]
+
+    @traced("crux.api_call")
     def api_call(  # pylint: disable=too-many-branches, too-many-statements
         self,
         method,  # type: str
@@ -59,6 +127,7 @@ class CruxClient(object):
         stream=False,  # type: bool
         connect_timeout=9.5,  # type: float
         read_timeout=60,  # type: float
+        iterate=False,  # type: bool
     ):
         # type:(...) -> Any
         """
@@ -78,6 +147,10 @@ class CruxClient(object):
                 Defaults to 60.5.
             read_timeout (float): Request read timeout configuration in seconds.
                 Defaults to 60.
+            iterate (bool): Should be set to True to decode a list response
+                incrementally while it's received. A generator of models is then
+                returned, which holds the connection until it's exhausted or closed.
+                Only used with model. Defaults to False.
 
         Returns:
             crux.models.Model or bool: Serialized response from API backend.
@@ -117,20 +190,80 @@ class CruxClient(object):
         headers["user-agent"] = user_agent
 
         session = self.crux_config.session
+        codec = self.crux_config.json_codec
+        iterate = iterate and model is not None
+
+        body = data  # type: Any
+        if json is not None and data is None:
+            # Encoded by the configured codec rather than by requests.
+            body = codec.dumps(json)
+            json = None
+            if "content-type" not in headers:
+                headers["content-type"] = "application/json"
+
+        if method not in ("GET", "DELETE", "PUT", "POST"):
+            raise ValueError("Request Method Type should be in GET, DELETE, PUT, POST")
+
+        log.trace("Setting request stream: %s", stream)
+        log.trace("Setting request data: %s, json: %s", body, json)
+        log.trace("Setting request params: %s", params)
+        log.trace("Setting headers: %s", headers)
+
+        metrics = self.metrics
+        span = current_span()
+        # Computed for every request, it costs little next to sending it.
+        endpoint = endpoint_template(path)  # type: str
+        if span is not None:
+            span.attributes.update(
+                {
+                    "method": method,
+                    "endpoint": endpoint,
+                    "request_bytes": body_size(body),
+                }
+            )
+
+        def request(request_headers):
+            # type: (MutableMapping[Text, Text]) -> Response
+            if metrics is None and span is None:
+                return send_request(request_headers)
 
-        if method in ("GET", "DELETE", "PUT", "POST"):
+            started = monotonic()
             try:
-                log.trace("Setting request stream: %s", stream)
-                log.trace("Setting request data: %s, json: %s", data, json)
-                log.trace("Setting request params: %s", params)
-                log.trace("Setting headers: %s", headers)
-                response = session.request(
+                response = send_request(request_headers)
+            except Exception:
+                if metrics is not None:
+                    metrics.record_request(
+                        method, endpoint, None, monotonic() - started, body_size(body)
+                    )
+                raise
+            response_bytes = _response_size(response, stream or iterate)
+            retries = _retries(response)
+            if metrics is not None:
+                metrics.record_request(
+                    method,
+                    endpoint,
+                    response.status_code,
+                    monotonic() - started,
+                    request_bytes=body_size(body),
+                    response_bytes=response_bytes,
+                    retries=retries,
+                )
+            if span is not None:
+                span.set_attribute("status", response.status_code)
+                span.set_attribute("response_bytes", response_bytes)
+                span.increment("retries", retries)
+            return response
+
+        def send_request(request_headers):
+            # type: (MutableMapping[Text, Text]) -> Response
+            try:
+                return session.request(
                     method,
                     url,
-                    headers=headers,
-                    data=data,
+                    headers=request_headers,
+                    data=body,
                     json=json,
-                    stream=stream,
+                    stream=stream or iterate,
                     params=params,
                     timeout=(connect_timeout, read_timeout),
                 )
@@ -142,34 +275,199 @@ class CruxClient(object):
                 raise CruxClientConnectionError(str(err))
             except (ConnectTimeout, ReadTimeout) as err:
                 raise CruxClientTimeout(str(err))
+
+        limiter = self.limiter
+        retry_policy = self.crux_config.retry_policy
+        # Bodies read from files can't be sent again.
+        retryable = body is None or isinstance(body, (bytes, unicode, dict))
+
+        def send(extra_headers):
+            # type: (Dict[str, str]) -> Response
+            request_headers = Headers(headers)
+            request_headers.update(extra_headers)
+            if limiter is None:
+                return request(request_headers)
+
+            attempt = 0
+            while True:
+                token = limiter.acquire()
+                try:
+                    response = request(request_headers)
+                except Exception:
+                    limiter.release(token)
+                    raise
+                overloaded = response.status_code in OVERLOAD_STATUS_CODES
+                pause = limiter.release(
+                    token,
+                    overloaded=overloaded,
+                    retry_after=parse_retry_after(response.headers.get("retry-after")),
+                )
+                if not overloaded or not retryable:
+                    return response
+                attempt += 1
+                # Overloaded requests take their retries from the shared budget too.
+                if not retry_policy.allow_retry(url, attempt=attempt):
+                    return response
+                if metrics is not None:
+                    metrics.record_retry(method, endpoint)
+                if span is not None:
+                    span.increment("retries")
+                log.debug(
+                    "Retrying %s %s in %.1fs after status %s",
+                    method,
+                    url,
+                    pause,
+                    response.status_code,
+                )
+                if stream or iterate:
+                    response.close()
+
+        metadata_cache = self.metadata_cache
+        # params isn't None here, the key is computed once for both caches.
+        query_params = params  # type: Dict[Any, Any]
+        params_key = _params_key(query_params) if method == "GET" else ()
+
+        def get():
+            # type: () -> Response
+            if metadata_cache.enabled:
+                cache_key = (url, params_key, headers.get("accept"))
+                response = metadata_cache.fetch(cache_key, send)
+                if isinstance(response, CachedResponse):
+                    log.debug("Serving GET %s from the metadata cache", url)
+                    response = _cached_response(response, url)
+            else:
+                response = send({})
+            _decode_json_once(response, codec)
+            return response
+
+        if method == "GET" and not (stream or iterate):
+            if self.single_flight is None:
+                response = get()
+            else:
+                flight_key = (url, params_key, tuple(sorted(headers.items())))
+                response, shared = self.single_flight.do(flight_key, get)
+                if shared:
+                    log.debug("Sharing the response of an identical GET %s", url)
+                    response = _shared_response(response)
         else:
-            raise ValueError("Request Method Type should be in GET, DELETE, PUT, POST")
+            response = send({})
+            if method == "POST" and metadata_cache.enabled:
+                # POST creates below the URL, or searches, like labels/search.
+                metadata_cache.invalidate(url)
+            elif method != "GET" and metadata_cache.enabled:
+                metadata_cache.invalidate_related(url)
+            if not stream:
+                _decode_json_once(response, codec)
+
+        if iterate and response.status_code in (200, 201, 202, 206):
+            log.debug("Iterating over response list of type %s", model)
+            return self._iter_models(response, model)
 
         if response.status_code in (200, 201, 202, 206):
             if model is None:
                 log.debug("Model is set to None, returning response dictionary")
                 return response
             else:
-                if isinstance(response.json(), list):
+                payload = response.json()
+                if isinstance(payload, list):
                     log.debug("Response is list of type %s", model)
                     serial_list = []
-                    for item in response.json():
+                    for item in payload:
                         obj = model.from_dict(item, connection=self)
                         serial_list.append(obj)
                     return serial_list
 
                 else:
                     log.debug("Response is of type %s", model)
-                    obj = model.from_dict(response.json(), connection=self)
+                    obj = model.from_dict(payload, connection=self)
                     return obj
         elif response.status_code == 204:
             log.debug("Response code is 204, returning True boolean value")
             return True
         else:
+            payload = response.json()
             if response.status_code == 404:
-                raise CruxResourceNotFoundError(response.json())
-            raise CruxAPIError(response.json())
+                raise CruxResourceNotFoundError(payload)
+            raise CruxAPIError(payload)
+
+    def _iter_models(self, response, model):
+        # type: (Response, Any) -> Iterator[Any]
+        try:
+            for item in iter_json_array(
+                response.iter_content(chunk_size=ITER_CHUNK_SIZE)
+            ):
+                yield model.from_dict(item, connection=self)
+        finally:
+            response.close()
 
     def close(self):
-        """Closes the Session."""
+        """Closes the Session and the pooled transfer connections."""
         self.crux_config.session.close()
+        self.crux_config.transport.close()
+
+
+def _params_key(params):
+    # type: (Dict[Any, Any]) -> Tuple[Tuple[str, str], ...]
+    """Returns a hashable key of the query string parameters."""
+    return tuple(sorted((str(key), str(value)) for key, value in params.items()))
+
+
+def _cached_response(cached, url):
+    # type: (CachedResponse, str) -> Response
+    """Creates a response from a cached one."""
+    response = Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict(cached.headers)
+    response._content = cached.content  # pylint: disable=protected-access
+    return response
+
+
+def _shared_response(response):
+    # type: (Response) -> Response
+    """Creates a copy of a response for a caller sharing it.
+
+    The body is decoded once for all the callers, each one gets its own copy
+    of the decoded body.
+    """
+    shared = Response()
+    shared.status_code = response.status_code
+    shared.url = response.url
+    shared.headers = CaseInsensitiveDict(response.headers)
+    shared._content = response.content  # pylint: disable=protected-access
+    shared.json = lambda **kwargs: copy_json(response.json())  # type: ignore
+    return shared
+
+
+def _response_size(response, streamed):
+    # type: (Response, bool) -> int
+    """Returns the size of a response body, without reading a streamed one."""
+    if not streamed:
+        return len(response.content or b"")
+    try:
+        return int(response.headers.get("content-length", 0))
+    except ValueError:
+        return 0
+
+
+def _retries(response):
+    # type: (Response) -> int
+    """Returns the number of retries made by urllib3 for a response."""
+    retries = getattr(response.raw, "retries", None)
+    history = getattr(retries, "history", None)
+    if not history:
+        return 0
+    return len([entry for entry in history if entry.redirect_location is None])
+
+
+def _decode_json_once(response, codec):
+    # type: (Response, JSONCodec) -> None
+    """Makes response.json() decode the body with the codec, at most once."""
+    decoded = []  # type: List[Any]
+
+    def json(**kwargs):  # pylint: disable=unused-argument
+        if not decoded:
+            decoded.append(codec.loads(response.content))
+        return decoded[0]
+
+    response.json = json  # type: ignore
@@ -10,4 +10,69 @@ except ImportError:
     from __builtin__ import unicode  # type: ignore
     from urllib import quote as urllib_quote
 
-__all__ = ("unicode", "urllib_quote")
+try:
+    # Python 3 imports
+    from sys import intern  # type: ignore
+except ImportError:
+    # Python 2 imports
+    from __builtin__ import intern  # type: ignore
+
+# Python 2 only interns byte strings, JSON strings are unicode there, so they
+# are shared through this table instead. Once it holds _MAX_UNICODE_STRINGS
+# strings, new ones aren't added, so it doesn't grow with every value seen.
+_UNICODE_STRINGS = {}  # type: dict
+_MAX_UNICODE_STRINGS = 10000
+
+
+def intern_string(value):
+    """Returns a shared copy of a string, other values are returned as they are.
+
+    Args:
+        value: Value to intern.
+
+    Returns:
+        The interned string, or value if it isn't a string.
+    """
+    value_type = type(value)
+    if value_type is str:
+        return intern(value)
+    if value_type is unicode:
+        shared = _UNICODE_STRINGS.get(value)
+        if shared is not None:
+            return shared
+        if len(_UNICODE_STRINGS) < _MAX_UNICODE_STRINGS:
+            _UNICODE_STRINGS[value] = value
+    return value
+
+
+try:
+    # Python 3 imports
+    import queue
+except ImportError:
+    # Python 2 imports
+    import Queue as queue  # type: ignore
+
+try:
+    # Python 3 imports
+    from collections.abc import Mapping, Sequence
+except ImportError:
+    # Python 2 imports
+    from collections import Mapping, Sequence  # type: ignore
+
+try:
+    # Python 3.5+ imports
+    from os import scandir  # type: ignore
+except ImportError:
+    # Python 2 imports
+    from scandir import scandir  # type: ignore
+
+__all__ = (
+    "intern",
+    "intern_string",
+    "Mapping",
+    "queue",
+    "scandir",
+    "Sequence",
+    "unicode",
+    "urllib_quote",
+)
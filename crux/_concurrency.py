@@ -0,0 +1,316 @@
+"""Module contains concurrency primitives shared by bulk operations."""
+
+from email.utils import mktime_tz, parsedate_tz
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple  # noqa: F401
+
+from crux._cache import monotonic
+from crux._config import RETRY_BACKOFF_FACTOR, RETRY_BACKOFF_MAX
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+
+class ByteBudget(object):
+    """Bounds the number of bytes which are in flight at the same time."""
+
+    def __init__(self, max_bytes=None):
+        # type: (Optional[int]) -> None
+        """
+        Args:
+            max_bytes (int): Maximum number of bytes in flight.
+                None disables the bound. Defaults to None.
+
+        Raises:
+            ValueError: If max_bytes is not positive.
+        """
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes should be greater than 0")
+
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size):
+        # type: (int) -> None
+        """Blocks until size bytes fit in the budget and reserves them.
+
+        An item larger than max_bytes is admitted once nothing else is in flight,
+        otherwise it could never be transferred.
+
+        Args:
+            size (int): Number of bytes to reserve.
+        """
+        size = size or 0
+        with self._condition:
+            if self.max_bytes is not None:
+                while self.in_flight and self.in_flight + size > self.max_bytes:
+                    self._condition.wait()
+            self.in_flight += size
+
+    def release(self, size):
+        # type: (int) -> None
+        """Releases bytes reserved with acquire.
+
+        Args:
+            size (int): Number of bytes to release.
+        """
+        size = size or 0
+        with self._condition:
+            self.in_flight -= size
+            self._condition.notify_all()
+
+
+class _Call(object):
+    """Call shared by the callers of SingleFlight.do."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None  # type: Any
+        self.error = None  # type: Optional[BaseException]
+
+
+class SingleFlight(object):
+    """Coalesces concurrent calls with the same key into a single call.
+
+    The first caller of a key runs the function, the callers arriving while it
+    runs wait for it and get its result or exception.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.shared = 0
+        self._calls = {}  # type: Dict[Hashable, _Call]
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks and calls in flight can't be copied, copies start without them.
+        return {"shared": self.shared}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.shared = state["shared"]
+
+    def do(self, key, func):
+        # type: (Hashable, Callable[[], Any]) -> Tuple[Any, bool]
+        """Calls func, unless a call with the same key is in flight.
+
+        Args:
+            key (hashable): Key of the call.
+            func (callable): Function called without arguments.
+
+        Returns:
+            tuple: Result of the call and True if it was shared with another
+                caller.
+
+        Raises:
+            Exception: Raised by the call.
+        """
+        with self._lock:
+            in_flight = self._calls.get(key)
+            if in_flight is None:
+                call = self._calls[key] = _Call()
+
+        if in_flight is not None:
+            in_flight.done.wait()
+            with self._lock:
+                self.shared += 1
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.result, True
+
+        try:
+            call.result = func()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+def parse_retry_after(value):
+    # type: (Optional[str]) -> Optional[float]
+    """Parses a Retry-After header.
+
+    Args:
+        value (str): Number of seconds or HTTP date.
+
+    Returns:
+        float: Number of seconds to wait, None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    date = parsedate_tz(value)
+    if date is None:
+        return None
+    return max(mktime_tz(date) - time.time(), 0.0)
+
+
+class AdaptiveLimiter(object):
+    """Bounds the number of requests in flight with an AIMD limit.
+
+    The limit grows by increase for every limit successful requests, that is
+    about once per round trip, and is multiplied by decrease when the server
+    is overloaded, at most once per round trip. An overloaded server's
+    Retry-After header, or an exponential backoff, pauses all the requests.
+    """
+
+    def __init__(
+        self,
+        initial_limit=8,  # type: int
+        min_limit=1,  # type: int
+        max_limit=256,  # type: int
+        increase=1.0,  # type: float
+        decrease=0.5,  # type: float
+    ):
+        # type: (...) -> None
+        """
+        Args:
+            initial_limit (int): Number of requests allowed in flight at first.
+                Defaults to 8.
+            min_limit (int): Lower bound of the limit. Defaults to 1.
+            max_limit (int): Upper bound of the limit. Defaults to 256.
+            increase (float): Growth of the limit per round trip without
+                overload. Defaults to 1.
+            decrease (float): Factor applied to the limit on overload.
+                Defaults to 0.5.
+
+        Raises:
+            ValueError: If the bounds or factors are invalid.
+        """
+        if not 0 < min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits should verify 0 < min <= initial <= max")
+        if increase <= 0 or not 0 < decrease < 1:
+            raise ValueError("increase should be positive and decrease in (0, 1)")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.overloads = 0
+        self._limit = float(initial_limit)
+        self._epoch = 0
+        self._consecutive_overloads = 0
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+
+    def __getstate__(self):
+        # Conditions can't be copied, copies start with no request in flight.
+        state = self.__dict__.copy()
+        del state["_condition"]
+        state["in_flight"] = state["queue_depth"] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        # type: () -> int
+        """int: Number of requests currently allowed in flight."""
+        return int(self._limit)
+
+    def acquire(self):
+        # type: () -> int
+        """Blocks until a request can be sent.
+
+        Returns:
+            int: Token to pass to release.
+        """
+        with self._condition:
+            self.queue_depth += 1
+            try:
+                while True:
+                    pause = self._paused_until - monotonic()
+                    if pause > 0:
+                        self._condition.wait(pause)
+                    elif self.in_flight >= self.limit:
+                        self._condition.wait()
+                    else:
+                        break
+            finally:
+                self.queue_depth -= 1
+            self.in_flight += 1
+            return self._epoch
+
+    def try_acquire(self):
+        # type: () -> Optional[int]
+        """Lets a request be sent if it can be sent now, without blocking.
+
+        Returns:
+            int: Token to pass to release, None if the requests are paused or
+                the limit is reached.
+        """
+        with self._condition:
+            if self._paused_until > monotonic() or self.in_flight >= self.limit:
+                return None
+            self.in_flight += 1
+            return self._epoch
+
+    def release(self, token, overloaded=False, retry_after=None):
+        # type: (int, bool, Optional[float]) -> Optional[float]
+        """Releases a request sent after acquire and adapts the limit.
+
+        Args:
+            token (int): Token returned by acquire.
+            overloaded (bool): True if the server replied 429 or 503.
+                Defaults to False.
+            retry_after (float): Seconds the server asked to wait.
+                Defaults to None.
+
+        Returns:
+            float: Seconds the requests are paused for, None if not overloaded.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            pause = None
+            if not overloaded:
+                self._consecutive_overloads = 0
+                self._limit = min(
+                    self.max_limit, self._limit + self.increase / self._limit
+                )
+            else:
+                self.overloads += 1
+                self._consecutive_overloads += 1
+                # Requests sent before the last decrease don't decrease it again.
+                if token == self._epoch:
+                    self._epoch += 1
+                    self._limit = max(self.min_limit, self._limit * self.decrease)
+                    log.debug("Decreased concurrency limit to %s", self.limit)
+                if retry_after is None:
+                    retry_after = min(
+                        RETRY_BACKOFF_FACTOR * 2 ** (self._consecutive_overloads - 1),
+                        RETRY_BACKOFF_MAX,
+                    )
+                pause = retry_after
+                self._paused_until = max(self._paused_until, monotonic() + pause)
+            self._condition.notify_all()
+            return pause
+
+    def stats(self):
+        # type: () -> Dict[str, int]
+        """Returns the limiter state.
+
+        Returns:
+            dict: Current ``limit``, requests ``in_flight``, requests waiting in
+                ``queue_depth`` and number of ``overloads``.
+        """
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "queue_depth": self.queue_depth,
+                "overloads": self.overloads,
+            }
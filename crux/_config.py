@@ -1,20 +1,31 @@
 """Module provides CruxConfig object to manage API configuration settings."""
 
 import os
-import platform
 import re
 from typing import Dict, MutableMapping, Optional, Text, Union  # noqa: F401
 
 import requests
-from requests.packages.urllib3.util.retry import (  # Dynamic load pylint: disable=import-error
-    Retry,
-)
 
 from crux.__version__ import __version__
-from crux._utils import create_logger, get_session, str_to_bool
+from crux._json import get_json_codec, JSONCodec  # noqa: F401
+from crux._retry import (  # noqa: F401 pylint: disable=unused-import
+    OVERLOAD_STATUS_CODES,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_BACKOFF_MAX,
+    RETRY_STATUS_CODES,
+    RETRY_TOTAL,
+    RetryPolicy,
+)
+from crux._transport import Transport
+from crux._utils import create_logger, DEFAULT_POOLSIZE, str_to_bool
 
 log = create_logger(__name__)
 
+DEFAULT_SIGNED_URL_TTL = 300
+DEFAULT_FOLDER_PATH_TTL = 300
+DEFAULT_RESOURCE_ID_TTL = 300
+DEFAULT_MAX_CONCURRENCY = 256
+
 
 class CruxConfig(object):
     """
@@ -30,6 +41,19 @@ class CruxConfig(object):
         user_agent=None,  # type: str
         only_use_crux_domains=None,  # type: bool
         session=None,  # type: requests.Session
+        transfer_pool_connections=None,  # type: int
+        transfer_pool_maxsize=None,  # type: int
+        signed_url_ttl=None,  # type: float
+        folder_path_ttl=None,  # type: float
+        resource_id_ttl=None,  # type: float
+        json_codec=None,  # type: Union[str, JSONCodec]
+        metadata_cache_size=None,  # type: int
+        metadata_cache_ttl=None,  # type: float
+        single_flight=None,  # type: bool
+        adaptive_concurrency=None,  # type: bool
+        max_concurrency=None,  # type: int
+        retry_policy=None,  # type: RetryPolicy
+        metrics=None,  # type: bool
     ):
         # type: (...) -> None
         """
@@ -43,6 +67,40 @@ class CruxConfig(object):
                 use for upload and download, False otherwise.
                 Defaults to False.
             session(requests.Session): Session to be used with connection.
+            transfer_pool_connections (int): Number of storage hosts for which
+                connection pools are kept by the transfer transport. Defaults to 10.
+            transfer_pool_maxsize (int): Number of connections kept per storage host
+                by the transfer transport. Defaults to 10.
+            signed_url_ttl (float): Number of seconds a signed download URL is reused
+                for the same file. 0 disables the reuse. Defaults to 300.
+            folder_path_ttl (float): Number of seconds the path of a folder is cached
+                by its ID. 0 disables the cache. Defaults to 300.
+            resource_id_ttl (float): Number of seconds the ID of a resource is cached
+                by its path. 0 disables the cache. Defaults to 300.
+            json_codec (str or crux._json.JSONCodec): Library encoding request and
+                decoding response bodies, one of orjson, ujson or json. Defaults to
+                None, which uses the fastest installed one.
+            metadata_cache_size (int): Number of GET responses cached and
+                revalidated with their ETag or Last-Modified header. Defaults to 0,
+                which disables the cache.
+            metadata_cache_ttl (float): Number of seconds a cached GET response is
+                served without revalidation, responses without validators are then
+                cached too. Defaults to None, which always revalidates.
+            single_flight (bool): True if concurrent identical GET requests
+                should share a single request and its decoded response.
+                Defaults to False.
+            adaptive_concurrency (bool): True if the number of API requests in
+                flight should be bounded by a limit, which grows while requests
+                succeed and is cut when the API replies 429 or 503. Overloaded
+                requests are then retried after Retry-After. Defaults to False.
+            max_concurrency (int): Upper bound of the adaptive concurrency limit.
+                Defaults to 256.
+            retry_policy (crux._retry.RetryPolicy): Retry policy shared by the API
+                requests and the file transfers, with their retry budget.
+                Defaults to None, which creates the default policy.
+            metrics (bool): True if the latency, status codes and sizes of the API
+                requests and the throughput of the file transfers should be
+                recorded. Defaults to False.
 
         Raises:
             ValueError: If CRUX_API_KEY is not set.
@@ -94,35 +152,81 @@ class CruxConfig(object):
             self.only_use_crux_domains = only_use_crux_domains
             log.debug("Setting only_use_crux_domain to %s", self.only_use_crux_domains)
 
+        self.retry_policy = (
+            retry_policy if retry_policy is not None else RetryPolicy()
+        )  # type: RetryPolicy
+        log.debug(
+            "Setting retry policy to %s retries with a budget of %s per request",
+            self.retry_policy.total,
+            self.retry_policy.budget.ratio if self.retry_policy.budget else None,
+        )
+
         if session is None:
-            retries = Retry(
-                total=20,
-                backoff_factor=0.3,
-                status_forcelist=(
-                    500,
-                    502,
-                    503,
-                    504,
-                    520,
-                    521,
-                    522,
-                    523,
-                    524,
-                    525,
-                    527,
-                    530,
-                ),
-                method_whitelist=("GET", "PUT", "DELETE", "POST"),
-                redirect=10,
-                connect=10,
-                read=10,
+            status_forcelist = None
+            if adaptive_concurrency:
+                # Overloads are retried by the client, which adapts its concurrency.
+                status_forcelist = tuple(
+                    status
+                    for status in self.retry_policy.status_forcelist
+                    if status not in OVERLOAD_STATUS_CODES
+                )
+            self.session = self.retry_policy.get_session(
+                proxies=self.proxies, status_forcelist=status_forcelist
             )
-            self.session = get_session(retries=retries, proxies=self.proxies)
         else:
             self.session = session
 
+        self.signed_url_ttl = (
+            signed_url_ttl if signed_url_ttl is not None else DEFAULT_SIGNED_URL_TTL
+        )  # type: float
+        log.debug("Setting signed_url_ttl to %s", self.signed_url_ttl)
+
+        self.folder_path_ttl = (
+            folder_path_ttl if folder_path_ttl is not None else DEFAULT_FOLDER_PATH_TTL
+        )  # type: float
+        log.debug("Setting folder_path_ttl to %s", self.folder_path_ttl)
+
+        self.resource_id_ttl = (
+            resource_id_ttl if resource_id_ttl is not None else DEFAULT_RESOURCE_ID_TTL
+        )  # type: float
+        log.debug("Setting resource_id_ttl to %s", self.resource_id_ttl)
+
+        self.json_codec = get_json_codec(json_codec)  # type: JSONCodec
+        log.debug("Setting json_codec to %s", self.json_codec.name)
+
+        self.metadata_cache_size = metadata_cache_size or 0  # type: int
+        self.metadata_cache_ttl = metadata_cache_ttl  # type: Optional[float]
+        log.debug(
+            "Setting metadata cache size to %s and ttl to %s",
+            self.metadata_cache_size,
+            self.metadata_cache_ttl,
+        )
+
+        self.single_flight = bool(single_flight)  # type: bool
+        log.debug("Setting single_flight to %s", self.single_flight)
+
+        self.adaptive_concurrency = bool(adaptive_concurrency)  # type: bool
+        self.max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY  # type: int
+        log.debug(
+            "Setting adaptive_concurrency to %s with at most %s requests",
+            self.adaptive_concurrency,
+            self.max_concurrency,
+        )
+
+        self.metrics = bool(metrics)  # type: bool
+        log.debug("Setting metrics to %s", self.metrics)
+
+        self.transport = Transport(
+            proxies=self.proxies,
+            retry_policy=self.retry_policy,
+            pool_connections=transfer_pool_connections or DEFAULT_POOLSIZE,
+            pool_maxsize=transfer_pool_maxsize or DEFAULT_POOLSIZE,
+        )
+
     def _default_user_agent(self):
         # type: () -> str
+        import platform  # pylint: disable=import-outside-toplevel
+
         user_agent = (
             "crux-python/{ver}"
             " requests/{req_ver} {py_impl}/{py_ver} "
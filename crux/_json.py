@@ -0,0 +1,180 @@
+"""Module contains the JSON codecs used for API request and response bodies."""
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional, Union  # noqa: F401
+
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+# Codecs in order of preference, the first importable one is the default.
+CODEC_NAMES = ("orjson", "ujson", "json")
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+class JSONCodec(object):
+    """Encodes and decodes JSON with one of the supported libraries."""
+
+    def __init__(self, name="json"):
+        # type: (str) -> None
+        """
+        Args:
+            name (str): Name of the library, one of orjson, ujson or json.
+                Defaults to json.
+
+        Raises:
+            ValueError: If the library isn't supported.
+            ImportError: If the library isn't installed.
+        """
+        if name not in CODEC_NAMES:
+            raise ValueError(
+                "JSON codec should be one of {names}".format(names=", ".join(CODEC_NAMES))
+            )
+        self.name = name
+        self._module = json if name == "json" else __import__(name)
+
+    def __repr__(self):
+        return "JSONCodec({name!r})".format(name=self.name)
+
+    def __getstate__(self):
+        # Modules can't be copied, copies import the library again.
+        return {"name": self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state["name"])
+
+    def loads(self, content):
+        # type: (Union[bytes, str]) -> Any
+        """Decodes a JSON document.
+
+        Args:
+            content (bytes or str): JSON document.
+
+        Returns:
+            Decoded document.
+        """
+        if self.name == "json" and isinstance(content, bytes):
+            # Python 3.5 json only decodes str.
+            content = content.decode("utf-8")  # type: ignore
+        return self._module.loads(content)
+
+    def dumps(self, obj):
+        # type: (Any) -> bytes
+        """Encodes an object as a UTF-8 JSON document.
+
+        Args:
+            obj: Object to encode.
+
+        Returns:
+            bytes: JSON document.
+        """
+        content = self._module.dumps(obj)
+        if not isinstance(content, bytes):
+            content = content.encode("utf-8")
+        return content
+
+
+def get_json_codec(codec=None):
+    # type: (Optional[Union[str, JSONCodec]]) -> JSONCodec
+    """Returns a JSON codec.
+
+    Args:
+        codec (str or JSONCodec): Codec object or name of its library. Defaults to
+            None, which picks the fastest installed library.
+
+    Returns:
+        JSONCodec: Codec object.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec is not None:
+        return JSONCodec(codec)
+
+    for name in CODEC_NAMES:
+        try:
+            json_codec = JSONCodec(name)
+        except ImportError:
+            continue
+        log.debug("Using %s JSON codec", name)
+        return json_codec
+
+    return JSONCodec()
+
+
+def iter_json_array(chunks):
+    # type: (Iterable[bytes]) -> Iterator[Any]
+    """Decodes the items of a JSON array while its UTF-8 document is received.
+
+    Only the items being decoded are held in memory, so the memory used doesn't
+    grow with the size of the array.
+
+    Args:
+        chunks (iterable): Successive bytes of the JSON document.
+
+    Yields:
+        Decoded items of the array.
+
+    Raises:
+        ValueError: If the document isn't a valid JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = u""
+    index = 0
+    eof = False
+    # Next expected token: "[" at the start, an item or "]" after "[",
+    # an item after "," and "," or "]" after an item.
+    state = "start"
+
+    while True:
+        while index < len(buffer) and buffer[index] in _WHITESPACE:
+            index += 1
+
+        if index < len(buffer):
+            char = buffer[index]
+            if state == "start":
+                if char != "[":
+                    raise ValueError("JSON document is not an array")
+                state = "first"
+                index += 1
+                continue
+            if state == "separator":
+                if char == "]":
+                    return
+                if char != ",":
+                    raise ValueError("Expecting ',' or ']' in JSON array")
+                state = "item"
+                index += 1
+                continue
+            if char == "]" and state == "first":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, index)
+            except ValueError:
+                if eof or char in ",]":
+                    raise
+            else:
+                # A number may continue in the next chunk, it's complete once
+                # it's followed by a delimiter.
+                if eof or (end < len(buffer) and buffer[end] in _DELIMITERS):
+                    yield item
+                    index = end
+                    state = "separator"
+                    continue
+        elif eof:
+            raise ValueError("Unterminated JSON array")
+
+        # Drops the consumed part of the buffer, then reads more of the document.
+        buffer = buffer[index:]
+        index = 0
+        try:
+            buffer += text_decoder.decode(next(chunks))
+        except StopIteration:
+            buffer += text_decoder.decode(b"", final=True)
+            eof = True
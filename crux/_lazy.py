@@ -0,0 +1,51 @@
+"""Module contains the lazy loading of the objects exported by packages."""
+
+import importlib
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Tuple  # noqa: F401
+
+
+def lazy_exports(package_name, exports, submodules=()):
+    # type: (str, Dict[str, str], Iterable[str]) -> Tuple[Callable, Callable]
+    """Returns the __getattr__ and __dir__ of a package, importing exports on first use.
+
+    An export is imported from its module the first time it is accessed, then
+    set on the package, so that later accesses don't go through __getattr__.
+    Python versions before 3.7 don't call the __getattr__ of modules, so the
+    exports are imported right away instead.
+
+    Args:
+        package_name (str): Name of the package, __name__.
+        exports (dict): Names of the modules of the exported objects,
+            by name of the object.
+        submodules (:obj:`list` of :obj:`str`): Names of the submodules which are
+            imported when accessed as attributes of the package. Defaults to ().
+
+    Returns:
+        tuple: __getattr__ and __dir__ functions of the package.
+    """
+    package = sys.modules[package_name]
+    submodule_names = frozenset(submodules)
+
+    def __getattr__(name):  # pylint: disable=invalid-name
+        # type: (str) -> Any
+        if name in exports:
+            value = getattr(importlib.import_module(exports[name]), name)
+        elif name in submodule_names:
+            value = importlib.import_module("{}.{}".format(package_name, name))
+        else:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(package_name, name)
+            )
+        setattr(package, name, value)
+        return value
+
+    def __dir__():  # pylint: disable=invalid-name
+        # type: () -> List[str]
+        return sorted(set(vars(package)) | set(exports) | submodule_names)
+
+    if sys.version_info < (3, 7):
+        for name in exports:
+            __getattr__(name)
+
+    return __getattr__, __dir__
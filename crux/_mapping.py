@@ -0,0 +1,141 @@
+"""Module contains read-only views and copies of raw model dicts."""
+
+import copy
+from typing import Any, Dict, Iterator, List  # noqa: F401
+
+from crux._compat import Mapping, Sequence
+
+
+# Types of the values shared by copies.
+_IMMUTABLE_TYPES = frozenset((type(None), bool, int, float, str, type(u""), type(b"")))
+
+
+def copy_json(value):
+    # type: (Any) -> Any
+    """Deep copies a decoded JSON value.
+
+    Only dicts and lists are copied, strings, numbers, booleans and None are
+    immutable and shared. It's several times faster than copy.deepcopy, which
+    is still used for other values.
+
+    Args:
+        value: Decoded JSON value.
+
+    Returns:
+        Copy of the value.
+    """
+    value_type = type(value)
+    if value_type is dict:
+        return {key: copy_json(item) for key, item in value.items()}
+    if value_type is list:
+        return [copy_json(item) for item in value]
+    if value_type in _IMMUTABLE_TYPES:
+        return value
+    return copy.deepcopy(value)
+
+
+def _view(value):
+    # type: (Any) -> Any
+    if isinstance(value, dict):
+        return ReadOnlyDict(value)
+    if isinstance(value, list):
+        return ReadOnlyList(value)
+    return value
+
+
+class ReadOnlyDict(Mapping):
+    """Read-only view of a dict.
+
+    Nested dicts and lists are returned as read-only views too, so nothing is
+    copied until copy is called.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        # type: (Dict[Any, Any]) -> None
+        """
+        Args:
+            data (dict): Viewed dict.
+        """
+        self._data = data
+
+    def __getitem__(self, key):
+        return _view(self._data[key])
+
+    def __iter__(self):
+        # type: () -> Iterator[Any]
+        return iter(self._data)
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, (ReadOnlyDict, ReadOnlyList)):
+            other = other._data  # pylint: disable=protected-access
+        return self._data == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        # type: () -> str
+        return "ReadOnlyDict({data!r})".format(data=self._data)
+
+    def copy(self):
+        # type: () -> Dict[Any, Any]
+        """Returns a deep copy of the dict, which can be modified.
+
+        Returns:
+            dict: Copy of the dict.
+        """
+        return copy_json(self._data)
+
+
+class ReadOnlyList(Sequence):
+    """Read-only view of a list, whose nested values are views too."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        # type: (List[Any]) -> None
+        """
+        Args:
+            data (list): Viewed list.
+        """
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ReadOnlyList(self._data[index])
+        return _view(self._data[index])
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, (ReadOnlyDict, ReadOnlyList)):
+            other = other._data  # pylint: disable=protected-access
+        return self._data == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        # type: () -> str
+        return "ReadOnlyList({data!r})".format(data=self._data)
+
+    def copy(self):
+        # type: () -> List[Any]
+        """Returns a deep copy of the list, which can be modified.
+
+        Returns:
+            list: Copy of the list.
+        """
+        return copy_json(self._data)
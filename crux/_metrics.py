@@ -0,0 +1,418 @@
+"""Module contains the metrics registry of API requests and file transfers."""
+
+from bisect import bisect_left
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple  # noqa: F401
+
+from crux._compat import unicode
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+# Upper bounds, in seconds, of the buckets of the request latency histograms.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Upper bounds, in bytes per second, of the buckets of the transfer throughput
+# histograms.
+THROUGHPUT_BUCKETS = (1e5, 1e6, 5e6, 1e7, 2.5e7, 5e7, 1e8, 2.5e8, 1e9)
+
+# Literal segments of the API paths, the other segments are IDs, names or label
+# values, which are replaced by a placeholder in the endpoint templates.
+ENDPOINT_SEGMENTS = frozenset(
+    (
+        "bulk",
+        "content",
+        "content-url",
+        "data",
+        "datasets",
+        "deliveries",
+        "drives",
+        "folderpath",
+        "identities",
+        "ids",
+        "jobs",
+        "labels",
+        "my",
+        "permissions",
+        "provenance",
+        "public",
+        "raw",
+        "resources",
+        "search",
+        "stitch",
+        "upload-session-complete",
+        "upload-session-start",
+        "whoami",
+    )
+)
+
+_PLACEHOLDER = "{id}"
+
+
+def endpoint_template(path):
+    # type: (List[str]) -> str
+    """Returns the endpoint template of an API path.
+
+    Args:
+        path (:obj:`list` of :obj:`str`): List of Context Path elements.
+
+    Returns:
+        str: Path whose variable segments are replaced by {id},
+            for example /resources/{id}/content-url.
+    """
+    return "/" + "/".join(
+        segment if segment in ENDPOINT_SEGMENTS else _PLACEHOLDER for segment in path
+    )
+
+
+def body_size(data):
+    # type: (Any) -> int
+    """Returns the size of a request body, 0 if it isn't known."""
+    if isinstance(data, bytes):
+        return len(data)
+    if isinstance(data, unicode):
+        return len(data.encode("utf-8"))
+    return 0
+
+
+class Histogram(object):
+    """Histogram of observed values, with fixed bucket upper bounds."""
+
+    def __init__(self, buckets):
+        # type: (Tuple[float, ...]) -> None
+        """
+        Args:
+            buckets (tuple): Sorted upper bounds of the buckets.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        # type: (float) -> None
+        """Adds a value to the histogram.
+
+        Args:
+            value (float): Observed value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        # type: () -> List[Tuple[float, int]]
+        """Returns the number of values lower or equal to each bucket bound.
+
+        Returns:
+            list: Pairs of bucket bound and count, the last bound is infinity.
+        """
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def to_dict(self):
+        # type: () -> Dict[str, Any]
+        """Returns the histogram as a dict.
+
+        Returns:
+            dict: Number of values in ``count``, their ``sum`` and the cumulative
+                counts of the ``buckets``, by bound.
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {_format_bound(bound): count for bound, count in self.cumulative()},
+        }
+
+
+class _EndpointMetrics(object):
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.statuses = {}  # type: Dict[int, int]
+        self.latency = Histogram(LATENCY_BUCKETS)
+
+
+class _TransferMetrics(object):
+    def __init__(self):
+        self.transfers = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.throughput = Histogram(THROUGHPUT_BUCKETS)
+
+
+class MetricsRegistry(object):
+    """Thread safe registry of the metrics of API requests and file transfers.
+
+    API requests are recorded by method and endpoint template, so the requests to
+    all the resources are recorded under /resources/{id}. Transfers are recorded
+    by direction, download or upload.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self._endpoints = {}  # type: Dict[Tuple[str, str], _EndpointMetrics]
+        self._transfers = {}  # type: Dict[str, _TransferMetrics]
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be copied.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _endpoint(self, method, endpoint):
+        # type: (str, str) -> _EndpointMetrics
+        key = (method, endpoint)
+        metrics = self._endpoints.get(key)
+        if metrics is None:
+            metrics = self._endpoints[key] = _EndpointMetrics()
+        return metrics
+
+    def record_request(  # pylint: disable=too-many-arguments
+        self,
+        method,  # type: str
+        endpoint,  # type: str
+        status,  # type: Optional[int]
+        seconds,  # type: float
+        request_bytes=0,  # type: int
+        response_bytes=0,  # type: int
+        retries=0,  # type: int
+    ):
+        # type: (...) -> None
+        """Records an API request.
+
+        Args:
+            method (str): HTTP method.
+            endpoint (str): Endpoint template, see endpoint_template.
+            status (int): Response status code, None if no response was received.
+            seconds (float): Duration of the request, including its retries.
+            request_bytes (int): Size of the request body. Defaults to 0.
+            response_bytes (int): Size of the response body. Defaults to 0.
+            retries (int): Number of retries of the request. Defaults to 0.
+        """
+        with self._lock:
+            metrics = self._endpoint(method, endpoint)
+            metrics.calls += 1
+            if status is None:
+                metrics.errors += 1
+            else:
+                metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.retries += retries
+            metrics.request_bytes += request_bytes
+            metrics.response_bytes += response_bytes
+            metrics.latency.observe(seconds)
+
+    def record_retry(self, method, endpoint):
+        # type: (str, str) -> None
+        """Records a retry of an API request made by the client.
+
+        Args:
+            method (str): HTTP method.
+            endpoint (str): Endpoint template, see endpoint_template.
+        """
+        with self._lock:
+            self._endpoint(method, endpoint).retries += 1
+
+    def record_transfer(self, direction, size, seconds):
+        # type: (str, int, float) -> None
+        """Records a file transfer.
+
+        Args:
+            direction (str): download or upload.
+            size (int): Number of bytes transferred.
+            seconds (float): Duration of the transfer.
+        """
+        with self._lock:
+            metrics = self._transfers.get(direction)
+            if metrics is None:
+                metrics = self._transfers[direction] = _TransferMetrics()
+            metrics.transfers += 1
+            metrics.bytes += size
+            metrics.seconds += seconds
+            if seconds > 0:
+                metrics.throughput.observe(size / seconds)
+
+    def reset(self):
+        # type: () -> None
+        """Removes all the recorded metrics."""
+        with self._lock:
+            self._endpoints.clear()
+            self._transfers.clear()
+
+    def snapshot(self):
+        # type: () -> Dict[str, Any]
+        """Returns the recorded metrics.
+
+        Returns:
+            dict: ``endpoints`` metrics, by method and endpoint template such as
+                ``GET /resources/{id}``, and ``transfers`` metrics, by direction.
+        """
+        with self._lock:
+            endpoints = {}
+            for (method, endpoint), metrics in sorted(self._endpoints.items()):
+                endpoints["{} {}".format(method, endpoint)] = {
+                    "method": method,
+                    "endpoint": endpoint,
+                    "calls": metrics.calls,
+                    "errors": metrics.errors,
+                    "retries": metrics.retries,
+                    "statuses": {
+                        str(status): count
+                        for status, count in sorted(metrics.statuses.items())
+                    },
+                    "request_bytes": metrics.request_bytes,
+                    "response_bytes": metrics.response_bytes,
+                    "latency_seconds": metrics.latency.to_dict(),
+                }
+
+            transfers = {}
+            for direction, transfer in sorted(self._transfers.items()):
+                transfers[direction] = {
+                    "transfers": transfer.transfers,
+                    "bytes": transfer.bytes,
+                    "seconds": transfer.seconds,
+                    "bytes_per_second": (
+                        transfer.bytes / transfer.seconds if transfer.seconds else None
+                    ),
+                    "throughput_bytes_per_second": transfer.throughput.to_dict(),
+                }
+
+        return {"endpoints": endpoints, "transfers": transfers}
+
+    def to_json(self):
+        # type: () -> str
+        """Exports the recorded metrics as JSON.
+
+        Returns:
+            str: JSON document of snapshot.
+        """
+        return json.dumps(self.snapshot(), sort_keys=True)
+
+    def to_prometheus(self):
+        # type: () -> str
+        """Exports the recorded metrics in the Prometheus text format.
+
+        Returns:
+            str: Metrics in the Prometheus text exposition format.
+        """
+        lines = []  # type: List[str]
+
+        def family(name, metric_type, help_text):
+            lines.append("# HELP {} {}".format(name, help_text))
+            lines.append("# TYPE {} {}".format(name, metric_type))
+
+        def sample(name, labels, value):
+            lines.append(
+                "{}{{{}}} {}".format(
+                    name,
+                    ",".join(
+                        '{}="{}"'.format(key, _escape_label(label))
+                        for key, label in labels
+                    ),
+                    _format_value(value),
+                )
+            )
+
+        def histogram(name, labels, values):
+            for bound, count in values.cumulative():
+                sample(name + "_bucket", labels + [("le", _format_bound(bound))], count)
+            sample(name + "_sum", labels, values.sum)
+            sample(name + "_count", labels, values.count)
+
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            transfers = sorted(self._transfers.items())
+
+            family("crux_requests_total", "counter", "API requests by status code.")
+            for (method, endpoint), metrics in endpoints:
+                labels = [("method", method), ("endpoint", endpoint)]
+                for status, count in sorted(metrics.statuses.items()):
+                    sample("crux_requests_total", labels + [("status", str(status))], count)
+                if metrics.errors:
+                    sample(
+                        "crux_requests_total",
+                        labels + [("status", "error")],
+                        metrics.errors,
+                    )
+
+            for name, attribute, help_text in (
+                ("crux_request_retries_total", "retries", "Retries of API requests."),
+                ("crux_request_bytes_total", "request_bytes", "Bytes sent in API requests."),
+                (
+                    "crux_response_bytes_total",
+                    "response_bytes",
+                    "Bytes received in API responses.",
+                ),
+            ):
+                family(name, "counter", help_text)
+                for (method, endpoint), metrics in endpoints:
+                    labels = [("method", method), ("endpoint", endpoint)]
+                    sample(name, labels, getattr(metrics, attribute))
+
+            family(
+                "crux_request_duration_seconds",
+                "histogram",
+                "Duration of API requests, including their retries.",
+            )
+            for (method, endpoint), metrics in endpoints:
+                histogram(
+                    "crux_request_duration_seconds",
+                    [("method", method), ("endpoint", endpoint)],
+                    metrics.latency,
+                )
+
+            for name, attribute, help_text in (
+                ("crux_transfers_total", "transfers", "File transfers."),
+                ("crux_transfer_bytes_total", "bytes", "Bytes of file transfers."),
+                ("crux_transfer_seconds_total", "seconds", "Duration of file transfers."),
+            ):
+                family(name, "counter", help_text)
+                for direction, transfer in transfers:
+                    sample(name, [("direction", direction)], getattr(transfer, attribute))
+
+            family(
+                "crux_transfer_throughput_bytes_per_second",
+                "histogram",
+                "Throughput of file transfers.",
+            )
+            for direction, transfer in transfers:
+                histogram(
+                    "crux_transfer_throughput_bytes_per_second",
+                    [("direction", direction)],
+                    transfer.throughput,
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    # type: (str) -> str
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound):
+    # type: (float) -> str
+    if bound == float("inf"):
+        return "+Inf"
+    return repr(float(bound))
+
+
+def _format_value(value):
+    # type: (float) -> str
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
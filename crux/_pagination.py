@@ -0,0 +1,136 @@
+"""Module contains helpers to page through API listings."""
+
+import threading
+from typing import Iterable, Iterator, TypeVar  # noqa: F401
+
+from crux._compat import queue
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+
+# Marks the end of the items produced by the background thread.
+_DONE = object()
+
+
+def prefetch(iterable, depth=1):
+    # type: (Iterable[T], int) -> Iterator[T]
+    """Yields the items of iterable while a background thread produces the next ones.
+
+    At most depth items are produced ahead of the consumer, which bounds memory
+    when each item is a page of results. Exceptions raised by the iterable are
+    raised to the consumer. Closing the generator stops the background thread.
+
+    Args:
+        iterable (iterable): Items to prefetch, for example a generator of pages.
+        depth (int): Number of items produced ahead of the consumer.
+            0 disables prefetching. Defaults to 1.
+
+    Yields:
+        Items of the iterable.
+    """
+    if depth < 1:
+        for item in iterable:
+            yield item
+        return
+
+    items = queue.Queue(maxsize=depth)  # type: queue.Queue
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except Exception as err:  # pylint: disable=broad-except
+            put((_DONE, err))
+
+    producer = threading.Thread(target=produce, name="crux-prefetch")
+    producer.daemon = True
+    producer.start()
+
+    try:
+        while True:
+            item, err = items.get()
+            if err is not None:
+                raise err
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stopped.set()
+
+
+class PageSizeTuner(object):
+    """Adjusts the page size of a listing from the observed pages.
+
+    Pages grow while responses are fast and small, and shrink when a page takes
+    longer than target_seconds or is larger than target_bytes.
+    """
+
+    def __init__(
+        self,
+        page_size,  # type: int
+        min_page_size=10,  # type: int
+        max_page_size=10000,  # type: int
+        target_seconds=1.0,  # type: float
+        target_bytes=8388608,  # type: int
+    ):
+        # type: (...) -> None
+        """
+        Args:
+            page_size (int): Page size of the first request.
+            min_page_size (int): Lower bound of the page size. Defaults to 10.
+            max_page_size (int): Upper bound of the page size. Defaults to 10000.
+            target_seconds (float): Response time aimed for. Defaults to 1.
+            target_bytes (int): Response size aimed for. Defaults to 8 MiB.
+        """
+        self.min_page_size = min_page_size
+        self.max_page_size = max_page_size
+        self.target_seconds = target_seconds
+        self.target_bytes = target_bytes
+        self.page_size = self._bound(page_size)
+
+    def _bound(self, page_size):
+        # type: (float) -> int
+        return int(max(self.min_page_size, min(self.max_page_size, page_size)))
+
+    def update(self, items, seconds, size):
+        # type: (int, float, int) -> int
+        """Computes the next page size from the last page.
+
+        Args:
+            items (int): Number of items in the last page.
+            seconds (float): Time taken to fetch the last page.
+            size (int): Size of the last response in bytes.
+
+        Returns:
+            int: Page size of the next request.
+        """
+        if items:
+            by_time = items * self.target_seconds / max(seconds, 0.001)
+            by_size = items * self.target_bytes / float(max(size, 1))
+            # Grow at most twofold per page, a single fast page isn't a trend.
+            page_size = min(by_time, by_size, self.page_size * 2)
+            log.debug(
+                "Tuned page size from %s to %s after %s items in %.3fs and %s bytes",
+                self.page_size,
+                int(page_size),
+                items,
+                seconds,
+                size,
+            )
+            self.page_size = self._bound(page_size)
+        return self.page_size
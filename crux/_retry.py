@@ -0,0 +1,409 @@
+"""Module contains the retry policy shared by API requests and file transfers."""
+
+import random
+import re
+import threading
+from typing import (  # noqa: F401
+    Any,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    Pattern,
+    Text,
+    Tuple,
+)
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.exceptions import (  # Dynamic load pylint: disable=import-error
+    MaxRetryError,
+    ResponseError,
+)
+from requests.packages.urllib3.util.retry import (  # Dynamic load pylint: disable=import-error
+    Retry,
+)
+
+from crux._utils import create_logger, DEFAULT_POOLSIZE, get_session, retry_methods
+
+
+log = create_logger(__name__)
+
+# Retry settings of API requests and file transfers.
+RETRY_TOTAL = 20
+RETRY_BACKOFF_FACTOR = 0.3
+# Longest wait between two retries, same as urllib3.
+RETRY_BACKOFF_MAX = 120
+RETRY_STATUS_CODES = (500, 502, 503, 504, 520, 521, 522, 523, 524, 525, 527, 530)
+RETRY_METHODS = ("GET", "PUT", "DELETE", "POST")
+
+# Status codes of an overloaded server, which decrease the adaptive concurrency.
+OVERLOAD_STATUS_CODES = (429, 503)
+
+# Retries allowed per request sent, and retries allowed on top of them.
+DEFAULT_BUDGET_RATIO = 0.1
+DEFAULT_BUDGET_RESERVE = 10
+
+
+class RetryBudget(object):
+    """Bounds the retries to a ratio of the requests sent.
+
+    Each request sent adds ratio to the budget and each retry takes 1 from it.
+    The budget holds at most reserve retries, so after a quiet period a burst of
+    failures is only retried reserve times before the ratio applies.
+    """
+
+    def __init__(self, ratio=DEFAULT_BUDGET_RATIO, reserve=DEFAULT_BUDGET_RESERVE):
+        # type: (float, int) -> None
+        """
+        Args:
+            ratio (float): Retries allowed per request sent. Defaults to 0.1.
+            reserve (int): Retries allowed regardless of the requests sent,
+                which is also the most retries saved up. Defaults to 10.
+
+        Raises:
+            ValueError: If ratio or reserve is negative.
+        """
+        if ratio < 0 or reserve < 0:
+            raise ValueError("ratio and reserve should not be negative")
+
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = float(reserve)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be copied.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        # type: () -> int
+        """int: Number of retries currently allowed."""
+        return int(self._tokens)
+
+    def deposit(self):
+        # type: () -> None
+        """Records a request sent."""
+        with self._lock:
+            self._tokens = min(self.reserve, self._tokens + self.ratio)
+
+    def withdraw(self):
+        # type: () -> bool
+        """Takes a retry from the budget.
+
+        Returns:
+            bool: True if the retry is allowed, False if the budget is spent.
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RetryPolicy(object):
+    """Retry policy shared by the API requests and the file transfers of a client.
+
+    Retries wait a random time between 0 and an exponential backoff, the full
+    jitter spreads the retries of concurrent requests instead of sending them
+    together. All the retries of the client are taken from a single RetryBudget,
+    so a partial outage can't multiply the traffic sent by more than its ratio.
+    """
+
+    def __init__(
+        self,
+        total=RETRY_TOTAL,  # type: int
+        backoff_factor=RETRY_BACKOFF_FACTOR,  # type: float
+        backoff_max=RETRY_BACKOFF_MAX,  # type: float
+        status_forcelist=RETRY_STATUS_CODES,  # type: Tuple[int, ...]
+        methods=RETRY_METHODS,  # type: Tuple[str, ...]
+        budget_ratio=DEFAULT_BUDGET_RATIO,  # type: Optional[float]
+        budget_reserve=DEFAULT_BUDGET_RESERVE,  # type: int
+        overrides=None,  # type: Optional[Dict[str, Dict[str, Any]]]
+    ):
+        # type: (...) -> None
+        """
+        Args:
+            total (int): Most retries of a request. Defaults to 20.
+            backoff_factor (float): Backoff of the second retry, doubled for each
+                following one. Defaults to 0.3.
+            backoff_max (float): Longest backoff between two retries.
+                Defaults to 120.
+            status_forcelist (tuple): Response status codes which are retried.
+                Defaults to the 5xx codes of overloaded servers, 429 is only
+                retried when it's added or with adaptive concurrency.
+            methods (tuple): HTTP methods which are retried.
+                Defaults to GET, PUT, DELETE and POST.
+            budget_ratio (float): Retries allowed per request sent by the client.
+                Defaults to 0.1. None disables the budget.
+            budget_reserve (int): Retries allowed regardless of the requests sent.
+                Defaults to 10.
+            overrides (dict): Settings of endpoints, by regular expression matched
+                against the request path, see override. Defaults to None.
+        """
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.status_forcelist = status_forcelist
+        self.methods = methods
+        self.budget = (
+            RetryBudget(ratio=budget_ratio, reserve=budget_reserve)
+            if budget_ratio is not None
+            else None
+        )  # type: Optional[RetryBudget]
+        self.requests = 0
+        self.retries = 0
+        self.denied = 0
+        self._overrides = []  # type: List[Tuple[Pattern, Dict[str, Any]]]
+        self._lock = threading.Lock()
+
+        for pattern, settings in (overrides or {}).items():
+            self.override(pattern, **settings)
+
+    def __getstate__(self):
+        # Locks can't be copied.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def override(self, pattern, total=None, backoff_factor=None):
+        # type: (str, Optional[int], Optional[float]) -> None
+        """Overrides the settings of the requests to some endpoints.
+
+        The first override whose pattern matches a request path applies.
+
+        Args:
+            pattern (str): Regular expression searched in the request path.
+            total (int): Most retries of a request to the endpoints, at most the
+                policy's, 0 disables their retries. Defaults to None, which keeps
+                the policy's.
+            backoff_factor (float): Backoff of the requests to the endpoints.
+                Defaults to None, which keeps the policy's.
+        """
+        self._overrides.append(
+            (re.compile(pattern), {"total": total, "backoff_factor": backoff_factor})
+        )
+
+    def settings(self, path):
+        # type: (Optional[str]) -> Tuple[int, float]
+        """Returns the settings of the requests to a path.
+
+        Args:
+            path (str): Request path.
+
+        Returns:
+            tuple: Most retries and backoff factor of the requests.
+        """
+        total, backoff_factor = self.total, self.backoff_factor
+        for regex, settings in self._overrides:
+            if path is not None and regex.search(path):
+                if settings["total"] is not None:
+                    total = settings["total"]
+                if settings["backoff_factor"] is not None:
+                    backoff_factor = settings["backoff_factor"]
+                break
+        return total, backoff_factor
+
+    def record_request(self):
+        # type: () -> None
+        """Records a request sent, which adds to the retry budget."""
+        with self._lock:
+            self.requests += 1
+        if self.budget is not None:
+            self.budget.deposit()
+
+    def allow_retry(self, path=None, attempt=1):
+        # type: (Optional[str], int) -> bool
+        """Checks whether a failed request is retried and counts the retry.
+
+        Args:
+            path (str): Request path. Defaults to None.
+            attempt (int): Number of the retry, starting at 1. Defaults to 1.
+
+        Returns:
+            bool: True if the request should be retried.
+        """
+        total, _ = self.settings(path)
+        if attempt > total:
+            return False
+        if self.budget is not None and not self.budget.withdraw():
+            with self._lock:
+                self.denied += 1
+            log.debug("Retry budget is spent, not retrying %s", path)
+            return False
+        with self._lock:
+            self.retries += 1
+        return True
+
+    def backoff(self, path=None, attempt=1):
+        # type: (Optional[str], int) -> float
+        """Returns the time to wait before a retry, with full jitter.
+
+        Args:
+            path (str): Request path. Defaults to None.
+            attempt (int): Number of the retry, starting at 1. Defaults to 1.
+
+        Returns:
+            float: Seconds between 0 and the exponential backoff of the retry.
+        """
+        _, backoff_factor = self.settings(path)
+        return random.uniform(
+            0, min(backoff_factor * 2 ** (attempt - 1), self.backoff_max)
+        )
+
+    def retry(self, status_forcelist=None, methods=None):
+        # type: (Optional[Tuple[int, ...]], Any) -> PolicyRetry
+        """Creates the urllib3 Retry object following the policy.
+
+        Responses whose retries are refused, by the budget or the most retries,
+        are returned to the caller rather than raised as a RetryError.
+
+        Args:
+            status_forcelist (tuple): Response status codes which are retried.
+                Defaults to None, which uses the policy's.
+            methods (tuple or bool): HTTP methods which are retried, False
+                retries all methods. Defaults to None, which uses the policy's.
+
+        Returns:
+            crux._retry.PolicyRetry: Retry object.
+        """
+        kwargs = retry_methods(methods if methods is not None else self.methods)
+        return PolicyRetry(
+            total=self.total,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(
+                status_forcelist
+                if status_forcelist is not None
+                else self.status_forcelist
+            ),
+            redirect=10,
+            connect=10,
+            read=10,
+            raise_on_status=False,
+            policy=self,
+            **kwargs
+        )
+
+    def get_session(
+        self,
+        proxies=None,  # type: Optional[MutableMapping[Text, Text]]
+        pool_connections=DEFAULT_POOLSIZE,  # type: int
+        pool_maxsize=DEFAULT_POOLSIZE,  # type: int
+        status_forcelist=None,  # type: Optional[Tuple[int, ...]]
+        methods=None,  # type: Any
+    ):
+        # type: (...) -> Any
+        """Creates a session whose requests follow the policy.
+
+        Args:
+            proxies (dict): Dictionary of Proxy urls.
+            pool_connections (int): Number of hosts for which connection pools
+                are kept. Defaults to 10.
+            pool_maxsize (int): Number of connections kept in the pool of each
+                host. Defaults to 10.
+            status_forcelist (tuple): Response status codes which are retried.
+                Defaults to None, which uses the policy's.
+            methods (tuple or bool): HTTP methods which are retried, False
+                retries all methods. Defaults to None, which uses the policy's.
+
+        Returns:
+            requests.Session: Session Object.
+        """
+        return get_session(
+            retries=self.retry(status_forcelist=status_forcelist, methods=methods),
+            proxies=proxies,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            adapter_class=PolicyAdapter,
+        )
+
+    def stats(self):
+        # type: () -> Dict[str, Optional[int]]
+        """Returns the retry counters of the policy.
+
+        Returns:
+            dict: Number of ``requests`` sent, ``retries`` spent, retries
+                ``denied`` by the budget and retries ``available`` in the budget.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "denied": self.denied,
+                "available": (
+                    self.budget.available if self.budget is not None else None
+                ),
+            }
+
+
+class PolicyRetry(Retry):
+    """urllib3 Retry which takes its retries from a RetryPolicy."""
+
+    def __init__(self, *args, **kwargs):
+        self.policy = kwargs.pop("policy", None)  # type: Optional[RetryPolicy]
+        super(PolicyRetry, self).__init__(*args, **kwargs)
+
+    def new(self, **kw):
+        new_retry = super(PolicyRetry, self).new(**kw)
+        new_retry.policy = self.policy
+        return new_retry
+
+    def increment(  # pylint: disable=too-many-arguments
+        self,
+        method=None,
+        url=None,
+        response=None,
+        error=None,
+        _pool=None,
+        _stacktrace=None,
+    ):
+        new_retry = super(PolicyRetry, self).increment(
+            method=method,
+            url=url,
+            response=response,
+            error=error,
+            _pool=_pool,
+            _stacktrace=_stacktrace,
+        )
+        policy = self.policy
+        if policy is None or new_retry.history[-1].redirect_location is not None:
+            return new_retry
+
+        attempt = len(
+            [entry for entry in new_retry.history if entry.redirect_location is None]
+        )
+        if not policy.allow_retry(url, attempt=attempt):
+            # With raise_on_status off, urllib3 returns the failed response.
+            raise MaxRetryError(
+                _pool, url, error or ResponseError("retry budget or limit reached")
+            )
+        log.debug("Retrying %s %s, attempt %s", method, url, attempt)
+        new_retry.backoff_factor = policy.settings(url)[1]
+        return new_retry
+
+    def get_backoff_time(self):
+        backoff = super(PolicyRetry, self).get_backoff_time()
+        if self.policy is None:
+            return backoff
+        # Full jitter, between 0 and the exponential backoff.
+        return random.uniform(0, min(backoff, self.policy.backoff_max))
+
+
+class PolicyAdapter(HTTPAdapter):
+    """HTTPAdapter which records its requests in the RetryPolicy of its retries."""
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        policy = getattr(self.max_retries, "policy", None)
+        if policy is not None:
+            policy.record_request()
+        return super(PolicyAdapter, self).send(request, *args, **kwargs)
@@ -0,0 +1,161 @@
+"""Module contains the pooled HTTP transport shared by file transfers."""
+
+import threading
+from typing import Dict, MutableMapping, Optional, Text  # noqa: F401
+
+from requests import Session  # noqa: F401 pylint: disable=unused-import
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from crux._retry import RetryPolicy  # noqa: F401 pylint: disable=unused-import
+from crux._utils import (
+    create_logger,
+    DEFAULT_POOLSIZE,
+    get_session,
+    ResumableUploadSignedSession,
+)
+
+
+log = create_logger(__name__)
+
+
+class Transport(object):
+    """HTTP transport which keeps connections to storage hosts alive between transfers.
+
+    Downloads and uploads through signed URLs share the connection pools of one
+    session, so consecutive transfers reuse TCP and TLS connections instead of
+    setting up new ones.
+    """
+
+    def __init__(
+        self,
+        proxies=None,  # type: Optional[MutableMapping[Text, Text]]
+        pool_connections=DEFAULT_POOLSIZE,  # type: int
+        pool_maxsize=DEFAULT_POOLSIZE,  # type: int
+        retry_policy=None,  # type: Optional[RetryPolicy]
+    ):
+        # type: (...) -> None
+        """
+        Args:
+            proxies (dict): Proxies to be used. Defaults to None.
+            pool_connections (int): Number of hosts for which connection pools
+                are kept. Defaults to 10.
+            pool_maxsize (int): Number of connections kept in the pool of each host.
+                It should be at least the number of concurrent transfers.
+                Defaults to 10.
+            retry_policy (crux._retry.RetryPolicy): Retry policy of the transfers,
+                shared with the API requests. Defaults to None, which retries
+                with the default Retry of get_session.
+        """
+        self.proxies = proxies if proxies else {}
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retry_policy = retry_policy
+        self._session = None  # type: Optional[Session]
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Copies open their own connections, locks and sessions can't be copied.
+        state = self.__dict__.copy()
+        state["_session"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """requests.Session: Session shared by the transfers."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    log.debug(
+                        "Creating transfer session with %s pools of %s connections",
+                        self.pool_connections,
+                        self.pool_maxsize,
+                    )
+                    if self.retry_policy is not None:
+                        # Like the default Retry of get_session, transfers retry
+                        # all methods and the rate limits of the storage service.
+                        status_forcelist = (429,) + tuple(
+                            status
+                            for status in self.retry_policy.status_forcelist
+                            if status != 429
+                        )
+                        self._session = self.retry_policy.get_session(
+                            proxies=self.proxies,
+                            pool_connections=self.pool_connections,
+                            pool_maxsize=self.pool_maxsize,
+                            status_forcelist=status_forcelist,
+                            methods=False,
+                        )
+                    else:
+                        self._session = get_session(
+                            proxies=self.proxies,
+                            pool_connections=self.pool_connections,
+                            pool_maxsize=self.pool_maxsize,
+                        )
+        return self._session
+
+    def signed_session(self, headers):
+        # type: (MutableMapping[Text, Text]) -> ResumableUploadSignedSession
+        """Returns a session sending signed URL headers over the shared connection pools.
+
+        The returned session borrows the adapters of the shared session, it
+        shouldn't be closed.
+
+        Args:
+            headers (dict): Headers required by the signed URL.
+
+        Returns:
+            crux._utils.ResumableUploadSignedSession: Session object.
+        """
+        signed_session = ResumableUploadSignedSession()
+        for prefix, adapter in self.session.adapters.items():
+            signed_session.mount(prefix, adapter)
+        signed_session.proxies = dict(self.proxies)
+        signed_session.headers = CaseInsensitiveDict(headers)
+        return signed_session
+
+    def stats(self):
+        # type: () -> Dict[str, int]
+        """Returns connection pool counters of the transport.
+
+        Returns:
+            dict: ``requests`` sent, ``connections`` opened, ``hits`` for requests
+                which reused an open connection and ``misses`` for requests which
+                had to open a new one.
+        """
+        requests_sent = 0
+        connections = 0
+
+        if self._session is not None:
+            for adapter in set(self._session.adapters.values()):
+                if not isinstance(adapter, HTTPAdapter):
+                    continue
+                managers = [adapter.poolmanager] + list(
+                    getattr(adapter, "proxy_manager", {}).values()
+                )
+                for manager in managers:
+                    for key in list(manager.pools.keys()):
+                        pool = manager.pools.get(key)
+                        if pool is not None:
+                            requests_sent += pool.num_requests
+                            connections += pool.num_connections
+
+        return {
+            "requests": requests_sent,
+            "connections": connections,
+            "hits": max(requests_sent - connections, 0),
+            "misses": connections,
+        }
+
+    def close(self):
+        # type: () -> None
+        """Closes the pooled connections."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
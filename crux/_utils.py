@@ -3,10 +3,10 @@
 import logging
 import posixpath
 import re
-from typing import List, Tuple  # noqa: F401
+from typing import Any, Dict, List, Tuple  # noqa: F401
 
 from requests import Session
-from requests.adapters import HTTPAdapter
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from requests.packages.urllib3.util.retry import (  # Dynamic load pylint: disable=import-error
     Retry,
 )
@@ -149,13 +149,44 @@ class Headers(dict):
         return super(Headers, self).get(key.lower())
 
 
-def get_session(session_class=Session, retries=None, proxies=None):
-    # type (Type[Session], requests.packages.urllib3.util.retry.Retry, Dict) -> Session
+def retry_methods(methods):
+    # type: (Any) -> Dict[str, Any]
+    """Returns the Retry keyword argument of the retried HTTP methods.
+
+    urllib3 1.26 renamed method_whitelist to allowed_methods and urllib3 2
+    removed method_whitelist.
+
+    Args:
+        methods (tuple or bool): Retried HTTP methods, False retries all methods.
+
+    Returns:
+        dict: Keyword argument of the urllib3 version installed.
+    """
+    if hasattr(Retry, "DEFAULT_ALLOWED_METHODS"):
+        return {"allowed_methods": methods}
+    return {"method_whitelist": methods}
+
+
+def get_session(
+    session_class=Session,
+    retries=None,
+    proxies=None,
+    pool_connections=DEFAULT_POOLSIZE,
+    pool_maxsize=DEFAULT_POOLSIZE,
+    adapter_class=HTTPAdapter,
+):
+    # type (Type[Session], Retry, Dict, int, int, Type[HTTPAdapter]) -> Session
     """Gets the session object.
     Args:
         session_class (Session): Session class. Defaults to Session.
         retries (requests.packages.urllib3.util.retry.Retry): Retry object.
         proxies (dict): Dictionary of Proxy urls.
+        pool_connections (int): Number of hosts for which connection pools are kept.
+            Defaults to 10.
+        pool_maxsize (int): Number of connections kept in the pool of each host.
+            Defaults to 10.
+        adapter_class (HTTPAdapter): Adapter class mounted for HTTP and HTTPS.
+            Defaults to HTTPAdapter.
 
     Returns:
         requests.Session: Session Object.
@@ -189,12 +220,19 @@ def get_session(session_class=Session, retries=None, proxies=None):
                 527,
                 530,
             ],
-            method_whitelist=False,
+            **retry_methods(False)
         )
 
     if retries:
-        session.mount("http://", HTTPAdapter(max_retries=retries))
-        session.mount("https://", HTTPAdapter(max_retries=retries))
+        for prefix in ("http://", "https://"):
+            session.mount(
+                prefix,
+                adapter_class(
+                    pool_connections=pool_connections,
+                    pool_maxsize=pool_maxsize,
+                    max_retries=retries,
+                ),
+            )
 
     session.proxies = proxies if proxies else {}
 
@@ -0,0 +1,19 @@
+"""
+Module packages the asyncio client of crux.
+
+It requires Python 3.6 or later and aiohttp, which is installed with the
+``async`` extra: ``pip install crux[async]``.
+"""
+
+from crux.aio._client import AsyncCruxClient, AsyncResponse
+from crux.aio.apis import AsyncCrux
+from crux.aio.models import AsyncDataset, AsyncFile, AsyncFolder
+
+__all__ = (
+    "AsyncCrux",
+    "AsyncCruxClient",
+    "AsyncDataset",
+    "AsyncFile",
+    "AsyncFolder",
+    "AsyncResponse",
+)
@@ -0,0 +1,452 @@
+"""Module contains code pertaining to AsyncCruxClient."""
+
+import asyncio
+from typing import (  # noqa: F401
+    Any,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    Text,
+    Tuple,
+)
+
+import aiohttp
+
+from crux._cache import monotonic
+from crux._client import CruxClient
+from crux._concurrency import (  # noqa: F401 pylint: disable=unused-import
+    AdaptiveLimiter,
+    parse_retry_after,
+)
+from crux._config import CruxConfig  # noqa: F401 pylint: disable=unused-import
+from crux._json import JSONCodec  # noqa: F401 pylint: disable=unused-import
+from crux._metrics import body_size, endpoint_template
+from crux._retry import OVERLOAD_STATUS_CODES
+from crux._utils import create_logger, Headers, url_builder
+from crux.exceptions import (
+    CruxAPIError,
+    CruxClientConnectionError,
+    CruxClientHTTPError,
+    CruxClientTimeout,
+    CruxClientTooManyRedirects,
+    CruxResourceNotFoundError,
+)
+from crux.tracing import detached_span
+
+
+log = create_logger(__name__)
+
+DEFAULT_CONNECTION_LIMIT = 100
+
+# Seconds between two checks of a full adaptive concurrency limiter.
+LIMITER_POLL_INTERVAL = 0.01
+
+
+class AsyncResponse(object):
+    """Response of an API call whose body has been read."""
+
+    def __init__(self, status_code, headers, content, codec):
+        # type: (int, MutableMapping[str, str], bytes, JSONCodec) -> None
+        """
+        Args:
+            status_code (int): HTTP status code.
+            headers (dict): Response headers.
+            content (bytes): Response body.
+            codec (crux._json.JSONCodec): Codec decoding the body.
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self._codec = codec
+        self._decoded = []  # type: List[Any]
+
+    def json(self):
+        # type: () -> Any
+        """Decodes the JSON body of the response, at most once.
+
+        Returns:
+            Decoded body.
+        """
+        if not self._decoded:
+            self._decoded.append(self._codec.loads(self.content))
+        return self._decoded[0]
+
+
+class AsyncCruxClient(CruxClient):
+    """Crux HTTP REST client running on an asyncio event loop.
+
+    It shares the configuration and client side caches of CruxClient, but its
+    api_call is a coroutine. Requests are sent by one aiohttp session, whose
+    connector bounds the number of open connections.
+    """
+
+    def __init__(self, crux_config, connection_limit=DEFAULT_CONNECTION_LIMIT):
+        # type: (CruxConfig, int) -> None
+        """
+        Args:
+            crux_config (CruxConfig): Configuration of the client.
+            connection_limit (int): Maximum number of simultaneous connections
+                of API calls and transfers. Defaults to 100.
+        """
+        super(AsyncCruxClient, self).__init__(crux_config)
+        self.connection_limit = connection_limit
+        self._session = None  # type: Optional[aiohttp.ClientSession]
+
+    def __getstate__(self):
+        # Sessions are bound to an event loop, copies open their own one.
+        state = self.__dict__.copy()
+        state["_session"] = None
+        return state
+
+    @property
+    def session(self):
+        """aiohttp.ClientSession: Session shared by the API calls and transfers."""
+        if self._session is None or self._session.closed:
+            log.debug(
+                "Creating aiohttp session with %s connections", self.connection_limit
+            )
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connection_limit)
+            )
+        return self._session
+
+    def proxy_for(self, url):
+        # type: (str) -> Optional[str]
+        """Returns the configured proxy of the URL scheme.
+
+        Args:
+            url (str): Requested URL.
+
+        Returns:
+            str: Proxy URL or None.
+        """
+        proxies = self.crux_config.proxies or {}
+        return proxies.get(url.split(":", 1)[0])
+
+    async def request(  # pylint: disable=too-many-arguments
+        self,
+        method,  # type: str
+        url,  # type: str
+        headers=None,  # type: MutableMapping[Text, Text]
+        params=None,  # type: Dict[Any,Any]
+        json=None,  # type: Dict[Any,Any]
+        data=None,  # type: Any
+        connect_timeout=9.5,  # type: float
+        read_timeout=60,  # type: float
+        retry=True,  # type: bool
+    ):
+        # type: (...) -> aiohttp.ClientResponse
+        """Sends a request with the session, retrying transient failures.
+
+        Retries follow the retry policy of the configuration and are taken from
+        its budget, like the retries of CruxClient. The caller has to release
+        the returned response.
+
+        Args:
+            method (str): REST method name.
+            url (str): Requested URL.
+            headers (dict): Request headers. Defaults to None.
+            params (dict): Data to be passed in query string. Defaults to None.
+            json (dict): Body data to be passed with request. Defaults to None.
+            data: Raw body of the request. Defaults to None.
+            connect_timeout (float): Connect timeout in seconds. Defaults to 9.5.
+            read_timeout (float): Read timeout in seconds. Defaults to 60.
+            retry (bool): False if the request can't be sent again, for example
+                when its body is a stream. Defaults to True.
+
+        Returns:
+            aiohttp.ClientResponse: Response object.
+
+        Raises:
+            CruxClientTooManyRedirects: If there are too many redirects.
+            CruxClientConnectionError: If there is SSL, Proxy or connection error.
+            CruxClientTimeout: If there is timout related error.
+        """
+        response, _ = await self._send(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            json=json,
+            data=data,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retry=retry,
+        )
+        return response
+
+    async def _send(  # pylint: disable=too-many-arguments, too-many-locals
+        self,
+        method,  # type: str
+        url,  # type: str
+        headers=None,  # type: MutableMapping[Text, Text]
+        params=None,  # type: Dict[Any,Any]
+        json=None,  # type: Dict[Any,Any]
+        data=None,  # type: Any
+        connect_timeout=9.5,  # type: float
+        read_timeout=60,  # type: float
+        retry=True,  # type: bool
+        limiter=None,  # type: Optional[AdaptiveLimiter]
+    ):
+        # type: (...) -> Tuple[aiohttp.ClientResponse, int]
+        """Sends a request, and returns its response and number of retries.
+
+        With a limiter, the request waits for it and overloaded responses are
+        retried too, like in CruxClient.api_call.
+        """
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        retry_policy = self.crux_config.retry_policy
+        retry = retry and method in retry_policy.methods
+        retries = 0
+
+        while True:
+            token = await _acquire(limiter)
+            retry_policy.record_request()
+            try:
+                response = await self.session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                    data=data,
+                    proxy=self.proxy_for(url),
+                    timeout=timeout,
+                )
+            except BaseException as err:
+                if limiter is not None:
+                    limiter.release(token)
+                if isinstance(err, aiohttp.TooManyRedirects):
+                    raise CruxClientTooManyRedirects(str(err))
+                if not isinstance(
+                    err, (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+                ):
+                    raise
+                if not retry or not retry_policy.allow_retry(url, attempt=retries + 1):
+                    if isinstance(err, asyncio.TimeoutError):
+                        raise CruxClientTimeout(str(err))
+                    raise CruxClientConnectionError(str(err))
+                pause = None  # type: Optional[float]
+                log.debug("Retrying %s %s after error %s", method, url, err)
+            else:
+                overloaded = response.status in OVERLOAD_STATUS_CODES
+                pause = None
+                if limiter is not None:
+                    pause = limiter.release(
+                        token,
+                        overloaded=overloaded,
+                        retry_after=parse_retry_after(
+                            response.headers.get("retry-after")
+                        ),
+                    )
+                failed = response.status in retry_policy.status_forcelist or (
+                    limiter is not None and overloaded
+                )
+                if (
+                    not failed
+                    or not retry
+                    or not retry_policy.allow_retry(url, attempt=retries + 1)
+                ):
+                    return response, retries
+                response.release()
+                log.debug(
+                    "Retrying %s %s after status %s", method, url, response.status
+                )
+
+            retries += 1
+            await asyncio.sleep(
+                pause
+                if pause is not None
+                else retry_policy.backoff(url, attempt=retries)
+            )
+
+    async def api_call(  # pylint: disable=arguments-differ, too-many-branches
+        self,
+        method,  # type: str
+        path,  # type: List[str]
+        model=None,  # type: Any
+        headers=None,  # type: MutableMapping[Text, Text]
+        params=None,  # type: Dict[Any,Any]
+        json=None,  # type: Dict[Any,Any]
+        data=None,  # type: Any
+        stream=False,  # type: bool
+        connect_timeout=9.5,  # type: float
+        read_timeout=60,  # type: float
+    ):
+        # type: (...) -> Any
+        """
+        Requests and Serializes response from API Backend.
+
+        Args:
+            method (str): REST method name.
+            path (str): API resource path.
+            model (crux.models.CruxModel): Deserialization Model. Defaults to None.
+            headers (dict): Additonal header parameters. Defaults to None.
+            json (dict): Body data to be passed with request. Defaults to None.
+            params (dict): Data to be passed in query string. Defaults to None.
+            data: Raw body of the request. Defaults to None.
+            stream (bool): Should be set to True, when response is required to be
+                streamed. The caller then has to release the response.
+                Defaults to False.
+            connect_timeout (float): Request connect timeout configuration in seconds.
+                Defaults to 9.5.
+            read_timeout (float): Request read timeout configuration in seconds.
+                Defaults to 60.
+
+        Returns:
+            crux.models.Model, crux.aio.AsyncResponse, aiohttp.ClientResponse or bool:
+                Serialized response from API backend.
+
+        Raises:
+            TypeError: If Path is not of list type.
+            CruxClientHTTPError: If there is HTTP related error.
+            CruxClientConnectionError: If there is SSL or Proxy related error.
+            CruxClientTimeout: If there is timout related error.
+            CruxResourceNotFoundError: If API has status code 404.
+            CruxAPIError: If API has status code other than 2XX.
+        """
+        if path is None or not isinstance(path, list):
+            raise TypeError("Path cannot be of NoneType. It should be of Type List")
+
+        if method not in ("GET", "DELETE", "PUT", "POST"):
+            raise ValueError("Request Method Type should be in GET, DELETE, PUT, POST")
+
+        url = url_builder(
+            url_base=self.crux_config.api_host,
+            url_prefix=self.crux_config.api_prefix,
+            url_path_list=path,
+        )
+
+        if headers is None:
+            headers = Headers({})
+
+        headers["authorization"] = "Bearer {key}".format(key=self.crux_config.api_key)
+        headers["user-agent"] = self.crux_config.user_agent
+
+        if json is not None and data is None:
+            data = self.crux_config.json_codec.dumps(json)
+            json = None
+            if "content-type" not in headers:
+                headers["content-type"] = "application/json"
+
+        log.trace("Setting request data: %s, json: %s", data, json)
+        log.trace("Setting request params: %s", params)
+
+        metrics = self.metrics
+        endpoint = endpoint_template(path)
+        request_bytes = body_size(data)
+
+        with detached_span(
+            "crux.api_call",
+            method=method,
+            endpoint=endpoint,
+            request_bytes=request_bytes,
+        ) as span:
+            started = monotonic()
+            retries = 0
+
+            def record(status, response_bytes=0):
+                # type: (Optional[int], int) -> None
+                if metrics is not None:
+                    metrics.record_request(
+                        method,
+                        endpoint,
+                        status,
+                        monotonic() - started,
+                        request_bytes=request_bytes,
+                        response_bytes=response_bytes,
+                        retries=retries,
+                    )
+                if span is not None:
+                    span.set_attribute("status", status)
+                    span.set_attribute("response_bytes", response_bytes)
+                    span.increment("retries", retries)
+
+            try:
+                response, retries = await self._send(
+                    method,
+                    url,
+                    headers=headers,
+                    params=_encode_params(params),
+                    json=json,
+                    data=data,
+                    connect_timeout=connect_timeout,
+                    read_timeout=read_timeout,
+                    retry=data is None or isinstance(data, (bytes, str, dict)),
+                    limiter=self.limiter,
+                )
+            except Exception:
+                record(None)
+                raise
+
+            if stream and response.status in (200, 201, 202, 206):
+                record(response.status, response.content_length or 0)
+                return response
+
+            try:
+                content = await response.read()
+            except aiohttp.ClientPayloadError as err:
+                record(response.status)
+                raise CruxClientHTTPError(str(err), response)
+            finally:
+                response.release()
+
+            record(response.status, len(content))
+
+        result = AsyncResponse(
+            response.status, response.headers, content, self.crux_config.json_codec
+        )
+
+        if response.status in (200, 201, 202, 206):
+            if model is None:
+                log.debug("Model is set to None, returning response object")
+                return result
+
+            body = result.json()
+            if isinstance(body, list):
+                log.debug("Response is list of type %s", model)
+                return [model.from_dict(item, connection=self) for item in body]
+
+            log.debug("Response is of type %s", model)
+            return model.from_dict(body, connection=self)
+        elif response.status == 204:
+            log.debug("Response code is 204, returning True boolean value")
+            return True
+        elif response.status == 404:
+            raise CruxResourceNotFoundError(result.json())
+        raise CruxAPIError(result.json())
+
+    async def aclose(self):
+        # type: () -> None
+        """Closes the session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+async def _acquire(limiter):
+    # type: (Optional[AdaptiveLimiter]) -> Optional[int]
+    # AdaptiveLimiter.acquire blocks the thread, the loop polls it instead.
+    if limiter is None:
+        return None
+    while True:
+        token = limiter.try_acquire()
+        if token is not None:
+            return token
+        await asyncio.sleep(LIMITER_POLL_INTERVAL)
+
+
+def _encode_params(params):
+    # type: (Optional[Dict[Any, Any]]) -> Optional[Dict[str, str]]
+    # Unlike requests, aiohttp only accepts strings and numbers in the query
+    # string, None values are dropped as requests does.
+    if not params:
+        return None
+    return {
+        key: str(value).lower() if isinstance(value, bool) else str(value)
+        for key, value in params.items()
+        if value is not None
+    }
@@ -0,0 +1,139 @@
+"""Module contains AsyncCrux object to interact with root APIs from asyncio."""
+
+from typing import List, MutableMapping, Optional, Text, Union  # noqa: F401
+
+from crux._config import CruxConfig
+from crux._retry import RetryPolicy  # noqa: F401 pylint: disable=unused-import
+from crux._utils import Headers
+from crux.aio._client import AsyncCruxClient, DEFAULT_CONNECTION_LIMIT
+from crux.aio.models import (  # noqa: F401 pylint: disable=unused-import
+    AsyncDataset,
+    AsyncFile,
+    AsyncFolder,
+    get_async_resource_object,
+)
+from crux.models import Identity
+
+
+class AsyncCrux(object):
+    """Crux APIs for asyncio applications.
+
+    The coroutines of one AsyncCrux object share a connection pool, so many API
+    calls and transfers can run concurrently on one event loop.
+    """
+
+    def __init__(
+        self,
+        api_key=None,  # type: Optional[str]
+        api_host=None,  # type: str
+        proxies=None,  # type: Optional[MutableMapping[Text, Text]]
+        user_agent=None,  # type: str
+        api_prefix=None,  # type: str
+        only_use_crux_domains=None,  # type: bool
+        signed_url_ttl=None,  # type: float
+        folder_path_ttl=None,  # type: float
+        resource_id_ttl=None,  # type: float
+        json_codec=None,  # type: str
+        connection_limit=DEFAULT_CONNECTION_LIMIT,  # type: int
+        adaptive_concurrency=None,  # type: bool
+        max_concurrency=None,  # type: int
+        retry_policy=None,  # type: RetryPolicy
+        metrics=None,  # type: bool
+    ):
+        # type: (...) -> None
+        crux_config = CruxConfig(
+            api_key=api_key,
+            api_host=api_host,
+            proxies=proxies,
+            user_agent=user_agent,
+            api_prefix=api_prefix,
+            only_use_crux_domains=only_use_crux_domains,
+            signed_url_ttl=signed_url_ttl,
+            folder_path_ttl=folder_path_ttl,
+            resource_id_ttl=resource_id_ttl,
+            json_codec=json_codec,
+            adaptive_concurrency=adaptive_concurrency,
+            max_concurrency=max_concurrency,
+            retry_policy=retry_policy,
+            metrics=metrics,
+        )
+
+        self.api_client = AsyncCruxClient(
+            crux_config=crux_config, connection_limit=connection_limit
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Closes the Connection."""
+        await self.api_client.aclose()
+        self.api_client.close()
+
+    async def whoami(self):
+        # type: () -> Identity
+        """Returns the Identity of Current User.
+
+        Returns:
+            crux.models.Identity: Identity object.
+        """
+        headers = Headers({"accept": "application/json"})
+        return await self.api_client.api_call(
+            "GET", ["identities", "whoami"], model=Identity, headers=headers
+        )
+
+    async def create_dataset(self, name, description=None, tags=None):
+        # type: (str, str, List[str]) -> AsyncDataset
+        """Creates the Dataset.
+
+        Args:
+            name (str): Name of the dataset.
+            description (str): Description of the dataset. Defaults to None.
+            tags (:obj:`list` of :obj:`str`): Tags of the dataset. Defaults to None.
+
+        Returns:
+            crux.aio.AsyncDataset: Dataset object.
+        """
+        raw_model = {"name": name, "description": description, "tags": tags or []}
+        dataset = AsyncDataset(raw_model=raw_model, connection=self.api_client)
+        await dataset.create()
+        return dataset
+
+    async def get_dataset(self, id):  # pylint: disable=redefined-builtin
+        # type: (str) -> AsyncDataset
+        """Fetches the Dataset.
+
+        Args:
+            id (str): Dataset ID which is to be fetched.
+
+        Returns:
+            crux.aio.AsyncDataset: Dataset object
+        """
+        headers = Headers({"accept": "application/json"})
+        return await self.api_client.api_call(
+            "GET", ["datasets", id], model=AsyncDataset, headers=headers
+        )
+
+    async def get_resource(self, id):  # pylint: disable=redefined-builtin
+        # type: (str) -> Union[AsyncFile, AsyncFolder]
+        """Fetches the Resource by ID.
+
+        Args:
+            id (str): Resource ID which is to be fetched.
+
+        Returns:
+            crux.aio.AsyncFile or crux.aio.AsyncFolder: Resource object.
+        """
+        headers = Headers({"accept": "application/json"})
+        response = await self.api_client.api_call(
+            "GET", ["resources", id], headers=headers
+        )
+        raw_resource = response.json()
+        return get_async_resource_object(
+            resource_type=raw_resource.get("type"),
+            data=raw_resource,
+            connection=self.api_client,
+        )
@@ -0,0 +1,814 @@
+"""Module contains the asyncio counterparts of the Dataset and resource models.
+
+The async models share the fields and serialization of the synchronous ones,
+through DatasetFields and ResourceFields, but not their methods. Only the
+coroutines defined here call the API.
+"""
+
+import asyncio
+import os
+import posixpath
+import re
+import time
+from typing import (  # noqa: F401
+    Any,
+    AsyncIterator,
+    Dict,
+    IO,
+    List,
+    Optional,
+    Union,
+)
+
+from crux._pagination import PageSizeTuner
+from crux._utils import (
+    create_logger,
+    DEFAULT_CHUNK_SIZE,
+    Headers,
+    split_posixpath_filename_dirpath,
+    valid_chunk_size,
+)
+from crux.exceptions import (
+    CruxAPIError,
+    CruxClientError,
+    CruxClientHTTPError,
+    CruxResourceNotFoundError,
+)
+from crux.models.dataset import DatasetFields
+from crux.models.file import (
+    parse_upload_session,
+    SIGNED_URL_REJECTED_STATUS_CODES,
+    upload_session_headers,
+)
+from crux.models.resource import MediaType, ResourceFields
+
+
+log = create_logger(__name__)
+
+# Status code of the storage while a resumable upload is incomplete.
+RESUME_INCOMPLETE_STATUS_CODE = 308
+
+_RANGE_HEADER_REGEX = re.compile(r"bytes=0-(\d+)")
+
+
+async def _run_blocking(func, *args):
+    # Runs file system calls in the default executor of the loop.
+    return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+
+class _AsyncResource(ResourceFields):
+    """Resource fields and the coroutines of resources."""
+
+    async def refresh(self):
+        # type: () -> bool
+        """Refresh Resource model from API backend.
+
+        Returns:
+            bool: True, if it is able to refresh the model.
+        """
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+        resource_object = await self.connection.api_call(
+            "GET", ["resources", self.id], headers=headers, model=type(self)
+        )
+        self.raw_model = resource_object.raw_model
+        return True
+
+    async def delete(self):
+        # type: () -> bool
+        """Deletes Resource from Dataset.
+
+        Returns:
+            bool: True if it is deleted.
+        """
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+        deleted = await self.connection.api_call(
+            "DELETE", ["resources", self.id], headers=headers
+        )
+        self._forget_paths()
+        return deleted
+
+    async def resolve_folder(self):
+        # type: () -> str
+        """Fetches the folder of the resource, unless it is already known.
+
+        Afterwards the folder and path properties can be read.
+
+        Returns:
+            str: Folder path of the resource.
+        """
+        folder_id = self.raw_model.get("folderId")
+        if not self._folder and folder_id:
+            self._folder = self.connection.folder_path_cache.get(folder_id)
+
+        if not self._folder:
+            headers = Headers(
+                {"content-type": "application/json", "accept": "application/json"}
+            )
+            response = await self.connection.api_call(
+                "GET", ["resources", self.id, "folderpath"], headers=headers
+            )
+            self._set_folder(response.json().get("path"))
+
+        return self._folder
+
+    def _get_folder(self):
+        raise CruxClientError(
+            "Folder of resource {id} is unknown, await resolve_folder() first".format(
+                id=self.id
+            )
+        )
+
+
+class AsyncFolder(_AsyncResource):
+    """Folder Model whose API calls are coroutines."""
+
+
+class AsyncFile(_AsyncResource):
+    """File Model whose API calls and transfers are coroutines."""
+
+    def _forget_signed_url(self):
+        # type: () -> None
+        """Removes the cached signed URL, which an upload or deletion makes stale."""
+        cache = getattr(self._connection, "signed_url_cache", None)
+        if cache is not None:
+            cache.pop(self.id)
+
+    async def delete(self):
+        # type: () -> bool
+        """Deletes File from Dataset.
+
+        Returns:
+            bool: True if it is deleted.
+        """
+        deleted = await super().delete()
+        self._forget_signed_url()
+        return deleted
+
+    async def _get_signed_url(self, refresh=False):
+        """Gets a signed download URL, reusing the one cached by the connection.
+
+        Args:
+            refresh (bool): True if the cached URL was rejected and a new one
+                should be fetched. Defaults to False.
+
+        Returns:
+            str: Signed URL.
+        """
+        cache = self.connection.signed_url_cache
+
+        if refresh:
+            cache.pop(self.id)
+        else:
+            url = cache.get(self.id)
+            if url:
+                log.debug("Using cached signed url for resource %s", self.id)
+                return url
+
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+        response = await self.connection.api_call(
+            "POST", ["resources", self.id, "content-url"], headers=headers, json={}
+        )
+
+        url = response.json().get("url")
+
+        if not url:
+            raise KeyError(
+                "Signed URL missing in response for resource {id}".format(id=self.id)
+            )
+
+        cache.set(self.id, url)
+
+        return url
+
+    async def _get_signed_response(self):
+        """Sends GET to the signed URL, renewing it once if it has been rejected."""
+        signed_url = await self._get_signed_url()
+        log.trace("Using direct signed url: %s", signed_url)
+        response = await self.connection.request("GET", signed_url)
+
+        if response.status in SIGNED_URL_REJECTED_STATUS_CODES:
+            response.release()
+            log.debug("Signed url rejected for resource %s, fetching new one", self.id)
+            signed_url = await self._get_signed_url(refresh=True)
+            log.trace("New signed url: %s", signed_url)
+            response = await self.connection.request("GET", signed_url)
+
+        if response.status >= 400:
+            response.release()
+            raise CruxClientHTTPError(
+                "{status} error while downloading resource {id}".format(
+                    status=response.status, id=self.id
+                ),
+                response,
+            )
+
+        return response
+
+    async def iter_content(
+        self, chunk_size=DEFAULT_CHUNK_SIZE, only_use_crux_domains=None
+    ):
+        # type: (int, bool) -> AsyncIterator[bytes]
+        """Streams the file resource.
+
+        Args:
+            chunk_size (int): Chunk Size for the stream.
+            only_use_crux_domains (bool): True if content is required to be downloaded
+                from Crux domains else False.
+
+        Yields:
+            bytes: Bytes of file resource.
+
+        Raises:
+            ValueError: If chunk_size is not multiple of 256 KiB.
+        """
+        if not valid_chunk_size(chunk_size):
+            raise ValueError("chunk_size should be multiple of 256 KiB")
+
+        if only_use_crux_domains is None:
+            only_use_crux_domains = self.connection.crux_config.only_use_crux_domains
+
+        if only_use_crux_domains:
+            log.debug("Using Crux Domain for streaming file resource %s", self.id)
+            response = await self.connection.api_call(
+                "GET",
+                ["resources", self.id, "content"],
+                headers=Headers({"accept": "*/*"}),
+                stream=True,
+            )
+        else:
+            log.debug("Using Signed url for streaming file resource %s", self.id)
+            response = await self._get_signed_response()
+
+        try:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+        finally:
+            # Releases the connection back to the pool.
+            response.release()
+
+    async def download(
+        self, dest, chunk_size=DEFAULT_CHUNK_SIZE, only_use_crux_domains=None
+    ):
+        # type: (Union[IO, str], int, bool) -> bool
+        """Downloads the file resource.
+
+        Args:
+            dest (str or file): Local OS path at which file resource will be downloaded.
+            chunk_size (int): Number of bytes to be read in memory.
+            only_use_crux_domains (bool): True if content is required to be downloaded
+                from Crux domains else False.
+
+        Returns:
+            bool: True if it is downloaded.
+
+        Raises:
+            TypeError: If dest is not a file like or string type.
+        """
+        if not valid_chunk_size(chunk_size):
+            raise ValueError("chunk_size should be multiple of 256 KiB")
+
+        if hasattr(dest, "write"):
+            file_obj = dest
+        elif isinstance(dest, str):
+            file_obj = await _run_blocking(open, dest, "wb")
+        else:
+            raise TypeError("Invalid Data Type for dest: {}".format(type(dest)))
+
+        try:
+            # Files created without content have no size and nothing to download.
+            if self.size is not None:
+                async for chunk in self.iter_content(
+                    chunk_size=chunk_size, only_use_crux_domains=only_use_crux_domains
+                ):
+                    await _run_blocking(file_obj.write, chunk)
+        finally:
+            if file_obj is not dest:
+                await _run_blocking(file_obj.close)
+
+        return True
+
+    async def _ul_signed_url_resumable(self, file_obj, media_type):
+        """Uploads with the resumable upload protocol of the storage.
+
+        The upload session is started and completed like File's, only the chunks
+        are sent by the coroutine rather than by google-resumable-media.
+        """
+        headers = upload_session_headers(media_type)
+
+        upload_session_response = await self.connection.api_call(
+            "POST",
+            ["resources", self.id, "upload-session-start"],
+            headers=headers,
+            json={},
+        )
+        log.debug("Fetched upload session url for resource %s", self.id)
+
+        signed_url, signed_url_headers, session_id = parse_upload_session(
+            self.id, upload_session_response.json()
+        )
+
+        start = await _run_blocking(file_obj.tell)
+        total_bytes = await _run_blocking(file_obj.seek, 0, os.SEEK_END) - start
+        await _run_blocking(file_obj.seek, start)
+
+        initiate_headers = Headers(
+            {
+                "content-type": "application/json; charset=UTF-8",
+                "x-upload-content-type": signed_url_headers["content-type"],
+                "x-upload-content-length": str(total_bytes),
+            }
+        )
+        initiate_headers.update(signed_url_headers)
+
+        log.debug("Initiating upload for resource %s", self.id)
+        response = await self.connection.request(
+            "POST", signed_url, headers=initiate_headers, json={"name": self.name}
+        )
+        response.release()
+        if response.status not in (200, 201) or "location" not in response.headers:
+            raise CruxClientError(
+                "Unable to initiate upload of resource {id}, status {status}".format(
+                    id=self.id, status=response.status
+                )
+            )
+        upload_url = response.headers["location"]
+
+        log.debug("Starting upload using signed url for resource %s", self.id)
+
+        offset = 0
+        while True:
+            chunk = await _run_blocking(file_obj.read, DEFAULT_CHUNK_SIZE)
+            if chunk:
+                content_range = "bytes {start}-{end}/{total}".format(
+                    start=offset, end=offset + len(chunk) - 1, total=total_bytes
+                )
+            else:
+                content_range = "bytes */{total}".format(total=total_bytes)
+
+            chunk_headers = Headers({"content-range": content_range})
+            chunk_headers.update(signed_url_headers)
+            response = await self.connection.request(
+                "PUT", upload_url, headers=chunk_headers, data=chunk
+            )
+            response.release()
+
+            if response.status in (200, 201):
+                break
+            if response.status != RESUME_INCOMPLETE_STATUS_CODE:
+                raise CruxClientError(
+                    "Unable to upload resource {id}, status {status}".format(
+                        id=self.id, status=response.status
+                    )
+                )
+
+            # The storage tells how many bytes it has persisted so far.
+            match = _RANGE_HEADER_REGEX.match(response.headers.get("range", ""))
+            persisted = int(match.group(1)) + 1 if match else 0
+            if persisted != offset + len(chunk):
+                await _run_blocking(file_obj.seek, start + persisted)
+            offset = persisted
+
+        log.debug("Upload completed using signed url for resource %s", self.id)
+
+        return await self.connection.api_call(
+            "POST",
+            ["resources", self.id, "upload-session-complete"],
+            headers=headers,
+            json={"sessionId": session_id},
+        )
+
+    async def upload(self, src, media_type=None, only_use_crux_domains=None):
+        # type: (Union[IO, str], str, bool) -> AsyncFile
+        """Uploads the content to empty file resource.
+
+        Args:
+            src (str or file): Local OS path whose content is to be uploaded.
+            media_type (str): Content type of the file. Defaults to None.
+            only_use_crux_domains (bool): True if content is required to be uploaded
+                to Crux domains else False.
+
+        Returns
+            AsyncFile: File model object.
+
+        Raises:
+            TypeError: If src type is invalid.
+        """
+        if hasattr(src, "read"):
+            file_obj = src
+        elif isinstance(src, str):
+            file_obj = await _run_blocking(open, src, "rb")
+        else:
+            raise TypeError("Invalid Data Type for source path: {}".format(type(src)))
+
+        if media_type is None:
+            media_type = MediaType.detect(getattr(file_obj, "name"))
+
+        if only_use_crux_domains is None:
+            only_use_crux_domains = self.connection.crux_config.only_use_crux_domains
+
+        try:
+            if only_use_crux_domains:
+                log.debug("Using Crux Domain for uploading file resource %s", self.id)
+                content = await _run_blocking(file_obj.read)
+                upload_result = await self.connection.api_call(
+                    "PUT",
+                    ["resources", self.id, "content"],
+                    data=content,
+                    headers=Headers(
+                        {"content-type": media_type, "accept": "application/json"}
+                    ),
+                    model=AsyncFile,
+                )
+            else:
+                log.debug("Using Signed url for uploading file resource %s", self.id)
+                upload_result = await self._ul_signed_url_resumable(
+                    file_obj, media_type
+                )
+        finally:
+            # Even a failed upload may have replaced the content.
+            self._forget_signed_url()
+            if file_obj is not src:
+                await _run_blocking(file_obj.close)
+
+        if not upload_result:
+            raise CruxClientError(
+                "Unable to upload file {file_name}".format(file_name=self.name)
+            )
+
+        # Refresh metadata to reflect actual size after uploading the file.
+        await self.refresh()
+        return self
+
+
+def get_async_resource_object(resource_type, data, connection=None):
+    # type: (str, Dict[str, Any], Any) -> Union[AsyncFile, AsyncFolder]
+    """Creates async resource object based on its type.
+
+    Args:
+        resource_type (str): Type of resource which needs to be created.
+        data (dict): Dictionary which contains serialized resource data.
+        connection (AsyncCruxClient): Connection Object. Defaults to None.
+
+    Returns:
+        AsyncFile or AsyncFolder: Resource object.
+
+    Raises:
+        TypeError: If it is unable to detect resource type.
+    """
+    if resource_type == "file":
+        return AsyncFile.from_dict(data, connection=connection)
+    elif resource_type == "folder":
+        return AsyncFolder.from_dict(data, connection=connection)
+    raise TypeError("Invalid Resource Type")
+
+
+class AsyncDataset(DatasetFields):
+    """Dataset Model whose API calls and transfers are coroutines."""
+
+    async def create(self):
+        # type: () -> bool
+        """Creates the Dataset.
+
+        Returns:
+            bool: True if dataset is created.
+        """
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+        dataset_object = await self.connection.api_call(
+            "POST",
+            ["datasets"],
+            json=self.raw_model,
+            model=AsyncDataset,
+            headers=headers,
+        )
+        self.raw_model = dataset_object.raw_model
+        return True
+
+    async def refresh(self):
+        # type: () -> bool
+        """Refresh Dataset model from API backend.
+
+        Returns:
+            bool: True, if it is able to refresh the model.
+        """
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+        dataset_object = await self.connection.api_call(
+            "GET", ["datasets", self.id], headers=headers, model=AsyncDataset
+        )
+        self.raw_model = dataset_object.raw_model
+        return True
+
+    async def _list_resources(
+        self,
+        folder="/",
+        offset=0,
+        limit=1,
+        include_folders=False,
+        name=None,
+        sort=None,
+    ):
+        # type: (str, int, int, bool, str, str) -> List[Union[AsyncFile, AsyncFolder]]
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+
+        params = {
+            "folder": folder,
+            "offset": offset,
+            "limit": limit,
+            "includeFolders": "true" if include_folders else "false",
+        }
+
+        if sort:
+            params["sort"] = sort
+
+        if name:
+            params["name"] = name
+
+        response = await self.connection.api_call(
+            "GET", ["datasets", self.id, "resources"], params=params, headers=headers
+        )
+
+        resources = []
+        for raw_resource in response.json():
+            resource = get_async_resource_object(
+                resource_type=raw_resource.get("type"),
+                data=raw_resource,
+                connection=self.connection,
+            )
+            # Every listed resource lives in the queried folder.
+            resource._set_folder(folder)  # pylint: disable=protected-access
+            resources.append(resource)
+
+        return resources
+
+    async def list_resources(
+        self, folder="/", page_size=100, include_folders=False, sort=None
+    ):
+        # type: (str, int, bool, str) -> AsyncIterator[Union[AsyncFile, AsyncFolder]]
+        """Iterates over the resources of a folder, one page at a time.
+
+        Args:
+            folder (str): Folder for which resource should be listed. Defaults to "/".
+            page_size (int): Number of resources fetched per request. Defaults to 100.
+            include_folders (bool): Sets whether to include folders or not.
+                Defaults to False.
+            sort (str): Sort order of the resources. Defaults to None.
+
+        Yields:
+            AsyncFile or AsyncFolder: Resource objects.
+        """
+        offset = 0
+        while True:
+            page = await self._list_resources(
+                folder=folder,
+                offset=offset,
+                limit=page_size,
+                include_folders=include_folders,
+                sort=sort,
+            )
+            for resource in page:
+                yield resource
+            if len(page) < page_size:
+                return
+            offset += len(page)
+
+    async def _get_resource(self, path, model):
+        """Gets the resource object from the string path.
+
+        Args:
+            path (str): Resource path.
+            model: AsyncFile or AsyncFolder.
+
+        Returns:
+            AsyncFile or AsyncFolder: Resource object.
+
+        Raises:
+            crux.exceptions.CruxResourceNotFoundError: If resource is not found.
+        """
+        resource_name, folder_path = split_posixpath_filename_dirpath(path)
+
+        resource_id = self._cached_resource_id(path)
+        if resource_id:
+            headers = Headers(
+                {"content-type": "application/json", "accept": "application/json"}
+            )
+            try:
+                resource = await self.connection.api_call(
+                    "GET", ["resources", resource_id], headers=headers, model=model
+                )
+            except CruxResourceNotFoundError:
+                resource = None
+
+            # A resource renamed or moved by another client no longer matches
+            # its path.
+            if (
+                resource is not None
+                and resource.name == resource_name
+                and posixpath.normpath(await resource.resolve_folder())
+                == posixpath.normpath(folder_path)
+            ):
+                return resource
+
+            self._resource_id_cache.pop((self.id, posixpath.normpath(path)))
+
+        resources = await self._list_resources(
+            folder=folder_path, limit=1, name=resource_name, include_folders=True
+        )
+
+        if resources:
+            return resources[0]
+        raise CruxResourceNotFoundError({"statusCode": 404, "name": resource_name})
+
+    async def get_file(self, path):
+        # type: (str) -> AsyncFile
+        """Gets the File resource object.
+
+        Args:
+            path (str): File resource path.
+
+        Returns:
+            AsyncFile: File Object.
+        """
+        return await self._get_resource(path=path, model=AsyncFile)
+
+    async def get_folder(self, path):
+        # type: (str) -> AsyncFolder
+        """Gets the Folder resource object.
+
+        Args:
+            path (str): Folder resource path.
+
+        Returns:
+            AsyncFolder: Folder Object.
+        """
+        return await self._get_resource(path=path, model=AsyncFolder)
+
+    async def _create_resource(self, path, resource_type, model, tags, description):
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+
+        resource_name, folder = split_posixpath_filename_dirpath(path)
+
+        raw_model = {
+            "name": resource_name,
+            "type": resource_type,
+            "tags": tags if tags else [],
+            "description": description,
+            "folder": folder,
+        }
+
+        created_resource = await self.connection.api_call(
+            "POST",
+            ["datasets", self.id, "resources"],
+            json=raw_model,
+            model=model,
+            headers=headers,
+        )
+        created_resource._set_folder(folder)  # pylint: disable=protected-access
+        return created_resource
+
+    async def create_file(self, path, tags=None, description=None):
+        # type: (str, List[str], str) -> AsyncFile
+        """Creates File resource in Dataset.
+
+        Args:
+            path (str): Path of the file resource.
+            tags (:obj:`list` of :obj:`str`): Tags of the file resource.
+                Defaults to None.
+            description (str): Description of the file resource.
+                Defaults to None.
+
+        Returns:
+            AsyncFile: File Object.
+        """
+        return await self._create_resource(path, "file", AsyncFile, tags, description)
+
+    async def create_folder(self, path, tags=None, description=None):
+        # type: (str, List[str], str) -> AsyncFolder
+        """Creates Folder resource in Dataset.
+
+        Args:
+            path (str): Path of the Folder resource.
+            tags (:obj:`list` of :obj:`str`): Tags of the Folder resource.
+                Defaults to None.
+            description (str): Description of the Folder resource.
+                Defaults to None.
+
+        Returns:
+            AsyncFolder: Folder Object.
+        """
+        return await self._create_resource(
+            path, "folder", AsyncFolder, tags, description
+        )
+
+    async def upload_file(
+        self,
+        src,
+        dest,
+        media_type=None,
+        description=None,
+        tags=None,
+        only_use_crux_domains=None,
+    ):
+        # type: (Union[IO, str], str, str, str, List[str], bool) -> AsyncFile
+        """Uploads the File.
+
+        Args:
+            src (str or file): Local OS path or file object.
+            dest (str): File resource path.
+            media_type (str): Content type of the file. Defaults to None.
+            description (str): Description of the file. Defaults to None.
+            tags (:obj:`list` of :obj:`str`): Tags to be attached to the file resource.
+            only_use_crux_domains (bool): True if content is required to be uploaded
+                to Crux domains else False.
+
+        Returns:
+            AsyncFile: File Object.
+        """
+        file_resource = await self.create_file(
+            path=dest, tags=tags, description=description
+        )
+
+        try:
+            return await file_resource.upload(
+                src, media_type=media_type, only_use_crux_domains=only_use_crux_domains
+            )
+        except (CruxClientError, CruxAPIError, IOError):
+            await file_resource.delete()
+            raise
+
+    async def find_resources_by_label(
+        self,
+        predicates,  # type: List[Dict[str, Any]]
+        max_per_page=1000,  # type: int
+        auto_page_size=False,  # type: bool
+    ):
+        # type: (...) -> AsyncIterator[Union[AsyncFile, AsyncFolder]]
+        """Searches the resources for given labels in Dataset.
+
+        See crux.models.Dataset.find_resources_by_label for the predicates.
+
+        Args:
+            predicates (:obj:`list` of :obj:`dict`): List of dictionary predicates
+                for finding resources.
+            max_per_page (int): Pagination limit. Defaults to 1000.
+            auto_page_size (bool): If True, max_per_page is only the size of the
+                first page, the next ones are sized from the response time and
+                size of the previous pages. Defaults to False.
+
+        Yields:
+            AsyncFile or AsyncFolder: Resources matching the predicates.
+        """
+        predicates_query = {"basic_query": predicates if predicates else []}
+
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+
+        tuner = PageSizeTuner(max_per_page) if auto_page_size else None
+        query_params = {"limit": max_per_page}  # type: Dict[str, Any]
+
+        while True:
+            if tuner is not None:
+                query_params["limit"] = tuner.page_size
+
+            started_at = time.time()
+            response = await self.connection.api_call(
+                "POST",
+                ["datasets", self.id, "labels", "search"],
+                headers=headers,
+                json=predicates_query,
+                params=query_params,
+            )
+
+            resource_list = response.json().get("results")
+
+            if tuner is not None:
+                tuner.update(
+                    items=len(resource_list or []),
+                    seconds=time.time() - started_at,
+                    size=len(response.content),
+                )
+
+            if not resource_list:
+                return
+
+            for resource in resource_list:
+                yield get_async_resource_object(
+                    resource_type=resource.get("type"),
+                    data=resource,
+                    connection=self.connection,
+                )
+
+            query_params["after"] = resource_list[-1].get("resourceId")
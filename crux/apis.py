@@ -1,9 +1,10 @@
 """Module contains Crux object to interact with root APIs."""
 
-from typing import List, MutableMapping, Optional, Text, Union  # noqa: F401
+from typing import Iterator, List, MutableMapping, Optional, Text, Union  # noqa: F401
 
 from crux._client import CruxClient
 from crux._config import CruxConfig
+from crux._retry import RetryPolicy  # noqa: F401 pylint: disable=unused-import
 from crux._utils import Headers
 from crux.models import Dataset, File, Folder, Identity, Job
 from crux.models._factory import get_resource_object
@@ -20,6 +21,19 @@ class Crux(object):
         user_agent=None,  # type: str
         api_prefix=None,  # type: str
         only_use_crux_domains=None,  # type: bool
+        transfer_pool_connections=None,  # type: int
+        transfer_pool_maxsize=None,  # type: int
+        signed_url_ttl=None,  # type: float
+        folder_path_ttl=None,  # type: float
+        resource_id_ttl=None,  # type: float
+        json_codec=None,  # type: str
+        metadata_cache_size=None,  # type: int
+        metadata_cache_ttl=None,  # type: float
+        single_flight=None,  # type: bool
+        adaptive_concurrency=None,  # type: bool
+        max_concurrency=None,  # type: int
+        retry_policy=None,  # type: RetryPolicy
+        metrics=None,  # type: bool
     ):
         # type: (...) -> None
         crux_config = CruxConfig(
@@ -29,6 +43,19 @@ class Crux(object):
             user_agent=user_agent,
             api_prefix=api_prefix,
             only_use_crux_domains=only_use_crux_domains,
+            transfer_pool_connections=transfer_pool_connections,
+            transfer_pool_maxsize=transfer_pool_maxsize,
+            signed_url_ttl=signed_url_ttl,
+            folder_path_ttl=folder_path_ttl,
+            resource_id_ttl=resource_id_ttl,
+            json_codec=json_codec,
+            metadata_cache_size=metadata_cache_size,
+            metadata_cache_ttl=metadata_cache_ttl,
+            single_flight=single_flight,
+            adaptive_concurrency=adaptive_concurrency,
+            max_concurrency=max_concurrency,
+            retry_policy=retry_policy,
+            metrics=metrics,
         )
 
         self.api_client = CruxClient(crux_config=crux_config)
@@ -166,6 +193,25 @@ class Crux(object):
             "GET", ["datasets", "public"], model=Dataset, headers=headers
         )
 
+    def iter_public_datasets(self):
+        # type: () -> Iterator[Dataset]
+        """Iterates over the public Datasets while their list is received.
+
+        Unlike list_public_datasets, the list isn't held in memory, each Dataset
+        is yielded as soon as it's decoded.
+
+        Yields:
+            crux.models.Dataset: Dataset object.
+        """
+        headers = Headers(
+            {"accept": "application/json"}
+        )  # type: MutableMapping[Text, Text]
+        datasets = self.api_client.api_call(
+            "GET", ["datasets", "public"], model=Dataset, headers=headers, iterate=True
+        )
+        for dataset in datasets:
+            yield dataset
+
     def get_job(self, job_id):
         # type: (str) -> Job
         """Fetches the Job.
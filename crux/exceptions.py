@@ -1,6 +1,6 @@
 """Module contains the set of crux-python's exceptions."""
 
-from typing import Dict, Union  # noqa: F401
+from typing import Any, Dict, List, Union  # noqa: F401
 
 import requests  # pylint: disable=unused-import
 
@@ -88,6 +88,31 @@ class CruxClientTimeout(CruxClientError):
         return "{message}".format(message=self.message)
 
 
+class CruxTransferError(CruxClientError):
+    """Exception should be raised when some transfers of a bulk operation failed."""
+
+    def __init__(self, message, errors, completed):
+        # type: (str, Dict[str, BaseException], List[Any]) -> None
+        """
+        Args:
+            message (str): Human readable string describing the exception.
+            errors (dict): Exception raised for each failed path.
+            completed (list): Results of the transfers which succeeded.
+
+        Attributes:
+            message (str): Human readable string describing the exception.
+            errors (dict): Exception raised for each failed path.
+            completed (list): Results of the transfers which succeeded.
+        """
+        super(CruxTransferError, self).__init__(message)
+        self.message = message
+        self.errors = errors
+        self.completed = completed
+
+    def __str__(self):
+        return "{message}".format(message=self.message)
+
+
 class CruxResourceNotFoundError(CruxAPIError):
     """Exception which should be raised when Crux Resource is not found."""
 
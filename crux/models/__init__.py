@@ -1,20 +1,28 @@
 """
 Module containing models that represent objects returned by the API.
+
+The models are imported on first use, see crux._lazy.
 """
 
 import logging
 from logging import NullHandler
+from typing import TYPE_CHECKING
+
+from crux._lazy import lazy_exports
 
-from crux.models.dataset import Dataset
-from crux.models.delivery import Delivery
-from crux.models.file import File
-from crux.models.folder import Folder
-from crux.models.identity import Identity
-from crux.models.ingestion import Ingestion
-from crux.models.job import Job, StitchJob
-from crux.models.label import Label
-from crux.models.permission import Permission
-from crux.models.resource import Resource
+if TYPE_CHECKING:  # pragma: no cover
+    from crux.models.compact import CompactResource  # noqa: F401
+    from crux.models.dataset import Dataset  # noqa: F401
+    from crux.models.delivery import Delivery  # noqa: F401
+    from crux.models.file import File  # noqa: F401
+    from crux.models.folder import Folder  # noqa: F401
+    from crux.models.identity import Identity  # noqa: F401
+    from crux.models.ingestion import Ingestion  # noqa: F401
+    from crux.models.job import Job, StitchJob  # noqa: F401
+    from crux.models.label import Label  # noqa: F401
+    from crux.models.permission import Permission  # noqa: F401
+    from crux.models.resource import Resource  # noqa: F401
+    from crux.models.resource_table import ResourceTable  # noqa: F401
 
 
 __all__ = (
@@ -23,6 +31,8 @@ __all__ = (
     "StitchJob",
     "Job",
     "Resource",
+    "CompactResource",
+    "ResourceTable",
     "File",
     "Folder",
     "Dataset",
@@ -31,5 +41,24 @@ __all__ = (
     "Ingestion",
 )
 
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "CompactResource": "crux.models.compact",
+        "Dataset": "crux.models.dataset",
+        "Delivery": "crux.models.delivery",
+        "File": "crux.models.file",
+        "Folder": "crux.models.folder",
+        "Identity": "crux.models.identity",
+        "Ingestion": "crux.models.ingestion",
+        "Job": "crux.models.job",
+        "Label": "crux.models.label",
+        "Permission": "crux.models.permission",
+        "Resource": "crux.models.resource",
+        "ResourceTable": "crux.models.resource_table",
+        "StitchJob": "crux.models.job",
+    },
+)
+
 # Set default logging handler to avoid "No handler found" warnings
 logging.getLogger(__name__).addHandler(NullHandler())
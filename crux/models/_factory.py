@@ -1,12 +1,33 @@
 """Module contains functions to create Resource objects."""
 
-from typing import Any, Dict, Union  # noqa: F401
+from typing import Any, Dict, Optional, Type, Union  # noqa: F401
 
 from crux._client import CruxClient
 from crux.models.file import File
 from crux.models.folder import Folder
 
 
+def get_resource_model(resource_type):
+    # type: (Optional[str]) -> Union[Type[File], Type[Folder]]
+    """Returns the model of a resource type.
+
+    Args:
+        resource_type (str): Type of the resource.
+
+    Returns:
+        type: crux.models.File or crux.models.Folder.
+
+    Raises:
+        TypeError: If it is unable to detect resource type.
+    """
+    if resource_type == "file":
+        return File
+    elif resource_type == "folder":
+        return Folder
+    else:
+        raise TypeError("Invalid Resource Type")
+
+
 def get_resource_object(resource_type, data, connection=None):
     # type: (str, Dict[str, Any], CruxClient) -> Union[File, Folder]
     """Creates resource object based on its type.
@@ -22,9 +43,4 @@ def get_resource_object(resource_type, data, connection=None):
     Raises:
         TypeError: If it is unable to detect resource type.
     """
-    if resource_type == "file":
-        return File.from_dict(data, connection=connection)
-    elif resource_type == "folder":
-        return Folder.from_dict(data, connection=connection)
-    else:
-        raise TypeError("Invalid Resource Type")
+    return get_resource_model(resource_type).from_dict(data, connection=connection)
@@ -0,0 +1,310 @@
+"""Module contains CompactResource, the compact record of a listed resource."""
+
+import posixpath
+from typing import Any, Dict, Mapping, Optional, Union  # noqa: F401
+
+from crux._client import CruxClient  # noqa: F401 pylint: disable=unused-import
+from crux._compat import intern_string
+from crux._mapping import copy_json, ReadOnlyDict
+from crux._utils import create_logger
+from crux.models._factory import get_resource_object
+from crux.models.file import File  # noqa: F401 pylint: disable=unused-import
+from crux.models.folder import Folder  # noqa: F401 pylint: disable=unused-import
+from crux.models.resource import cache_resource_path
+
+
+log = create_logger(__name__)
+
+# Fields stored in slots, by raw model key. The other keys of the raw model are
+# kept in a tuple of pairs, which is only allocated when the API returns them.
+_FIELDS = (
+    ("resourceId", "_id"),
+    ("name", "_name"),
+    ("type", "_type"),
+    ("datasetId", "_dataset_id"),
+    ("folderId", "_folder_id"),
+    ("mediaType", "_media_type"),
+    ("size", "_size"),
+    ("createdAt", "_created_at"),
+    ("modifiedAt", "_modified_at"),
+    ("description", "_description"),
+    ("storageId", "_storage_id"),
+    ("tags", "_tags"),
+    ("labels", "_labels"),
+)
+
+_SLOT_KEYS = frozenset(key for key, _ in _FIELDS)
+
+# Fields shared by many resources, a single copy of each value is kept.
+_INTERNED_FIELDS = frozenset(("type", "datasetId", "folderId", "mediaType"))
+
+# Marks the fields missing from the raw model.
+_MISSING = object()
+
+# Stand for the empty lists and dicts of the raw model, which are only
+# allocated again when the raw model is built.
+_EMPTY_LIST = object()
+_EMPTY_DICT = object()
+
+
+def _pack(value):
+    # type: (Any) -> Any
+    if value == [] and isinstance(value, list):
+        return _EMPTY_LIST
+    if value == {} and isinstance(value, dict):
+        return _EMPTY_DICT
+    return value
+
+
+def _unpack(value):
+    # type: (Any) -> Any
+    if value is _EMPTY_LIST:
+        return []
+    if value is _EMPTY_DICT:
+        return {}
+    return value
+
+
+def _set_expanded(key):
+    # Setting a field expands the record, the full model then holds the value.
+    def set_field(self, value):
+        self.expand().raw_model[key] = value
+
+    return set_field
+
+
+def _field(key, slot, doc, settable=False):
+    # type: (str, str, str, bool) -> property
+    def get(self):
+        if self._model is not None:
+            return self._model.raw_model[key]
+        value = getattr(self, slot)
+        if value is _MISSING:
+            raise KeyError(key)
+        return _unpack(value)
+
+    return property(get, _set_expanded(key) if settable else None, doc=doc)
+
+
+class CompactResource(object):
+    """Compact record of a listed resource.
+
+    The fields of the raw model are stored in slots rather than in a dict, the
+    values shared by many resources, such as the Dataset ID, the folder ID and
+    the media type, are interned and empty lists and dicts aren't allocated.
+
+    The record expands into a File or Folder, which it then delegates to, the
+    first time a method or attribute of the full model is used, for example
+    download or update. The raw model dict is only built by raw_model and to_dict.
+
+    Records aren't instances of Resource, File or Folder, code checking the
+    class of resources with isinstance should check the record's expand().
+    """
+
+    __slots__ = tuple(slot for _, slot in _FIELDS) + (
+        "_extra",
+        "_folder",
+        "_connection",
+        "_model",
+    )
+
+    def __init__(self, raw_model=None, connection=None):
+        # type: (Dict[str, Any], CruxClient) -> None
+        """
+        Attributes:
+            raw_model (dict): Resource raw dictionary. Defaults to None.
+            connection (CruxClient): Connection Object. Defaults to None.
+        """
+        raw_model = raw_model if raw_model is not None else {}
+        for key, slot in _FIELDS:
+            value = raw_model.get(key, _MISSING)
+            if key in _INTERNED_FIELDS:
+                value = intern_string(value)
+            setattr(self, slot, _pack(value))
+
+        self._extra = (
+            tuple(
+                (key, _pack(value))
+                for key, value in raw_model.items()
+                if key not in _SLOT_KEYS
+            )
+            or None
+        )
+        self._folder = None  # type: Optional[str]
+        self._connection = connection
+        self._model = None  # type: Optional[Union[File, Folder]]
+
+    @classmethod
+    def from_dict(cls, a_dict, connection=None):
+        # type: (Dict[str, Any], CruxClient) -> CompactResource
+        """Returns the record created from raw model dict.
+
+        Args:
+            a_dict (dict): Model dict.
+            connection (CruxClient): Connection object. Defaults to None.
+
+        Returns:
+            crux.models.CompactResource: Record of the resource.
+        """
+        return cls(raw_model=a_dict, connection=connection)
+
+    def __getstate__(self):
+        # The markers of missing and empty values can't be copied, the raw
+        # model is copied instead.
+        return {
+            "raw_model": self.raw_model,
+            "folder": self._folder,
+            "connection": self._connection,
+            "model": self._model,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(state["raw_model"], connection=state["connection"])
+        self._folder = state["folder"]
+        self._model = state["model"]
+
+    def __getattr__(self, name):
+        # Only reached for the attributes missing from the record, which come
+        # from the full model.
+        if name.startswith("__") or name in CompactResource.__slots__:
+            raise AttributeError(name)
+        return getattr(self.expand(), name)
+
+    id = _field("resourceId", "_id", "str: Gets the Resource ID.")
+    name = _field("name", "_name", "str: Gets the Resource Name.", settable=True)
+    type = _field("type", "_type", "str: Gets the Resource Type.")
+    dataset_id = _field("datasetId", "_dataset_id", "str: Gets the Dataset ID.")
+    folder_id = _field(
+        "folderId", "_folder_id", "str: Gets the Folder ID.", settable=True
+    )
+    media_type = _field("mediaType", "_media_type", "str: Gets the Media type.")
+    size = _field("size", "_size", "int: Gets the size.")
+    created_at = _field("createdAt", "_created_at", "str: Gets created_at.")
+    modified_at = _field("modifiedAt", "_modified_at", "str: Gets modified_at.")
+    description = _field(
+        "description",
+        "_description",
+        "str: Gets the Resource Description.",
+        settable=True,
+    )
+    storage_id = _field("storageId", "_storage_id", "str: Gets the Storage ID.")
+    tags = _field(
+        "tags",
+        "_tags",
+        ":obj:`list` of :obj:`str`: Gets the Resource Tags.",
+        settable=True,
+    )
+
+    @property
+    def labels(self):
+        """dict: Gets the Resource labels."""
+        if self._model is not None:
+            return self._model.labels
+        if self._labels is _MISSING:
+            raise KeyError("labels")
+        return {
+            label["labelKey"]: label["labelValue"] for label in _unpack(self._labels)
+        }
+
+    @property
+    def connection(self):
+        """CruxClient: API connection client."""
+        if self._connection is None:
+            return self.expand().connection
+        return self._connection
+
+    @property
+    def folder(self):
+        """str: Compute or Get the folder name."""
+        if self._model is not None:
+            return self._model.folder
+        if self._folder:
+            return self._folder
+
+        folder_path_cache = getattr(self._connection, "folder_path_cache", None)
+        if folder_path_cache is not None and self._folder_id is not _MISSING:
+            self._folder = folder_path_cache.get(self._folder_id)
+            if self._folder:
+                return self._folder
+
+        return self.expand().folder
+
+    @property
+    def path(self):
+        """str: Compute or Get the resource path."""
+        return posixpath.join(self.folder, self.name)
+
+    @property
+    def raw_model(self):
+        """dict: Raw model of the resource, built from the record."""
+        if self._model is not None:
+            return self._model.raw_model
+
+        raw_model = {}  # type: Dict[str, Any]
+        for key, slot in _FIELDS:
+            value = getattr(self, slot)
+            if value is not _MISSING:
+                raw_model[key] = _unpack(value)
+        if self._extra is not None:
+            for key, value in self._extra:
+                raw_model[key] = _unpack(value)
+        return raw_model
+
+    def to_dict(self, copy=True):  # pylint: disable=redefined-outer-name
+        # type: (bool) -> Mapping[str, Any]
+        """Returns dict copy of raw model.
+
+        Args:
+            copy (bool): If False, a read-only view of the raw model is returned
+                instead of a copy. Defaults to True.
+
+        Returns:
+            dict: Raw model dict.
+        """
+        if not copy:
+            return ReadOnlyDict(self.raw_model)
+        return copy_json(self.raw_model)
+
+    def expand(self):
+        # type: () -> Union[File, Folder]
+        """Returns the full model of the resource, creating it on first use.
+
+        Later reads of the record are delegated to the full model, so its updates
+        are seen through the record.
+
+        Returns:
+            crux.models.File or crux.models.Folder: Full model of the resource.
+        """
+        if self._model is None:
+            log.debug("Expanding compact record of resource %s", self._id)
+            model = get_resource_object(
+                resource_type=self._type,
+                data=self.raw_model,
+                connection=self._connection,
+            )
+            model._folder = self._folder  # pylint: disable=protected-access
+            self._model = model
+        return self._model
+
+    def _set_folder(self, folder):
+        # type: (str) -> None
+        if self._model is not None:
+            self._model._set_folder(folder)  # pylint: disable=protected-access
+            return
+
+        self._folder = folder
+        cache_resource_path(
+            self._connection,
+            folder,
+            name=None if self._name is _MISSING else self._name,
+            resource_id=None if self._id is _MISSING else self._id,
+            resource_type=self._type,
+            folder_id=None if self._folder_id is _MISSING else self._folder_id,
+            dataset_id=None if self._dataset_id is _MISSING else self._dataset_id,
+        )
+
+    def __repr__(self):
+        # type: () -> str
+        return "CompactResource({name!r}, id={id!r})".format(
+            name=self._name, id=self._id
+        )
@@ -1,30 +1,48 @@
 """Module contains Dataset model."""
 
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import (
+    as_completed,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
 import os
 import posixpath
+import time
 from typing import (
+    Callable,
     DefaultDict,
     Dict,
     IO,
     Iterator,
     List,
     MutableMapping,
+    Optional,
     Set,
     Text,
     Tuple,
     Union,
 )  # noqa: F401
 
-from crux._compat import unicode
+from crux._compat import scandir, unicode
+from crux._concurrency import ByteBudget
+from crux._pagination import PageSizeTuner, prefetch as prefetch_pages
 from crux._utils import (
     create_logger,
     DELIVERY_ID_REGEX,
     Headers,
     split_posixpath_filename_dirpath,
 )
-from crux.exceptions import CruxAPIError, CruxClientError, CruxResourceNotFoundError
+from crux.exceptions import (
+    CruxAPIError,
+    CruxClientError,
+    CruxResourceNotFoundError,
+    CruxTransferError,
+)
 from crux.models._factory import get_resource_object
+from crux.models.compact import CompactResource
 from crux.models.delivery import Delivery
 from crux.models.file import File
 from crux.models.folder import Folder
@@ -34,13 +52,15 @@ from crux.models.label import Label
 from crux.models.model import CruxModel
 from crux.models.permission import Permission
 from crux.models.resource import Resource
+from crux.models.resource_table import ResourceTable
+from crux.tracing import bind, set_attributes, traced
 
 
 log = create_logger(__name__)
 
 
-class Dataset(CruxModel):
-    """Dataset Model."""
+class DatasetFields(CruxModel):
+    """Fields of a dataset, shared by Dataset and the models of crux.aio."""
 
     @property
     def id(self):
@@ -114,6 +134,21 @@ class Dataset(CruxModel):
         """str: Compute or Get the provenance."""
         return self.raw_model["provenance"]
 
+    @property
+    def _resource_id_cache(self):
+        return getattr(self.connection, "resource_id_cache", None)
+
+    def _cached_resource_id(self, path):
+        # type: (str) -> Optional[str]
+        resource_id_cache = self._resource_id_cache
+        if resource_id_cache is None:
+            return None
+        return resource_id_cache.get((self.id, posixpath.normpath(path)))
+
+
+class Dataset(DatasetFields):
+    """Dataset Model."""
+
     def create(self):
         # type: () -> bool
         """Creates the Dataset.
@@ -234,13 +269,15 @@ class Dataset(CruxModel):
 
         file_resource = File(raw_model=raw_model)
 
-        return self.connection.api_call(
+        created_resource = self.connection.api_call(
             "POST",
             ["datasets", self.id, "resources"],
             json=file_resource.raw_model,
             model=File,
             headers=headers,
         )
+        created_resource._set_folder(folder)  # pylint: disable=protected-access
+        return created_resource
 
     def create_folder(self, path, folder="/", tags=None, description=None):
         # type: (str, str, List[str], str) -> Folder
@@ -277,17 +314,23 @@ class Dataset(CruxModel):
 
         folder_resource = Folder(raw_model=raw_model)
 
-        return self.connection.api_call(
+        created_resource = self.connection.api_call(
             "POST",
             ["datasets", self.id, "resources"],
             json=folder_resource.raw_model,
             model=Folder,
             headers=headers,
         )
+        created_resource._set_folder(folder)  # pylint: disable=protected-access
+        return created_resource
 
     def _get_resource(self, path, model):
         """Gets the resource object from the string path.
 
+        If the resource ID of the path is cached, the resource is fetched by ID
+        and its name and folder are checked against the path, else it is looked
+        up with a listing of its folder.
+
         Args:
             path (str): Resource path.
             crux.models.Resource: Resource model.
@@ -299,6 +342,32 @@ class Dataset(CruxModel):
             crux.exceptions.CruxResourceNotFoundError: If resource is not found.
         """
         resource_name, folder_path = split_posixpath_filename_dirpath(path)
+
+        resource_id = self._cached_resource_id(path)
+        if resource_id:
+            headers = Headers(
+                {"content-type": "application/json", "accept": "application/json"}
+            )
+            try:
+                resource = self.connection.api_call(
+                    "GET", ["resources", resource_id], headers=headers, model=model
+                )
+            except CruxResourceNotFoundError:
+                resource = None
+
+            # A resource renamed or moved by another client no longer matches
+            # its path.
+            if (
+                resource is not None
+                and resource.name == resource_name
+                and posixpath.normpath(resource.folder)
+                == posixpath.normpath(folder_path)
+            ):
+                return resource
+
+            log.debug("Cached ID %s of resource %s is stale", resource_id, path)
+            self._resource_id_cache.pop((self.id, posixpath.normpath(path)))
+
         rsrc_list = self._list_resources(
             folder=folder_path,
             limit=1,
@@ -314,6 +383,21 @@ class Dataset(CruxModel):
             # hence raising the 404 error from the Python client
             raise CruxResourceNotFoundError({"statusCode": 404, "name": resource_name})
 
+    def _get_resource_id(self, path):
+        # type: (str) -> str
+        """Gets the resource ID of a path, from the cache when it still matches.
+
+        Args:
+            path (str): Resource path.
+
+        Returns:
+            str: Resource ID.
+
+        Raises:
+            crux.exceptions.CruxResourceNotFoundError: If resource is not found.
+        """
+        return self._get_resource(path=path, model=Resource).id
+
     def _resource_exists(self, path):
         # type: (str) -> bool
         """Checks the existence of resource.
@@ -328,11 +412,63 @@ class Dataset(CruxModel):
             crux.exceptions.CruxResourceNotFoundError: If resource is not found.
         """
         try:
-            self._get_resource(path=path, model=Resource)
+            self._get_resource_id(path=path)
             return True
         except CruxResourceNotFoundError:
             return False
 
+    def resolve_paths(self, paths):
+        # type: (List[str]) -> Dict[str, str]
+        """Resolves resource paths to resource IDs.
+
+        Paths are looked up with one listing per parent folder, which also
+        caches the IDs of the other resources of the folder. A path alone in its
+        folder is resolved like get_file, from its cached ID when it still
+        matches.
+
+        Args:
+            paths (:obj:`list` of :obj:`str`): Resource paths.
+
+        Returns:
+            dict: Resource IDs keyed by path.
+
+        Raises:
+            crux.exceptions.CruxResourceNotFoundError: If a resource is not found.
+        """
+        resource_ids = {}  # type: Dict[str, str]
+        by_folder = defaultdict(list)  # type: DefaultDict[str, List[Tuple[str, str]]]
+
+        for path in paths:
+            resource_name, folder_path = split_posixpath_filename_dirpath(path)
+            by_folder[folder_path].append((path, resource_name))
+
+        for folder_path, folder_paths in by_folder.items():
+            if len(folder_paths) == 1:
+                path, _ = folder_paths[0]
+                resource_ids[path] = self._get_resource(path=path, model=Resource).id
+                continue
+
+            log.debug(
+                "Listing folder %s to resolve %s paths", folder_path, len(folder_paths)
+            )
+            resources = self._list_resources(
+                folder=folder_path,
+                offset=0,
+                limit=None,
+                include_folders=True,
+                model=Resource,
+                iterate=True,
+            )
+            ids_by_name = {resource.name: resource.id for resource in resources}
+            for path, resource_name in folder_paths:
+                if resource_name not in ids_by_name:
+                    raise CruxResourceNotFoundError(
+                        {"statusCode": 404, "name": resource_name}
+                    )
+                resource_ids[path] = ids_by_name[resource_name]
+
+        return resource_ids
+
     def get_file(self, path):
         # type: (str) -> File
         """Gets the File resource object.
@@ -358,9 +494,16 @@ class Dataset(CruxModel):
         return self._get_resource(path=path, model=Folder)
 
     def list_resources(
-        self, folder="/", offset=0, limit=1, include_folders=False, sort=None
+        self,
+        folder="/",  # type: str
+        offset=0,  # type: int
+        limit=1,  # type: int
+        include_folders=False,  # type: bool
+        sort=None,  # type: str
+        compact=False,  # type: bool
+        as_table=False,  # type: bool
     ):
-        # type: (str, int, int, bool, str) -> Resource
+        # type: (...) -> Union[List[Resource], ResourceTable]
         """Lists the resources in Dataset.
 
         Args:
@@ -372,29 +515,210 @@ class Dataset(CruxModel):
                 Defaults to False.
             sort (str): Sets whether to sort or not.
                 Defaults to None.
+            compact (bool): If True, resources are listed as
+                :obj:`crux.models.CompactResource` records, which take a fraction
+                of the memory of Resource objects.
+                Records aren't Resource, File or Folder instances, so
+                isinstance checks fail for them, expand() returns their model.
+                Defaults to False.
+            as_table (bool): If True, resources are returned as a
+                :obj:`crux.models.ResourceTable`. Defaults to False.
 
         Returns:
-            list (:obj:`crux.models.Resource`): List of File resource objects.
+            list (:obj:`crux.models.Resource`): List of File resource objects,
+                or :obj:`crux.models.ResourceTable` if as_table is True.
         """
+        if as_table:
+            return ResourceTable.from_resources(
+                self._list_resources(
+                    sort=sort,
+                    folder=folder,
+                    offset=offset,
+                    limit=limit,
+                    include_folders=include_folders,
+                    model=Resource,
+                    iterate=True,
+                ),
+                connection=self.connection,
+            )
+
         return self._list_resources(
             sort=sort,
             folder=folder,
             offset=offset,
             limit=limit,
             include_folders=include_folders,
-            model=Resource,
+            model=CompactResource if compact else Resource,
         )
 
-    def download_files(self, folder, local_path, only_use_crux_domains=None):
-        # type: (str, str, bool) -> List[str]
+    def iter_resources(  # pylint: disable=too-many-arguments
+        self,
+        folder="/",
+        page_size=100,
+        prefetch=1,
+        include_folders=False,
+        sort=None,
+        compact=False,
+    ):
+        # type: (str, int, int, bool, str, bool) -> Iterator[Resource]
+        """Iterates over all the resources of a folder, page by page.
+
+        The next pages are fetched in the background while the current one is
+        being processed, so at most prefetch + 2 pages are held in memory.
+
+        Args:
+            folder (str): Folder for which resource should be listed.
+                Defaults to /.
+            page_size (int): Number of resources fetched per request.
+                Defaults to 100.
+            prefetch (int): Number of pages fetched ahead of the caller.
+                0 fetches a page only once the previous one is consumed.
+                Defaults to 1.
+            include_folders (bool): Sets whether to include folders or not.
+                Defaults to False.
+            sort (str): Sets whether to sort or not.
+                Defaults to None.
+            compact (bool): If True, resources are yielded as
+                :obj:`crux.models.CompactResource` records.
+                Records aren't Resource, File or Folder instances, so
+                isinstance checks fail for them, expand() returns their model.
+                Defaults to False.
+
+        Yields:
+            crux.models.Resource: Resource object.
+
+        Raises:
+            ValueError: If page_size is less than 1.
+        """
+        if page_size < 1:
+            raise ValueError("page_size should be greater than 0")
+
+        def pages():
+            offset = 0
+            while True:
+                page = self._list_resources(
+                    sort=sort,
+                    folder=folder,
+                    offset=offset,
+                    limit=page_size,
+                    include_folders=include_folders,
+                    model=CompactResource if compact else Resource,
+                )
+                if page:
+                    yield page
+                if len(page) < page_size:
+                    return
+                offset += len(page)
+
+        for page in prefetch_pages(pages(), depth=prefetch):
+            for resource in page:
+                yield resource
+
+    def walk(self, top="/", workers=1, onerror=None):
+        # type: (str, int, Callable) -> Iterator[Tuple[str, List[Folder], List[File]]]
+        """Walks the folder tree of the Dataset like os.walk.
+
+        Folders are listed by a pool of threads, so the order in which they are
+        yielded is not deterministic, but a folder is always yielded before its
+        subfolders. As with os.walk, removing entries from the yielded folders
+        list stops the walk from descending into them. The folder of every
+        yielded resource is set from the walk, so its path is known without
+        further API calls.
+
+        Args:
+            top (str): Folder from where the walk starts. Defaults to "/".
+            workers (int): Number of folders listed concurrently. Defaults to 1.
+            onerror (callable): Called with the folder path and the exception when
+                a folder can't be listed, the walk then continues with the other
+                folders. Defaults to None, which raises the exception.
+
+        Yields:
+            tuple: Folder path, list of its :obj:`crux.models.Folder`
+                and list of its :obj:`crux.models.File`.
+
+        Raises:
+            ValueError: If workers is less than 1.
+        """
+        if workers < 1:
+            raise ValueError("workers should be greater than 0")
+
+        def list_folder(folder_path):
+            resources = self._list_resources(
+                sort=None,
+                folder=folder_path,
+                offset=0,
+                limit=None,
+                include_folders=True,
+                model=Resource,
+                iterate=True,
+            )
+            folders = []  # type: List[Folder]
+            files = []  # type: List[File]
+            for resource in resources:
+                obj = resource.cast()
+                obj._set_folder(folder_path)  # pylint: disable=protected-access
+                if isinstance(obj, Folder):
+                    folders.append(obj)
+                else:
+                    files.append(obj)
+            return folders, files
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {executor.submit(list_folder, top): top}  # type: Dict[Future, str]
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        folder_path = pending.pop(future)
+                        try:
+                            folders, files = future.result()
+                        except (CruxClientError, CruxAPIError) as err:
+                            if onerror is None:
+                                raise
+                            onerror(folder_path, err)
+                            continue
+
+                        yield folder_path, folders, files
+
+                        # Subfolders are submitted after the yield, so that the
+                        # caller can prune them like with os.walk.
+                        for sub_folder in folders:
+                            sub_folder_path = posixpath.join(folder_path, sub_folder.name)
+                            pending[
+                                executor.submit(list_folder, sub_folder_path)
+                            ] = sub_folder_path
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    @traced("crux.dataset.download_files")
+    def download_files(
+        self,
+        folder,
+        local_path,
+        only_use_crux_domains=None,
+        workers=None,
+        max_bytes_in_flight=None,
+    ):
+        # type: (str, str, bool, int, int) -> List[str]
         """Downloads the resources recursively.
 
+        The files of a folder are downloaded while it is listed, its
+        subfolders are downloaded once its listing ends.
+
         Args:
             folder (str): Crux Dataset Folder from where the
                 file resources should be recursively downloaded.
             local_path (str): Local OS Path where the file resources should be downloaded.
             only_use_crux_domains (bool): True if content is required to be downloaded
                 from Crux domains else False.
+            workers (int): Number of files to download concurrently. If it is set,
+                folders are listed concurrently with walk and a failed file does not stop
+                the remaining downloads. Defaults to None, which downloads
+                the files one at a time.
+            max_bytes_in_flight (int): Upper bound on the total size of files being
+                downloaded at the same time. Only used with workers.
+                Defaults to None.
 
         Returns:
             list (:obj:`str`): List of location of download files.
@@ -402,6 +726,8 @@ class Dataset(CruxModel):
         Raises:
             ValueError: If Folder or local_path is None.
             OSError: If local_path is an invalid directory location.
+            crux.exceptions.CruxTransferError: If workers is set and some of the
+                files could not be downloaded.
         """
         if folder is None:
             raise ValueError("Folder value shouldn't be empty")
@@ -412,7 +738,19 @@ class Dataset(CruxModel):
         if not os.path.exists(local_path) and not os.path.isdir(local_path):
             raise OSError("local_path is an invalid directory location")
 
+        set_attributes(dataset_id=self.id, folder=folder)
+
+        if workers is not None:
+            return self._download_files_concurrently(
+                folder=folder,
+                local_path=local_path,
+                only_use_crux_domains=only_use_crux_domains,
+                workers=workers,
+                max_bytes_in_flight=max_bytes_in_flight,
+            )
+
         local_file_list = []  # type: List[str]
+        subfolders = []  # type: List[Tuple[str, str]]
 
         resources = self._list_resources(
             sort=None,
@@ -421,31 +759,109 @@ class Dataset(CruxModel):
             limit=None,
             include_folders=True,
             model=Resource,
+            iterate=True,
         )
 
+        # Files are downloaded as they are listed, only the paths of the
+        # subfolders are kept until the listing ends.
         for resource in resources:
             resource_path = posixpath.join(folder, resource.name)
             resource_local_path = os.path.join(local_path, resource.name)
             if resource.type == "folder":
-                os.mkdir(resource_local_path)
-                log.debug("Created local directory %s", resource_local_path)
-                local_file_list += self.download_files(
-                    folder=resource_path,
-                    local_path=resource_local_path,
-                    only_use_crux_domains=only_use_crux_domains,
-                )
+                subfolders.append((resource_path, resource_local_path))
             elif resource.type == "file":
-                file_resource = File.from_dict(
-                    resource.to_dict(), connection=self.connection
-                )
+                file_resource = resource.cast(File)
                 file_resource.download(
                     resource_local_path, only_use_crux_domains=only_use_crux_domains
                 )
                 local_file_list.append(resource_local_path)
                 log.debug("Downloaded file at %s", resource_local_path)
 
+        for resource_path, resource_local_path in subfolders:
+            os.mkdir(resource_local_path)
+            log.debug("Created local directory %s", resource_local_path)
+            local_file_list += self.download_files(
+                folder=resource_path,
+                local_path=resource_local_path,
+                only_use_crux_domains=only_use_crux_domains,
+            )
+
+        return local_file_list
+
+    def _download_files_concurrently(
+        self, folder, local_path, only_use_crux_domains, workers, max_bytes_in_flight
+    ):
+        # type: (str, str, Optional[bool], int, Optional[int]) -> List[str]
+        if workers < 1:
+            raise ValueError("workers should be greater than 0")
+
+        budget = ByteBudget(max_bytes=max_bytes_in_flight)
+        local_file_list = []  # type: List[str]
+        errors = {}  # type: Dict[str, BaseException]
+        futures = {}  # type: Dict[Future, str]
+
+        @bind
+        def download(file_resource, resource_local_path):
+            try:
+                file_resource.download(
+                    resource_local_path, only_use_crux_domains=only_use_crux_domains
+                )
+                log.debug("Downloaded file at %s", resource_local_path)
+            finally:
+                budget.release(file_resource.size)
+
+        def get_local_path(folder_path):
+            relative_path = posixpath.relpath(folder_path, folder)
+            if relative_path == ".":
+                return local_path
+            return os.path.join(local_path, *relative_path.split("/"))
+
+        def on_list_error(folder_path, err):
+            log.debug("Unable to list folder %s: %s", folder_path, err)
+            errors[get_local_path(folder_path)] = err
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for folder_path, folders, files in self.walk(
+                top=folder, workers=workers, onerror=on_list_error
+            ):
+                folder_local_path = get_local_path(folder_path)
+
+                for folder_resource in folders:
+                    resource_local_path = os.path.join(
+                        folder_local_path, folder_resource.name
+                    )
+                    os.mkdir(resource_local_path)
+                    log.debug("Created local directory %s", resource_local_path)
+
+                for file_resource in files:
+                    resource_local_path = os.path.join(
+                        folder_local_path, file_resource.name
+                    )
+                    # Blocks the walk until enough bytes are released,
+                    # so the queue of pending downloads stays bounded.
+                    budget.acquire(file_resource.size)
+                    future = executor.submit(download, file_resource, resource_local_path)
+                    futures[future] = resource_local_path
+                    local_file_list.append(resource_local_path)
+
+            for future in as_completed(futures):
+                err = future.exception()
+                if err is not None:
+                    log.debug("Unable to download file %s: %s", futures[future], err)
+                    errors[futures[future]] = err
+
+        if errors:
+            raise CruxTransferError(
+                "Unable to download {count} resource(s) from folder {folder}".format(
+                    count=len(errors), folder=folder
+                ),
+                errors=errors,
+                completed=[path for path in local_file_list if path not in errors],
+            )
+
         return local_file_list
 
+    @traced("crux.dataset.upload_files")
     def upload_files(
         self,
         local_path,
@@ -454,8 +870,9 @@ class Dataset(CruxModel):
         description=None,
         tags=None,
         only_use_crux_domains=None,
+        workers=None,
     ):
-        # type: (str, str, str, str, List[str], bool) -> List[File]
+        # type: (str, str, str, str, List[str], bool, int) -> List[File]
         """Uploads the resources recursively.
 
         Args:
@@ -470,6 +887,11 @@ class Dataset(CruxModel):
                 Defaults to None.
             only_use_crux_domains (bool): True if content is required to be downloaded
                 from Crux domains else False.
+            workers (int): Number of files to upload concurrently. If it is set,
+                folders are created while the local tree is scanned, files are
+                uploaded as soon as their folder exists and a failed file does
+                not stop the remaining uploads. Defaults to None, which uploads
+                the files one at a time.
 
         Returns:
             list (:obj:`crux.models.File`): List of uploaded file objects.
@@ -477,6 +899,8 @@ class Dataset(CruxModel):
         Raises:
             ValueError: If folder or local_path is None.
             OSError: If local_path is an invalid directory location.
+            crux.exceptions.CruxTransferError: If workers is set and some of the
+                files could not be uploaded.
         """
         tags = tags if tags else []
 
@@ -491,6 +915,19 @@ class Dataset(CruxModel):
         if not os.path.exists(local_path) and not os.path.isdir(local_path):
             raise OSError("local_path is an invalid directory location")
 
+        set_attributes(dataset_id=self.id, folder=folder)
+
+        if workers is not None:
+            return self._upload_files_concurrently(
+                local_path=local_path,
+                folder=folder,
+                media_type=media_type,
+                description=description,
+                tags=tags,
+                only_use_crux_domains=only_use_crux_domains,
+                workers=workers,
+            )
+
         for content in os.listdir(local_path):
             content_local_path = os.path.join(local_path, content)
             content_path = posixpath.join(folder, content)
@@ -522,6 +959,90 @@ class Dataset(CruxModel):
 
         return uploaded_file_objects
 
+    def _upload_files_concurrently(  # pylint: disable=too-many-locals
+        self,
+        local_path,  # type: str
+        folder,  # type: str
+        media_type,  # type: Optional[str]
+        description,  # type: Optional[str]
+        tags,  # type: Optional[List[str]]
+        only_use_crux_domains,  # type: Optional[bool]
+        workers,  # type: int
+    ):
+        # type: (...) -> List[File]
+        if workers < 1:
+            raise ValueError("workers should be greater than 0")
+
+        errors = {}  # type: Dict[str, BaseException]
+        futures = []  # type: List[Tuple[Future, str]]
+
+        @bind
+        def upload(content_local_path, content_path):
+            file_object = self.upload_file(
+                content_local_path,
+                content_path,
+                media_type=media_type,
+                tags=tags,
+                description=description,
+                only_use_crux_domains=only_use_crux_domains,
+            )
+            log.debug("Uploaded file %s in dataset %s", content_path, self.id)
+            return file_object
+
+        pending_folders = deque([(local_path, folder)])
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # The scan runs in this thread and hands files to the pool as it goes,
+            # so uploads start before the whole tree has been scanned. A folder is
+            # created when it is found, before any of its contents are submitted.
+            while pending_folders:
+                folder_local_path, folder_path = pending_folders.popleft()
+
+                # Read to its end, which closes the directory before the
+                # folders are created.
+                entries = list(scandir(folder_local_path))
+                for entry in entries:
+                    content_path = posixpath.join(folder_path, entry.name)
+                    if entry.is_dir():
+                        try:
+                            self.create_folder(
+                                path=content_path, tags=tags, description=description
+                            )
+                        except (CruxClientError, CruxAPIError) as err:
+                            log.debug("Unable to create folder %s: %s", content_path, err)
+                            errors[entry.path] = err
+                            continue
+                        log.debug(
+                            "Created folder %s in dataset %s", content_path, self.id
+                        )
+                        pending_folders.append((entry.path, content_path))
+                    elif entry.is_file():
+                        future = executor.submit(upload, entry.path, content_path)
+                        futures.append((future, entry.path))
+
+        uploaded_file_objects = []  # type: List[File]
+
+        for future, content_local_path in futures:
+            upload_error = future.exception()
+            if upload_error is None:
+                uploaded_file_objects.append(future.result())
+            else:
+                log.debug(
+                    "Unable to upload file %s: %s", content_local_path, upload_error
+                )
+                errors[content_local_path] = upload_error
+
+        if errors:
+            raise CruxTransferError(
+                "Unable to upload {count} path(s) from {local_path}".format(
+                    count=len(errors), local_path=local_path
+                ),
+                errors=errors,
+                completed=uploaded_file_objects,
+            )
+
+        return uploaded_file_objects
+
     def list_files(self, sort=None, folder="/", offset=0, limit=100):
         # type: (str, str, int, int) -> List[File]
         """Lists the files.
@@ -561,6 +1082,7 @@ class Dataset(CruxModel):
         name=None,
         model=None,
         sort=None,
+        iterate=False,
     ):
 
         headers = Headers(
@@ -580,14 +1102,34 @@ class Dataset(CruxModel):
         else:
             params["includeFolders"] = "false"
 
-        return self.connection.api_call(
+        resources = self.connection.api_call(
             "GET",
             ["datasets", self.id, "resources"],
             params=params,
             model=model,
             headers=headers,
+            iterate=iterate,
         )
 
+        if model is None:
+            return resources
+
+        # Every listed resource lives in the queried folder.
+        if iterate:
+
+            def set_folders():
+                for resource in resources:
+                    resource._set_folder(folder)  # pylint: disable=protected-access
+                    yield resource
+
+            return set_folders()
+
+        for resource in resources:
+            resource._set_folder(folder)  # pylint: disable=protected-access
+
+        return resources
+
+    @traced("crux.dataset.upload_file")
     def upload_file(
         self,
         src,
@@ -615,6 +1157,8 @@ class Dataset(CruxModel):
         """
         tags = tags if tags else []
 
+        set_attributes(dataset_id=self.id, path=dest)
+
         file_resource = self.create_file(tags=tags, description=description, path=dest)
 
         try:
@@ -674,12 +1218,8 @@ class Dataset(CruxModel):
                     permission,
                     identity_id,
                 )
-                resource_ids = list()
-                for resource_path in resource_paths:
-                    resource_object = self._get_resource(
-                        path=resource_path, model=Resource
-                    )
-                    resource_ids.append(resource_object.id)
+                resolved_ids = self.resolve_paths(resource_paths)
+                resource_ids = [resolved_ids[path] for path in resource_paths]
                 body["resourceIds"] = resource_ids
 
             if resource_objects:
@@ -761,12 +1301,8 @@ class Dataset(CruxModel):
                     permission,
                     identity_id,
                 )
-                resource_ids = list()
-                for resource_path in resource_paths:
-                    resource_object = self._get_resource(
-                        path=resource_path, model=Resource
-                    )
-                    resource_ids.append(resource_object.id)
+                resolved_ids = self.resolve_paths(resource_paths)
+                resource_ids = [resolved_ids[path] for path in resource_paths]
                 body["resourceIds"] = resource_ids
 
             if resource_objects:
@@ -913,8 +1449,16 @@ class Dataset(CruxModel):
             model=Label,
         )
 
-    def find_resources_by_label(self, predicates, max_per_page=1000):
-        # type: (List[Dict[str,str]],int)->Iterator[Union[File,Folder]]
+    def find_resources_by_label(  # pylint: disable=too-many-arguments
+        self,
+        predicates,  # type: List[Dict[str, str]]
+        max_per_page=1000,  # type: int
+        prefetch=0,  # type: int
+        auto_page_size=False,  # type: bool
+        compact=False,  # type: bool
+        as_table=False,  # type: bool
+    ):
+        # type: (...) -> Union[Iterator[Union[File, Folder]], ResourceTable]
         """Method which searches the resouces for given labels in Dataset
 
         Each predicate can be either:
@@ -954,9 +1498,25 @@ class Dataset(CruxModel):
             predicates (:obj:`list` of :obj:`dict`): List of dictionary predicates
                 for finding resources.
             max_per_page (int): Pagination limit. Defaults to 1000.
+            prefetch (int): Number of pages fetched in the background while the
+                current page is being consumed. Defaults to 0.
+            auto_page_size (bool): If True, max_per_page is only the size of the
+                first page, the next ones are sized from the response time and
+                size of the previous pages. Defaults to False.
+            compact (bool): If True, resources are yielded as
+                :obj:`crux.models.CompactResource` records.
+                Records aren't Resource, File or Folder instances, so
+                isinstance checks fail for them, expand() returns their model.
+                Defaults to False.
+            as_table (bool): If True, all the pages are fetched and returned as a
+                :obj:`crux.models.ResourceTable`. Defaults to False.
 
         Returns:
-            list (:obj:`crux.models.Resource`): List of resource matching the query parameters.
+            iterator (:obj:`crux.models.Resource`): Resources matching the query
+                parameters, or :obj:`crux.models.ResourceTable` if as_table is True.
+                The search requests are sent, and their errors raised, while the
+                iterator is consumed, except with as_table, which searches before
+                returning.
 
         Example:
             .. code-block:: python
@@ -975,42 +1535,82 @@ class Dataset(CruxModel):
 
         predicates = predicates if predicates else []
 
-        query_params = {"limit": max_per_page}
-
         predicates_query = {
             "basic_query": predicates
         }  # type: Dict[str, List[Dict[str,str]]]
 
-        after = None
         headers = Headers(
             {"content-type": "application/json", "accept": "application/json"}
         )
 
-        while True:
+        tuner = PageSizeTuner(max_per_page) if auto_page_size else None
 
-            if after:
-                query_params["after"] = after
+        def pages():
+            query_params = {"limit": max_per_page}
+            after = None
 
-            response = self.connection.api_call(
-                "POST",
-                ["datasets", self.id, "labels", "search"],
-                headers=headers,
-                json=predicates_query,
-                params=query_params,
-            )
+            while True:
+
+                if after:
+                    query_params["after"] = after
+
+                if tuner is not None:
+                    query_params["limit"] = tuner.page_size
+
+                started_at = time.time()
+                response = self.connection.api_call(
+                    "POST",
+                    ["datasets", self.id, "labels", "search"],
+                    headers=headers,
+                    json=predicates_query,
+                    params=query_params,
+                )
 
-            resource_list = response.json().get("results")
-            if resource_list:
-                after = resource_list[-1].get("resourceId")
+                resource_list = response.json().get("results")
+
+                if tuner is not None:
+                    tuner.update(
+                        items=len(resource_list or []),
+                        seconds=time.time() - started_at,
+                        size=len(response.content),
+                    )
+
+                if resource_list:
+                    after = resource_list[-1].get("resourceId")
+                    yield resource_list
+                else:
+                    return
+
+        if as_table:
+            table = ResourceTable(connection=self.connection)
+            # Search results have no folder path, it's read once per folder.
+            folders = {}  # type: Dict[Optional[str], str]
+            for resource_list in prefetch_pages(pages(), depth=prefetch):
                 for resource in resource_list:
+                    folder_id = resource.get("folderId")
+                    if folder_id not in folders:
+                        folders[folder_id] = Resource(
+                            raw_model=resource, connection=self.connection
+                        ).folder
+                    table.append(resource, folder=folders[folder_id])
+            return table
+
+        def resources():
+            for resource_list in prefetch_pages(pages(), depth=prefetch):
+                for resource in resource_list:
+                    if compact:
+                        yield CompactResource.from_dict(
+                            resource, connection=self.connection
+                        )
+                        continue
                     obj = get_resource_object(
                         resource_type=resource.get("type"),
                         data=resource,
                         connection=self.connection,
                     )
                     yield obj
-            else:
-                return
+
+        return resources()
 
     def stitch(
         self,
@@ -1043,36 +1643,40 @@ class Dataset(CruxModel):
         headers = Headers(
             {"content-type": "application/json", "accept": "application/json"}
         )
-        source_resource_ids = list()
+        source_paths = list()
         for resource in source_resources:
             if isinstance(resource, File):
                 log.debug("Stitch source resources are of type crux.models.File")
-                source_resource_ids.append(resource.id)
             elif isinstance(resource, (str, unicode)):
                 log.debug("Stitch source resources are of type string")
-                resource_object = self._get_resource(path=resource, model=File)
-                source_resource_ids.append(resource_object.id)
+                source_paths.append(resource)
             else:
                 raise TypeError(
                     "Invalid Type. It should be File resource object or path string"
                 )
 
+        resolved_ids = self.resolve_paths(source_paths) if source_paths else {}
+        source_resource_ids = [
+            resource.id if isinstance(resource, File) else resolved_ids[resource]
+            for resource in source_resources
+        ]
+
         if isinstance(destination_resource, File):
             log.debug("Stitch destination resource is of type crux.models.File")
-            destination_file_object = destination_resource
+            destination_resource_id = destination_resource.id
         elif isinstance(destination_resource, str):
             log.debug("Stitch destination resource is of type string")
-            if self._resource_exists(path=destination_resource):
-                destination_file_object = self._get_resource(
-                    path=destination_resource, model=File
+            try:
+                destination_resource_id = self._get_resource_id(
+                    path=destination_resource
                 )
-            else:
+            except CruxResourceNotFoundError:
                 log.debug("Creating file resource at %s", destination_resource)
-                destination_file_object = self.create_file(
+                destination_resource_id = self.create_file(
                     path=destination_resource,
                     description=description,
                     tags=tags if tags else [],
-                )
+                ).id
         else:
             raise TypeError(
                 "Invalid Type. It should be File resource object or path string"
@@ -1080,7 +1684,7 @@ class Dataset(CruxModel):
 
         data = {
             "sourceResourceIds": source_resource_ids,
-            "destinationResourceId": destination_file_object.id,
+            "destinationResourceId": destination_resource_id,
             "labelsToApply": labels if labels else {},
         }
         response = self.connection.api_call(
@@ -1,15 +1,10 @@
 """Module contains File model."""
 
-from typing import Any, Dict, IO, Iterable, List, Union  # noqa: F401
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+import threading
+from typing import Any, Dict, IO, Iterable, Iterator, List, Tuple, Union  # noqa: F401
 
-from google.resumable_media.common import (  # type: ignore
-    DataCorruption,
-    InvalidResponse,
-)
-from google.resumable_media.requests import (  # type: ignore
-    ChunkedDownload,
-    ResumableUpload,
-)
+from requests import Response  # noqa: F401 pylint: disable=unused-import
 from requests.exceptions import (
     ConnectTimeout,
     HTTPError,
@@ -19,13 +14,12 @@ from requests.exceptions import (
     TooManyRedirects,
 )
 
+from crux._cache import monotonic
 from crux._compat import unicode
 from crux._utils import (
     create_logger,
     DEFAULT_CHUNK_SIZE,
-    get_session,
     Headers,
-    ResumableUploadSignedSession,
     valid_chunk_size,
 )
 from crux.exceptions import (
@@ -36,15 +30,39 @@ from crux.exceptions import (
     CruxClientTooManyRedirects,
 )
 from crux.models.resource import MediaType, Resource
+from crux.tracing import bind, increment, set_attributes, traced
 
 
 log = create_logger(__name__)
 
+# Status codes of storage responses to expired or otherwise invalid signed URLs.
+SIGNED_URL_REJECTED_STATUS_CODES = (400, 403)
+
 
 class File(Resource):
     """File Model."""
 
-    def _get_signed_url(self):
+    def _get_signed_url(self, refresh=False):
+        """Gets a signed download URL, reusing the one cached by the connection.
+
+        Args:
+            refresh (bool): True if the cached URL was rejected and a new one
+                should be fetched. Defaults to False.
+
+        Returns:
+            str: Signed URL.
+        """
+        cache = self.connection.signed_url_cache
+
+        if refresh:
+            cache.pop(self.id)
+            increment("signed_url_refreshes")
+        else:
+            url = cache.get(self.id)
+            if url:
+                log.debug("Using cached signed url for resource %s", self.id)
+                return url
+
         headers = Headers(
             {"content-type": "application/json", "accept": "application/json"}
         )
@@ -59,24 +77,58 @@ class File(Resource):
                 "Signed URL missing in response for resource {id}".format(id=self.id)
             )
 
+        cache.set(self.id, url)
+
         return url
 
-    def _dl_signed_url(self, file_obj, chunk_size=DEFAULT_CHUNK_SIZE):
-        """Download from signed URL using requests directly, not google-resumable-media."""
-        signed_url = self._get_signed_url()
+    def _forget_signed_url(self):
+        # type: () -> None
+        """Removes the cached signed URL, which an upload or deletion makes stale."""
+        cache = getattr(self._connection, "signed_url_cache", None)
+        if cache is not None:
+            cache.pop(self.id)
 
-        log.trace("Using direct signed url: %s", signed_url)
+    def delete(self):
+        # type: () -> bool
+        """Deletes File from Dataset.
 
-        transport = get_session(proxies=self.connection.crux_config.proxies)
+        Returns:
+            bool: True if it is deleted.
+        """
+        deleted = super(File, self).delete()
+        self._forget_signed_url()
+        return deleted
+
+    def _get_signed_response(self, stream=True):
+        """Sends GET to the signed URL, renewing it once if it has been rejected."""
+        transport = self.connection.crux_config.transport
 
         log.debug("Using Proxies %s for downloading", transport.proxies)
 
+        signed_url = self._get_signed_url()
+        log.trace("Using direct signed url: %s", signed_url)
+        response = transport.session.get(signed_url, stream=stream)
+
+        if response.status_code in SIGNED_URL_REJECTED_STATUS_CODES:
+            response.close()
+            log.debug("Signed url rejected for resource %s, fetching new one", self.id)
+            signed_url = self._get_signed_url(refresh=True)
+            log.trace("New signed url: %s", signed_url)
+            response = transport.session.get(signed_url, stream=stream)
+
+        return response
+
+    def _dl_signed_url(self, file_obj, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Download from signed URL using requests directly, not google-resumable-media."""
         try:
-            with transport as session:
-                response = session.get(signed_url, stream=True)
+            response = self._get_signed_response(stream=True)
+            try:
                 response.raise_for_status()
                 for chunk in response.iter_content(chunk_size=chunk_size):
                     file_obj.write(chunk)
+            finally:
+                # Releases the connection back to the pool.
+                response.close()
         except HTTPError as err:
             raise CruxClientHTTPError(str(err), err.response)
         except TooManyRedirects as err:
@@ -94,10 +146,48 @@ class File(Resource):
 
         log.trace("Using resumable signed url: %s", signed_url)
 
-        transport = get_session(proxies=self.connection.crux_config.proxies)
+        transport = self.connection.crux_config.transport
 
         log.debug("Using Proxies %s for downloading", transport.proxies)
 
+        log.debug("Starting download using signed url for resource %s", self.id)
+
+        self._dl_signed_url_range(
+            file_obj, signed_url, transport.session, chunk_size=chunk_size
+        )
+
+        log.debug("Download completed using signed url for resource %s", self.id)
+
+        return True
+
+    def _dl_signed_url_range(  # pylint: disable=too-many-arguments
+        self,
+        file_obj,
+        signed_url,
+        transport,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        start=0,
+        end=None,
+    ):
+        """Download a byte range from signed URL, fetching a new URL when it expires.
+
+        Args:
+            file_obj (file): File like object positioned where the range is written.
+            signed_url (str): Signed URL to start downloading from.
+            transport (requests.Session): Session used for the download.
+            chunk_size (int): Number of bytes requested at a time.
+            start (int): First byte of the range. Defaults to 0.
+            end (int): Last byte of the range, inclusive.
+                Defaults to None, which downloads until the end of the file.
+        """
+        # pylint: disable=import-outside-toplevel
+        # google-resumable-media is imported on first use, not with crux.
+        from google.resumable_media.common import (  # type: ignore
+            DataCorruption,
+            InvalidResponse,
+        )
+        from google.resumable_media.requests import ChunkedDownload  # type: ignore
+
         # Track how many bytes the client has downloaded since the last time they
         # got a new signed URL, and how many times that got a new URL without
         # downloading more bytes.
@@ -110,9 +200,9 @@ class File(Resource):
         max_url_refreshes_without_progress = 5
         max_url_refreshes = 100
 
-        download = ChunkedDownload(signed_url, chunk_size, file_obj)
-
-        log.debug("Starting download using signed url for resource %s", self.id)
+        download = ChunkedDownload(
+            signed_url, chunk_size, file_obj, start=start, end=end
+        )
 
         while not download.finished:
             try:
@@ -129,7 +219,7 @@ class File(Resource):
                 if not sum_total_bytes_from_urls > bytes_at_last_refresh:
                     # Limit new URLs without making progress downloading
                     if refreshes_without_progress <= max_url_refreshes_without_progress:
-                        new_signed_url = self._get_signed_url()
+                        new_signed_url = self._get_signed_url(refresh=True)
                         fetched_signed_urls += 1
                         log.debug(
                             "fetched_signed_urls count for download is %s",
@@ -150,7 +240,7 @@ class File(Resource):
                 else:
                     refreshes_without_progress = 0
                     log.debug("Fetching new singed url")
-                    new_signed_url = self._get_signed_url()
+                    new_signed_url = self._get_signed_url(refresh=True)
                     log.trace("New signed url: %s", new_signed_url)
                     fetched_signed_urls += 1
                     log.debug(
@@ -165,19 +255,79 @@ class File(Resource):
                 log.debug(
                     "Resuming download with new_signed_url %s starting at %s bytes",
                     new_signed_url,
-                    sum_total_bytes_from_urls,
+                    start + sum_total_bytes_from_urls,
                 )
                 download = ChunkedDownload(
                     new_signed_url,
                     chunk_size,
                     file_obj,
-                    start=sum_total_bytes_from_urls,
+                    start=start + sum_total_bytes_from_urls,
+                    end=end,
                 )
             except DataCorruption as err:
                 raise CruxClientError(err)
 
-        # Closing the session as it is not closed by Resumable Media Lib.
-        transport.close()
+        return True
+
+    def _dl_signed_url_ranged(
+        self, file_obj, connections, chunk_size=DEFAULT_CHUNK_SIZE
+    ):
+        """Download from signed URL over several connections, one byte range each."""
+        signed_url = self._get_signed_url()
+
+        log.trace("Using ranged signed url: %s", signed_url)
+
+        # Each range is a whole number of chunks, so every request but the last
+        # one of the file asks for exactly chunk_size bytes.
+        chunks = -(-self.size // chunk_size)
+        range_size = -(-chunks // connections) * chunk_size
+        ranges = [
+            (start, min(start + range_size, self.size) - 1)
+            for start in range(0, self.size, range_size)
+        ]
+
+        # Ranges are written after the current position, like the single
+        # connection downloads write from it.
+        base = file_obj.tell()
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        transport = self.connection.crux_config.transport
+
+        @bind
+        def download_range(start, end):
+            return self._dl_signed_url_range(
+                _OffsetWriter(file_obj, base + start, lock, stop),
+                signed_url,
+                transport.session,
+                chunk_size=chunk_size,
+                start=start,
+                end=end,
+            )
+
+        log.debug(
+            "Starting download of %s ranges using signed url for resource %s",
+            len(ranges),
+            self.id,
+        )
+
+        # There is no point in more threads than pooled connections.
+        workers = min(len(ranges), transport.pool_maxsize)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(download_range, start, end) for start, end in ranges
+            ]
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            if not_done:
+                # A range failed, the others are cancelled or stopped at their
+                # next chunk instead of being downloaded for nothing.
+                stop.set()
+                for future in not_done:
+                    future.cancel()
+            for future in done:
+                future.result()
+
+        file_obj.seek(base + self.size)
         log.debug("Download completed using signed url for resource %s", self.id)
 
         return True
@@ -218,14 +368,16 @@ class File(Resource):
 
         log.debug("Using Resumable Signed url for streaming file resource %s", self.id)
 
-        signed_url = self._get_signed_url()
-        session = get_session(proxies=self.connection.crux_config.proxies)
-        data = session.get(signed_url, stream=True)
+        data = self._get_signed_response(stream=True)
 
-        return data.iter_content(chunk_size=chunk_size)
+        return _iter_and_close(data, chunk_size=chunk_size)
 
     def _download_file(
-        self, file_obj, chunk_size=DEFAULT_CHUNK_SIZE, only_use_crux_domains=None
+        self,
+        file_obj,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        only_use_crux_domains=None,
+        connections=None,
     ):
 
         # If size is None it means the file has been created,
@@ -259,6 +411,14 @@ class File(Resource):
                 "Using Direct Signed url for downloading file resource %s", self.id
             )
             return self._dl_signed_url(file_obj=file_obj, chunk_size=chunk_size)
+        # Split large files in byte ranges downloaded over several connections
+        elif connections is not None and connections > 1:
+            log.debug(
+                "Using Ranged Signed url for downloading file resource %s", self.id
+            )
+            return self._dl_signed_url_ranged(
+                file_obj=file_obj, connections=connections, chunk_size=chunk_size
+            )
         # Use google-resumable-media for large files
         else:
             log.debug(
@@ -268,8 +428,15 @@ class File(Resource):
                 file_obj=file_obj, chunk_size=chunk_size
             )
 
-    def download(self, dest, chunk_size=DEFAULT_CHUNK_SIZE, only_use_crux_domains=None):
-        # type: (str, int, bool) -> bool
+    @traced("crux.file.download")
+    def download(
+        self,
+        dest,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        only_use_crux_domains=None,
+        connections=None,
+    ):
+        # type: (str, int, bool, int) -> bool
         """Downloads the file resource.
 
         Args:
@@ -277,6 +444,11 @@ class File(Resource):
             chunk_size (int): Number of bytes to be read in memory.
             only_use_crux_domains (bool): True if content is required to be downloaded
                 from Crux domains else False.
+            connections (int): Number of connections used to download byte ranges
+                of a large file concurrently, at most the transfer_pool_maxsize of
+                the connection. A file like dest should be seekable, the file is
+                written from its current position.
+                Defaults to None, which downloads over a single connection.
 
         Returns:
             bool: True if it is downloaded.
@@ -287,29 +459,41 @@ class File(Resource):
         if not valid_chunk_size(chunk_size):
             raise ValueError("chunk_size should be multiple of 256 KiB")
 
+        set_attributes(resource_id=self.id, bytes=self.size or 0)
+        started = monotonic()
+
         if hasattr(dest, "write"):
-            return self._download_file(
-                dest, chunk_size=chunk_size, only_use_crux_domains=only_use_crux_domains
+            downloaded = self._download_file(
+                dest,
+                chunk_size=chunk_size,
+                only_use_crux_domains=only_use_crux_domains,
+                connections=connections,
             )
         elif isinstance(dest, (str, unicode)):
             with open(dest, "wb") as file_obj:
-                return self._download_file(
+                downloaded = self._download_file(
                     file_obj,
                     chunk_size=chunk_size,
                     only_use_crux_domains=only_use_crux_domains,
+                    connections=connections,
                 )
         else:
             raise TypeError("Invalid Data Type for dest: {}".format(type(dest)))
 
+        if downloaded:
+            self._record_transfer("download", self.size or 0, started)
+        return downloaded
+
+    @traced("crux.file.upload_signed_url")
     def _ul_signed_url_resumable(self, file_obj, media_type):
+        # pylint: disable=import-outside-toplevel
+        # google-resumable-media is imported on first use, not with crux.
+        from google.resumable_media.common import InvalidResponse  # type: ignore
+        from google.resumable_media.requests import ResumableUpload  # type: ignore
 
-        headers = Headers(
-            {
-                "content-type": "application/json",
-                "accept": "application/json",
-                "x-upload-content-type": media_type,
-            }
-        )
+        set_attributes(resource_id=self.id)
+
+        headers = upload_session_headers(media_type)
 
         upload_session_response = self.connection.api_call(
             "POST",
@@ -319,49 +503,18 @@ class File(Resource):
         )
         log.debug("Fetched upload session url for resource %s", self.id)
 
-        upload_response_json = upload_session_response.json()
-
-        signed_url = upload_response_json.get("signedURL").get("url")
-        if not signed_url:
-            raise KeyError(
-                "Signed URL missing in response for resource {id}".format(id=self.id)
-            )
-
-        log.trace("Using Resumable upload signed url: %s", signed_url)
-
-        signed_url_headers = Headers(
-            upload_response_json.get("signedURL").get("headers")
+        signed_url, signed_url_headers, session_id = parse_upload_session(
+            self.id, upload_session_response.json()
         )
 
-        log.trace("Signed url headers: %s", signed_url_headers)
-
-        if not signed_url_headers:
-            raise KeyError(
-                "Signed URL Headers missing in response for resource {id}".format(
-                    id=self.id
-                )
-            )
-
-        session_id = upload_response_json.get("sessionId")
-
-        if not session_id:
-            raise KeyError(
-                "sessionId Header missing in response for resource {id}".format(
-                    id=self.id
-                )
-            )
-
         upload = ResumableUpload(signed_url, DEFAULT_CHUNK_SIZE)
 
         metadata = {"name": self.name}
 
-        transport = get_session(
-            session_class=ResumableUploadSignedSession,
-            proxies=self.connection.crux_config.proxies,
+        transport = self.connection.crux_config.transport.signed_session(
+            signed_url_headers
         )
 
-        transport.headers = signed_url_headers
-
         log.debug("Using Proxies %s for uploading", transport.proxies)
 
         log.debug("Initiating upload for resource %s", self.id)
@@ -380,6 +533,8 @@ class File(Resource):
         except InvalidResponse as err:
             raise CruxClientError(err)
 
+        set_attributes(bytes=upload.bytes_uploaded)
+
         log.debug("Upload completed using signed url for resource %s", self.id)
 
         payload = {"sessionId": session_id}
@@ -392,6 +547,25 @@ class File(Resource):
 
     def _upload(self, file_obj, media_type, only_use_crux_domains=None):
 
+        started = monotonic()
+        offset = _tell(file_obj)
+
+        try:
+            uploaded = self._upload_content(
+                file_obj, media_type, only_use_crux_domains=only_use_crux_domains
+            )
+        finally:
+            # Even a failed upload may have replaced the content.
+            self._forget_signed_url()
+
+        end = _tell(file_obj)
+        if uploaded and offset is not None and end is not None:
+            set_attributes(bytes=end - offset)
+            self._record_transfer("upload", end - offset, started)
+        return uploaded
+
+    def _upload_content(self, file_obj, media_type, only_use_crux_domains=None):
+
         if only_use_crux_domains is None:
             only_use_crux_domains = self.connection.crux_config.only_use_crux_domains
 
@@ -412,6 +586,13 @@ class File(Resource):
             log.debug("Using Signed url for uploading file resource %s", self.id)
             return self._ul_signed_url_resumable(file_obj, media_type)
 
+    def _record_transfer(self, direction, size, started):
+        # type: (str, int, float) -> None
+        metrics = getattr(self.connection, "metrics", None)
+        if metrics is not None:
+            metrics.record_transfer(direction, size, monotonic() - started)
+
+    @traced("crux.file.upload")
     def upload(self, src, media_type=None, only_use_crux_domains=None):
         # type: (Union[IO, str], str, bool) -> File
         """Uploads the content to empty file resource.
@@ -428,6 +609,7 @@ class File(Resource):
         Raises:
             TypeError: If src type is invalid.
         """
+        set_attributes(resource_id=self.id)
 
         if hasattr(src, "read"):
 
@@ -467,3 +649,114 @@ class File(Resource):
                     file_name=self.name, path=self.path
                 )
             )
+
+
+def upload_session_headers(media_type):
+    # type: (str) -> Headers
+    """Returns the headers of the API calls starting and completing an upload.
+
+    Args:
+        media_type (str): Content type of the uploaded file.
+
+    Returns:
+        crux._utils.Headers: Request headers.
+    """
+    return Headers(
+        {
+            "content-type": "application/json",
+            "accept": "application/json",
+            "x-upload-content-type": media_type,
+        }
+    )
+
+
+def parse_upload_session(resource_id, session):
+    # type: (str, Dict[str, Any]) -> Tuple[str, Headers, str]
+    """Reads the response of the API call starting an upload session.
+
+    Args:
+        resource_id (str): ID of the uploaded resource.
+        session (dict): Decoded response of upload-session-start.
+
+    Returns:
+        tuple: Signed URL of the resumable upload, headers to send with its
+            requests and ID of the session.
+
+    Raises:
+        KeyError: If the signed URL, its headers or the session ID is missing.
+    """
+    signed_url_spec = session.get("signedURL") or {}
+    signed_url = signed_url_spec.get("url")
+    if not signed_url:
+        raise KeyError(
+            "Signed URL missing in response for resource {id}".format(id=resource_id)
+        )
+
+    log.trace("Using Resumable upload signed url: %s", signed_url)
+
+    signed_url_headers = Headers(signed_url_spec.get("headers"))
+
+    log.trace("Signed url headers: %s", signed_url_headers)
+
+    if not signed_url_headers:
+        raise KeyError(
+            "Signed URL Headers missing in response for resource {id}".format(
+                id=resource_id
+            )
+        )
+
+    session_id = session.get("sessionId")
+
+    if not session_id:
+        raise KeyError(
+            "sessionId Header missing in response for resource {id}".format(
+                id=resource_id
+            )
+        )
+
+    return signed_url, signed_url_headers, session_id
+
+
+def _tell(file_obj):
+    # type: (IO) -> Any
+    """Returns the position of a file, None if it can't be told."""
+    try:
+        return file_obj.tell()
+    except (AttributeError, IOError, OSError, ValueError):
+        return None
+
+
+class _OffsetWriter(object):
+    """Writes sequential data at an offset of a file shared with other writers."""
+
+    def __init__(self, file_obj, offset, lock, stop):
+        # type: (IO, int, threading.Lock, threading.Event) -> None
+        self._file_obj = file_obj
+        self._offset = offset
+        self._lock = lock
+        self._stop = stop
+
+    def write(self, data):
+        # type: (bytes) -> int
+        """Writes data after the previously written data.
+
+        Raises:
+            crux.exceptions.CruxClientError: If the download has been stopped.
+        """
+        if self._stop.is_set():
+            raise CruxClientError("Download stopped after a failed range")
+        with self._lock:
+            self._file_obj.seek(self._offset)
+            written = self._file_obj.write(data)
+        self._offset += len(data)
+        return written
+
+
+def _iter_and_close(response, chunk_size):
+    # type: (Response, int) -> Iterator[bytes]
+    """Yields the response content and releases its connection back to the pool."""
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            yield chunk
+    finally:
+        response.close()
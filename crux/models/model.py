@@ -1,11 +1,11 @@
 """Module defines abstract CruxModel."""
 
-import copy
 import pprint
-from typing import Any, Dict  # noqa: F401
+from typing import Any, Dict, Mapping  # noqa: F401
 
 from crux._client import CruxClient
 from crux._client import CruxConfig
+from crux._mapping import copy_json, ReadOnlyDict
 
 
 class CruxModel(object):
@@ -33,17 +33,24 @@ class CruxModel(object):
     def connection(self, connection):
         self._connection = connection
 
-    def to_dict(self):
-        # type: () -> Dict[str, Any]
+    def to_dict(self, copy=True):  # pylint: disable=redefined-outer-name
+        # type: (bool) -> Mapping[str, Any]
         """Returns dict copy of raw model.
 
+        Args:
+            copy (bool): If False, a read-only view of the raw model is returned
+                instead of a copy. Nothing is copied until the view's copy
+                method is called. Defaults to True.
+
         Returns:
             dict: Raw model dict.
         """
+        if not copy:
+            return ReadOnlyDict(self.raw_model)
 
         # Deep copy raw_model, otherwise if a user modifies the returned dict,
         # they will be mutating this instances raw_model.
-        return copy.deepcopy(self.raw_model)
+        return copy_json(self.raw_model)
 
     @classmethod
     def from_dict(cls, a_dict, connection=None):
@@ -3,10 +3,11 @@
 from enum import Enum
 import os
 import posixpath
-from typing import Dict, List, Union  # noqa: F401
+from typing import Dict, List, Optional, Type, Union  # noqa: F401
 
 from requests.models import Response  # noqa: F401 pylint: disable=unused-import
 
+from crux._cache import TTLCache  # noqa: F401 pylint: disable=unused-import
 from crux._client import CruxClient
 from crux._utils import create_logger, DEFAULT_CHUNK_SIZE, Headers
 from crux.models.model import CruxModel
@@ -16,8 +17,12 @@ from crux.models.permission import Permission
 log = create_logger(__name__)
 
 
-class Resource(CruxModel):
-    """Resource Model."""
+class ResourceFields(CruxModel):
+    """Fields of a resource, shared by Resource and the models of crux.aio.
+
+    It doesn't call the API, except to fetch the folder with _get_folder, which
+    the subclasses implement.
+    """
 
     def __init__(self, raw_model=None, connection=None):
         # type: (Dict, CruxClient) -> None
@@ -26,8 +31,8 @@ class Resource(CruxModel):
             raw_model (dict): Resource raw dictionary. Defaults to None.
             connection (CruxClient): Connection Object. Defaults to None.
         """
-        self._folder = None
-        super(Resource, self).__init__(raw_model, connection)
+        self._folder = None  # type: Optional[str]
+        super(ResourceFields, self).__init__(raw_model, connection)
 
     @property
     def id(self):
@@ -147,9 +152,104 @@ class Resource(CruxModel):
         if self._folder:
             return self._folder
 
-        self._folder = self._get_folder()
+        folder_path_cache = self._folder_path_cache
+        folder_id = self.raw_model.get("folderId")
+
+        if folder_path_cache is not None and folder_id:
+            self._folder = folder_path_cache.get(folder_id)
+            if self._folder:
+                return self._folder
+
+        self._set_folder(self._get_folder())
         return self._folder
 
+    @property
+    def _folder_path_cache(self):
+        # type: () -> Optional[TTLCache]
+        return getattr(self._connection, "folder_path_cache", None)
+
+    def _set_folder(self, folder):
+        # type: (str) -> None
+        """Sets the folder of the resource known by the caller.
+
+        The folder path is cached by folder ID, so other resources of the same
+        folder get their path without an API call. The path of a folder resource
+        is cached too, for the resources it contains, and the resource ID is
+        cached by path for the Dataset path lookups.
+
+        Args:
+            folder (str): Folder path of the resource.
+        """
+        self._folder = folder
+        cache_resource_path(
+            self._connection,
+            folder,
+            name=self.raw_model.get("name"),
+            resource_id=self.raw_model.get("resourceId"),
+            resource_type=self.raw_model.get("type"),
+            folder_id=self.raw_model.get("folderId"),
+            dataset_id=self.raw_model.get("datasetId"),
+        )
+
+    def _forget_paths(self):
+        # type: () -> None
+        """Removes the cached paths which a rename or deletion makes stale."""
+        resource_id = self.raw_model.get("resourceId")
+        dataset_id = self.raw_model.get("datasetId")
+        folder_path_cache = self._folder_path_cache
+        resource_id_cache = getattr(self._connection, "resource_id_cache", None)
+
+        if self.raw_model.get("type") == "folder":
+            # The paths of all descendants change, their IDs aren't known here.
+            if folder_path_cache is not None:
+                folder_path_cache.clear()
+            if resource_id_cache is not None:
+                resource_id_cache.evict(lambda key, _: key[0] == dataset_id)
+        elif resource_id_cache is not None:
+            resource_id_cache.evict(lambda _, value: value == resource_id)
+
+    def _get_folder(self):
+        # type: () -> str
+        """Fetches the folder of the resource, when it isn't cached."""
+        raise NotImplementedError
+
+
+class Resource(ResourceFields):
+    """Resource Model."""
+
+    def cast(self, model=None):
+        # type: (Optional[Type[Resource]]) -> Resource
+        """Returns the resource as another Resource model, without copying it.
+
+        The returned object shares the raw model of this one, so changes to one
+        of them are seen by the other.
+
+        Args:
+            model (type): Resource model, such as crux.models.File or
+                crux.models.Folder. Defaults to None, which picks it from the
+                type of the resource.
+
+        Returns:
+            crux.models.Resource: Resource object of the model.
+
+        Raises:
+            TypeError: If the model isn't picked and the type is unknown.
+        """
+        if model is None:
+            # Imported here, the factory imports the Resource subclasses.
+            from crux.models._factory import (  # pylint: disable=import-outside-toplevel
+                get_resource_model,
+            )
+
+            model = get_resource_model(self.raw_model.get("type"))
+
+        if type(self) is model:  # pylint: disable=unidiomatic-typecheck
+            return self
+
+        resource = model(raw_model=self.raw_model, connection=self._connection)
+        resource._folder = self._folder  # pylint: disable=protected-access
+        return resource
+
     def delete(self):
         # type: () -> bool
         """Deletes Resource from Dataset.
@@ -160,9 +260,11 @@ class Resource(CruxModel):
         headers = Headers(
             {"content-type": "application/json", "accept": "application/json"}
         )
-        return self.connection.api_call(
+        deleted = self.connection.api_call(
             "DELETE", ["resources", self.id], headers=headers
         )
+        self._forget_paths()
+        return deleted
 
     def update(self, name=None, description=None, tags=None, provenance=None):
         # type: (str, str, List[str], str) -> bool
@@ -205,6 +307,11 @@ class Resource(CruxModel):
 
         self.raw_model = resource_object.raw_model
 
+        if name is not None:
+            self._forget_paths()
+            if self._folder:
+                self._set_folder(self._folder)
+
         log.debug("Updated dataset %s with content %s", self.id, self.raw_model)
         return True
 
@@ -442,3 +549,44 @@ class MediaType(Enum):  # type: ignore
             return cls[file_ext].value  # type: ignore
         else:
             raise LookupError("File/Media Type not supported.")
+
+
+def cache_resource_path(  # pylint: disable=too-many-arguments
+    connection,  # type: Optional[CruxClient]
+    folder,  # type: str
+    name,  # type: Optional[str]
+    resource_id,  # type: Optional[str]
+    resource_type,  # type: Optional[str]
+    folder_id,  # type: Optional[str]
+    dataset_id,  # type: Optional[str]
+):
+    # type: (...) -> None
+    """Caches the paths known from the folder of a resource.
+
+    Args:
+        connection (CruxClient): Client holding the caches, nothing is cached
+            if it is None.
+        folder (str): Folder path of the resource.
+        name (str): Name of the resource.
+        resource_id (str): ID of the resource.
+        resource_type (str): Type of the resource.
+        folder_id (str): ID of the folder of the resource.
+        dataset_id (str): ID of the Dataset of the resource.
+    """
+    folder_path_cache = getattr(connection, "folder_path_cache", None)
+    if folder_path_cache is None or not folder:
+        return
+
+    if folder_id:
+        folder_path_cache.set(folder_id, folder)
+
+    if not resource_id or name is None:
+        return
+
+    path = posixpath.normpath(posixpath.join(folder, name))
+    if resource_type == "folder":
+        folder_path_cache.set(resource_id, path)
+
+    resource_id_cache = getattr(connection, "resource_id_cache", None)
+    if dataset_id and resource_id_cache is not None:
+        resource_id_cache.set((dataset_id, path), resource_id)
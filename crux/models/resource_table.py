@@ -0,0 +1,437 @@
+"""Module contains ResourceTable, the columnar result of listings and searches."""
+
+from array import array
+from collections import OrderedDict
+from functools import partial
+from itertools import compress
+from operator import is_, is_not, itemgetter
+import re
+import sys
+from typing import (  # noqa: F401 pylint: disable=unused-import
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from crux._client import CruxClient  # noqa: F401 pylint: disable=unused-import
+from crux._compat import intern_string
+from crux._utils import create_logger
+from crux.models._factory import get_resource_object
+from crux.models.file import File  # noqa: F401 pylint: disable=unused-import
+from crux.models.folder import Folder  # noqa: F401 pylint: disable=unused-import
+from crux.models.resource import Resource
+
+
+log = create_logger(__name__)
+
+# Public columns, by name, and the raw model key they are read from.
+COLUMNS = (
+    ("id", "resourceId"),
+    ("name", "name"),
+    ("folder", None),
+    ("size", "size"),
+    ("mediaType", "mediaType"),
+    ("createdAt", "createdAt"),
+    ("modifiedAt", "modifiedAt"),
+    ("labels", "labels"),
+)  # type: Tuple[Tuple[str, Any], ...]
+
+# Columns needed to turn a row back into a File or Folder.
+_HIDDEN_COLUMNS = (
+    ("type", "type"),
+    ("datasetId", "datasetId"),
+    ("folderId", "folderId"),
+)  # type: Tuple[Tuple[str, Any], ...]
+
+_STORED_KEYS = frozenset(
+    key for _, key in COLUMNS + _HIDDEN_COLUMNS if key is not None
+)
+
+# Columns whose values are shared by many rows, a single copy of each is kept.
+_INTERNED_COLUMNS = frozenset(("folder", "mediaType", "type", "datasetId", "folderId"))
+
+# Columns exported to NumPy as datetime64 values.
+_TIME_COLUMNS = frozenset(("createdAt", "modifiedAt"))
+
+try:
+    array("q")
+    _SIZE_TYPECODE = "q"
+except ValueError:
+    # Python 2 has no long long arrays.
+    _SIZE_TYPECODE = "l"
+
+
+# Time zone designator at the end of an ISO 8601 time.
+_TIME_ZONE_REGEX = re.compile(r"(Z|[+-]\d\d:?\d\d)$")
+
+
+def _gather(values, indices):
+    # type: (Sequence[Any], List[int]) -> List[Any]
+    """Returns the values at some indices, looked up by itemgetter in one call."""
+    if not indices:
+        return []
+    if len(indices) == 1:
+        return [values[indices[0]]]
+    return list(itemgetter(*indices)(values))
+
+
+def _split_time_zone(value):
+    # type: (str) -> Tuple[str, int]
+    """Splits an ISO 8601 time into its local time and UTC offset in minutes."""
+    match = _TIME_ZONE_REGEX.search(value)
+    if match is None:
+        return value, 0
+    zone = match.group(1)
+    start = match.start()
+    local_time = value[:start]
+    if zone == "Z":
+        return local_time, 0
+    digits = zone[1:].replace(":", "")
+    offset = int(digits[:2]) * 60 + int(digits[2:])
+    return local_time, -offset if zone[0] == "-" else offset
+
+
+def _import_numpy():
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        raise ImportError(
+            "NumPy is required to export a ResourceTable, install crux[numpy]"
+        )
+    return numpy
+
+
+class ResourceTable(object):
+    """Columnar table of resources.
+
+    Each column of the table is held in a single list, sizes are held in an
+    array of integers, and the strings shared by many resources, such as the
+    folder paths and media types, are interned. Rows are only turned into
+    File or Folder objects when they are accessed.
+
+    Operations work on whole columns: rows are selected and reordered with
+    itertools and operator functions rather than loops over the rows, NumPy
+    masks and the size column are handled by NumPy when it's installed.
+
+    Columns are id, name, folder, size, mediaType, createdAt, modifiedAt and
+    labels. Labels are dicts of label keys and values. Missing values are None,
+    except for sizes, which are 0.
+    """
+
+    def __init__(self, connection=None):
+        # type: (CruxClient) -> None
+        """
+        Attributes:
+            connection (CruxClient): Connection of the resources. Defaults to None.
+        """
+        self.connection = connection
+        self._columns = OrderedDict()  # type: Dict[str, Any]
+        for name, _ in COLUMNS + _HIDDEN_COLUMNS:
+            self._columns[name] = array(_SIZE_TYPECODE) if name == "size" else []
+        self._extra = []  # type: List[Optional[tuple]]
+
+    @classmethod
+    def from_resources(cls, resources, connection=None):
+        # type: (Iterable[Any], CruxClient) -> ResourceTable
+        """Creates a table from resource objects.
+
+        Args:
+            resources (iterable): Resource objects, such as File, Folder or
+                CompactResource. They are only read while the table is created.
+            connection (CruxClient): Connection of the resources. Defaults to None.
+
+        Returns:
+            crux.models.ResourceTable: Table of the resources.
+        """
+        table = cls(connection=connection)
+        for resource in resources:
+            # The folder is read only when it's known, reading Resource.folder
+            # could call the API.
+            table.append(
+                resource.raw_model, folder=getattr(resource, "_folder", None)
+            )
+        return table
+
+    def append(self, raw_model, folder=None):
+        # type: (Dict[str, Any], Optional[str]) -> None
+        """Adds a resource to the table.
+
+        Args:
+            raw_model (dict): Raw model of the resource.
+            folder (str): Folder path of the resource. Defaults to None.
+        """
+        columns = self._columns
+        value = None  # type: Any
+        for name, key in COLUMNS + _HIDDEN_COLUMNS:
+            if name == "folder":
+                value = folder
+            elif name == "labels":
+                labels = raw_model.get("labels")
+                value = (
+                    None
+                    if labels is None
+                    else {label["labelKey"]: label["labelValue"] for label in labels}
+                )
+            else:
+                value = raw_model.get(key)
+            if name == "size":
+                value = value or 0
+            elif name in _INTERNED_COLUMNS:
+                value = intern_string(value)
+            columns[name].append(value)
+
+        self._extra.append(
+            tuple(
+                (key, value)
+                for key, value in raw_model.items()
+                if key not in _STORED_KEYS
+            )
+            or None
+        )
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._extra)
+
+    def __iter__(self):
+        # type: () -> Iterator[Union[File, Folder, Resource]]
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def __getitem__(self, index):
+        # type: (Union[int, slice]) -> Union[File, Folder, Resource, ResourceTable]
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(len(self))))
+        return self.row(index)
+
+    def __repr__(self):
+        # type: () -> str
+        return "ResourceTable({rows} rows)".format(rows=len(self))
+
+    @property
+    def columns(self):
+        # type: () -> List[str]
+        """:obj:`list` of :obj:`str`: Names of the columns."""
+        return [name for name, _ in COLUMNS]
+
+    def column(self, name):
+        # type: (str) -> Sequence[Any]
+        """Returns the values of a column.
+
+        Args:
+            name (str): Name of the column.
+
+        Returns:
+            list or array: Values of the column, which shouldn't be modified.
+
+        Raises:
+            KeyError: If there is no such column.
+        """
+        if name not in self.columns:
+            raise KeyError(name)
+        return self._columns[name]
+
+    def row(self, index):
+        # type: (int) -> Union[File, Folder, Resource]
+        """Creates the File or Folder of a row.
+
+        Args:
+            index (int): Index of the row.
+
+        Returns:
+            crux.models.File or crux.models.Folder: Resource of the row, or
+                crux.models.Resource if its type is missing or unknown.
+        """
+        columns = self._columns
+        raw_model = {}  # type: Dict[str, Any]
+        for name, key in COLUMNS + _HIDDEN_COLUMNS:
+            value = columns[name][index]
+            if key is None or value is None:
+                continue
+            if name == "labels":
+                value = [
+                    {"labelKey": label_key, "labelValue": label_value}
+                    for label_key, label_value in value.items()
+                ]
+            raw_model[key] = value
+        raw_model.update(self._extra[index] or ())
+
+        if raw_model.get("type") in ("file", "folder"):
+            resource = get_resource_object(
+                resource_type=raw_model["type"],
+                data=raw_model,
+                connection=self.connection,
+            )  # type: Resource
+        else:
+            resource = Resource.from_dict(raw_model, connection=self.connection)
+        folder = columns["folder"][index]
+        if folder is not None:
+            resource._set_folder(folder)  # pylint: disable=protected-access
+        return resource
+
+    def take(self, indices):
+        # type: (Iterable[int]) -> ResourceTable
+        """Creates a table from some rows of this one.
+
+        Args:
+            indices (iterable): Indices of the rows, in the order of the new table,
+                for example a NumPy array.
+
+        Returns:
+            crux.models.ResourceTable: Table of the rows.
+        """
+        if hasattr(indices, "tolist"):
+            indices = indices.tolist()  # type: ignore
+        indices = list(indices)
+        table = ResourceTable(connection=self.connection)
+        for name, values in self._columns.items():
+            taken = _gather(values, indices)  # type: Any
+            if name == "size":
+                taken = array(_SIZE_TYPECODE, taken)
+            table._columns[name] = taken
+        table._extra = _gather(self._extra, indices)
+        return table
+
+    def filter(self, mask):
+        # type: (Union[Sequence[bool], Callable[[Any], bool]]) -> ResourceTable
+        """Creates a table from the rows selected by a mask.
+
+        Args:
+            mask (sequence or callable): One boolean per row, for example a NumPy
+                array computed from to_numpy, or a function called with each row
+                index that returns True for the rows to keep.
+
+        Returns:
+            crux.models.ResourceTable: Table of the selected rows.
+
+        Raises:
+            ValueError: If the mask doesn't have one value per row.
+        """
+        rows = range(len(self))
+        if callable(mask):
+            return self.take(compress(rows, map(mask, rows)))
+        if len(mask) != len(self):
+            raise ValueError("mask should have one value per row")
+        # A NumPy mask means NumPy is imported already.
+        numpy = sys.modules.get("numpy")
+        if numpy is not None and isinstance(mask, numpy.ndarray):
+            return self.take(numpy.flatnonzero(mask))
+        return self.take(compress(rows, mask))
+
+    def where(self, name, predicate):
+        # type: (str, Callable[[Any], bool]) -> ResourceTable
+        """Creates a table from the rows whose column value matches a predicate.
+
+        Args:
+            name (str): Name of the column.
+            predicate (callable): Called with each value of the column, returns
+                True for the rows to keep.
+
+        Returns:
+            crux.models.ResourceTable: Table of the matching rows.
+        """
+        return self.take(compress(range(len(self)), map(predicate, self.column(name))))
+
+    def sort(self, name, reverse=False):
+        # type: (str, bool) -> ResourceTable
+        """Creates a table with the rows sorted by a column.
+
+        Rows with a missing value come first, or last in descending order.
+        The sort is stable.
+
+        Args:
+            name (str): Name of the column.
+            reverse (bool): Sorts in descending order. Defaults to False.
+
+        Returns:
+            crux.models.ResourceTable: Sorted table.
+
+        Raises:
+            TypeError: If the column is labels, which can't be ordered.
+        """
+        if name == "labels":
+            raise TypeError("labels column can't be sorted")
+        values = self.column(name)
+        rows = range(len(self))
+
+        numpy = sys.modules.get("numpy")
+        if name == "size" and numpy is not None and values:
+            sizes = numpy.frombuffer(values, dtype=_SIZE_TYPECODE)
+            return self.take(
+                numpy.argsort(-sizes if reverse else sizes, kind="mergesort")
+            )
+
+        # Python 3 can't compare None with other values, missing values are
+        # kept apart instead.
+        missing = list(compress(rows, map(partial(is_, None), values)))
+        present = compress(rows, map(partial(is_not, None), values))
+        ordered = sorted(present, key=values.__getitem__, reverse=reverse)
+        return self.take(ordered + missing if reverse else missing + ordered)
+
+    def group_by(self, name):
+        # type: (str) -> Dict[Any, ResourceTable]
+        """Splits the table by the values of a column.
+
+        Args:
+            name (str): Name of the column.
+
+        Returns:
+            dict: Table of the rows of each value of the column, by value.
+
+        Raises:
+            TypeError: If the column is labels, whose values can't be grouped.
+        """
+        if name == "labels":
+            raise TypeError("labels column can't be grouped")
+        # A single pass hashing each value, like the group by of data frames.
+        groups = OrderedDict()  # type: Dict[Any, List[int]]
+        for index, value in enumerate(self.column(name)):
+            groups.setdefault(value, []).append(index)
+        return OrderedDict(
+            (value, self.take(indices)) for value, indices in groups.items()
+        )
+
+    def to_numpy(self, name):
+        # type: (str) -> Any
+        """Exports a column as a NumPy array.
+
+        Sizes are exported as int64, creation and modification times as
+        datetime64 in milliseconds, and the other columns as objects.
+
+        Args:
+            name (str): Name of the column.
+
+        Returns:
+            numpy.ndarray: Values of the column.
+
+        Raises:
+            ImportError: If NumPy isn't installed.
+        """
+        numpy = _import_numpy()
+        values = self.column(name)
+        if name == "size":
+            if not values:
+                return numpy.zeros(0, dtype="int64")
+            # Read from the buffer of the array, without a list of integers.
+            return numpy.frombuffer(values, dtype=_SIZE_TYPECODE).astype("int64")
+        if name in _TIME_COLUMNS:
+            # NumPy doesn't parse time zones, they are turned into UTC offsets.
+            local_times = []
+            offsets = []
+            for value in values:
+                local_time, offset = _split_time_zone(value) if value else ("NaT", 0)
+                local_times.append(local_time)
+                offsets.append(offset)
+            return numpy.array(local_times, dtype="datetime64[ms]") - numpy.array(
+                offsets, dtype="timedelta64[m]"
+            )
+        array_values = numpy.empty(len(values), dtype=object)
+        array_values[:] = values
+        return array_values
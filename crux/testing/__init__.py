@@ -0,0 +1,9 @@
+"""
+Package containing an in-process stand-in of the Crux API, for tests and benchmarks.
+"""
+
+from crux.testing._server import FakeCruxServer
+from crux.testing._store import FakeAPIError, FakeStore
+
+
+__all__ = ("FakeCruxServer", "FakeStore", "FakeAPIError")
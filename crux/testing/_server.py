@@ -0,0 +1,759 @@
+"""Module contains the HTTP server of the fake Crux API."""
+# pylint: disable=useless-suppression,ungrouped-imports
+
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple  # noqa: F401
+
+try:
+    # Python 3 imports
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+except ImportError:
+    # Python 2 imports
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer  # type: ignore
+    from SocketServer import ThreadingMixIn  # type: ignore
+    from urllib import unquote, urlencode  # type: ignore
+    from urlparse import parse_qs, urlsplit  # type: ignore
+
+from crux._metrics import endpoint_template
+from crux._utils import create_logger
+from crux.testing._store import FakeAPIError, FakeStore
+
+
+log = create_logger(__name__)
+
+DEFAULT_API_KEY = "fake-api-key"
+
+# Size of the writes and reads throttled by the bandwidth cap.
+THROTTLE_CHUNK_SIZE = 65536
+
+_RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)$")
+_CONTENT_RANGE_RE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)$")
+
+# Routes of the API, matched in order. {} matches any path segment, whose value
+# is passed to the handler.
+_ROUTES = (
+    ("GET", "identities/whoami", "_whoami"),
+    ("GET", "drives/my", "_drives_my"),
+    ("POST", "datasets", "_create_dataset"),
+    ("GET", "datasets/public", "_public_datasets"),
+    ("GET", "datasets/stitch/{}", "_get_job"),
+    ("GET", "datasets/{}", "_get_dataset"),
+    ("PUT", "datasets/{}", "_update_dataset"),
+    ("DELETE", "datasets/{}", "_delete_dataset"),
+    ("GET", "datasets/{}/resources", "_list_resources"),
+    ("POST", "datasets/{}/resources", "_create_resource"),
+    ("GET", "datasets/{}/permissions", "_list_permissions"),
+    ("POST", "datasets/{}/stitch", "_stitch"),
+    ("POST", "datasets/{}/labels/search", "_search"),
+    ("GET", "datasets/{}/labels/{}", "_get_dataset_label"),
+    ("PUT", "datasets/{}/labels/{}/{}", "_add_dataset_label"),
+    ("DELETE", "datasets/{}/labels/{}", "_delete_dataset_label"),
+    ("PUT", "datasets/{}/resources/{}/labels", "_add_labels"),
+    ("PUT", "datasets/{}/resources/{}/labels/{}/{}", "_add_label"),
+    ("DELETE", "datasets/{}/resources/{}/labels/{}", "_delete_label"),
+    ("GET", "resources/{}", "_get_resource"),
+    ("PUT", "resources/{}", "_update_resource"),
+    ("DELETE", "resources/{}", "_delete_resource"),
+    ("GET", "resources/{}/folderpath", "_folderpath"),
+    ("GET", "resources/{}/permissions", "_list_permissions"),
+    ("GET", "resources/{}/content", "_get_content"),
+    ("PUT", "resources/{}/content", "_put_content"),
+    ("POST", "resources/{}/content-url", "_content_url"),
+    ("POST", "resources/{}/upload-session-start", "_start_upload"),
+    ("POST", "resources/{}/upload-session-complete", "_complete_upload"),
+    ("POST", "permissions/bulk", "_bulk_permissions"),
+    ("PUT", "permissions/{}/{}/{}", "_add_permission"),
+    ("DELETE", "permissions/{}/{}/{}", "_delete_permission"),
+    ("GET", "jobs/{}", "_get_job"),
+    ("GET", "deliveries/{}/ids", "_delivery_ids"),
+    ("GET", "deliveries/{}/{}", "_get_delivery"),
+    ("GET", "deliveries/{}/{}/data", "_delivery_data"),
+    ("GET", "deliveries/{}/{}/raw", "_delivery_raw"),
+)  # type: Tuple[Tuple[str, str, str], ...]
+
+# Compiled route: method, path segments with None for {}, and handler name.
+_Route = Tuple[str, List[Optional[str]], str]
+
+
+def _compile_routes(routes):
+    # type: (Tuple[Tuple[str, str, str], ...]) -> List[_Route]
+    return [
+        (method, [None if part == "{}" else part for part in template.split("/")], name)
+        for method, template, name in routes
+    ]
+
+
+_COMPILED_ROUTES = _compile_routes(_ROUTES)
+
+
+class _Request(object):
+    """Parsed request, handed to the route handlers."""
+
+    __slots__ = ("method", "segments", "params", "headers", "body", "handler")
+
+    def __init__(self, method, segments, params, headers, body, handler):
+        self.method = method
+        self.segments = segments
+        self.params = params
+        self.headers = headers
+        self.body = body
+        self.handler = handler
+
+    def json(self):
+        # type: () -> Any
+        if not self.body:
+            return {}
+        try:
+            return json.loads(self.body.decode("utf-8"))
+        except ValueError:
+            raise FakeAPIError(400, "Request body isn't valid JSON")
+
+
+class _Response(object):
+    """Response of a route handler."""
+
+    __slots__ = ("status", "body", "headers")
+
+    def __init__(self, status, body=b"", headers=None):
+        # type: (int, Any, Optional[Dict[str, str]]) -> None
+        self.status = status
+        self.headers = dict(headers or {})
+        if isinstance(body, bytes):
+            self.body = body
+        else:
+            self.body = json.dumps(body).encode("utf-8")
+            self.headers.setdefault("Content-Type", "application/json")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes, which Nagle's algorithm would delay.
+    disable_nagle_algorithm = True
+
+    def _dispatch(self):
+        self.server.fake.handle(self)  # type: ignore
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_PUT = _dispatch
+    do_DELETE = _dispatch
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        log.trace("%s - " + format, self.address_string(), *args)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeCruxServer(object):  # pylint: disable=too-many-instance-attributes
+    """In-process HTTP server standing in for the Crux API and its storage.
+
+    The API endpoints used by the client are served from an in-memory
+    crux.testing.FakeStore. Signed URLs point back to the server, which serves
+    ranged downloads and resumable uploads like the storage does. Latency,
+    bandwidth and the error rate can be changed while the server runs.
+
+    Example:
+        .. code-block:: python
+
+            from crux.testing import FakeCruxServer
+
+            with FakeCruxServer(latency=0.01) as server:
+                dataset = server.store.create_dataset("dataset")
+                conn = server.connection()
+                conn.get_dataset(dataset["datasetId"]).create_file("/file.csv")
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        host="127.0.0.1",  # type: str
+        port=0,  # type: int
+        api_key=DEFAULT_API_KEY,  # type: str
+        api_prefix="plat-api",  # type: str
+        latency=0.0,  # type: float
+        bandwidth=None,  # type: Optional[float]
+        error_rate=0.0,  # type: float
+        signed_url_ttl=3600,  # type: float
+        seed=None,  # type: Optional[int]
+        store=None,  # type: Optional[FakeStore]
+    ):
+        # type: (...) -> None
+        """
+        Args:
+            host (str): Address the server listens on. Defaults to 127.0.0.1.
+            port (int): Port the server listens on. Defaults to 0, any free port.
+            api_key (str): API key expected in the requests.
+                Defaults to fake-api-key.
+            api_prefix (str): API prefix of the API paths. Defaults to plat-api.
+            latency (float): Seconds added before answering each request.
+                Defaults to 0.
+            bandwidth (float): Bytes per second of the request and response bodies,
+                per connection. Defaults to None, which doesn't throttle.
+            error_rate (float): Fraction of the requests answered with a 503.
+                Defaults to 0.
+            signed_url_ttl (float): Seconds after which signed URLs are rejected
+                with a 400, as expired. Defaults to 3600.
+            seed (int): Seed of the injected errors, for reproducible runs.
+                Defaults to None.
+            store (crux.testing.FakeStore): State of the API.
+                Defaults to None, which creates an empty one.
+        """
+        self.store = store if store is not None else FakeStore()
+        self.api_key = api_key
+        self.api_prefix = api_prefix
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.signed_url_ttl = signed_url_ttl
+        self._random = random.Random(seed)
+        self._secret = os.urandom(16)
+        self._counts = {}  # type: Dict[str, int]
+        self._lock = threading.Lock()
+        self._httpd = _ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.fake = self  # type: ignore
+        self._thread = None  # type: Optional[threading.Thread]
+
+    @property
+    def url(self):
+        # type: () -> str
+        """str: Base URL of the server, to be used as the API host."""
+        host, port = self._httpd.socket.getsockname()[:2]
+        return "http://{host}:{port}".format(host=host, port=port)
+
+    def start(self):
+        # type: () -> FakeCruxServer
+        """Starts serving in a background thread.
+
+        Returns:
+            crux.testing.FakeCruxServer: The server.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._httpd.serve_forever, name="crux-fake-server"
+            )
+            self._thread.daemon = True
+            self._thread.start()
+            log.debug("Fake Crux API listening on %s", self.url)
+        return self
+
+    def stop(self):
+        # type: () -> None
+        """Stops serving and closes the listening socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def connection(self, **kwargs):
+        # type: (**Any) -> Any
+        """Returns a Crux connection to the server.
+
+        Args:
+            **kwargs: Arguments of crux.Crux, which override the API key, host
+                and prefix of the server.
+
+        Returns:
+            crux.Crux: Connection.
+        """
+        from crux.apis import Crux  # pylint: disable=import-outside-toplevel
+
+        kwargs.setdefault("api_key", self.api_key)
+        kwargs.setdefault("api_host", self.url)
+        kwargs.setdefault("api_prefix", self.api_prefix)
+        kwargs.setdefault("only_use_crux_domains", False)
+        return Crux(**kwargs)
+
+    def counts(self):
+        # type: () -> Dict[str, int]
+        """Returns the number of requests received, by method and endpoint template.
+
+        Returns:
+            dict: Counts, keyed like ``GET /resources/{id}``.
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_counts(self):
+        # type: () -> None
+        """Forgets the number of requests received."""
+        with self._lock:
+            self._counts.clear()
+
+    def _count(self, method, endpoint):
+        # type: (str, str) -> None
+        key = "{} {}".format(method, endpoint)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def _inject_error(self):
+        # type: () -> bool
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    # Signed URLs
+
+    def _sign(self, kind, item_id, expires):
+        # type: (str, str, str) -> str
+        message = "{}/{}/{}".format(kind, item_id, expires).encode("utf-8")
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def signed_url(self, kind, item_id, ttl=None):
+        # type: (str, str, Optional[float]) -> str
+        """Returns a signed URL of the storage of the server.
+
+        Args:
+            kind (str): storage for a download, upload for an upload session.
+            item_id (str): ID of the resource or upload session.
+            ttl (float): Seconds the URL is valid for. Defaults to None,
+                which uses signed_url_ttl.
+
+        Returns:
+            str: Signed URL.
+        """
+        ttl = self.signed_url_ttl if ttl is None else ttl
+        expires = "{:.3f}".format(time.time() + ttl)
+        query = urlencode(
+            (("expires", expires), ("signature", self._sign(kind, item_id, expires)))
+        )
+        return "{url}/{kind}/{id}?{query}".format(
+            url=self.url, kind=kind, id=item_id, query=query
+        )
+
+    def _check_signature(self, kind, item_id, params):
+        # type: (str, str, Dict[str, str]) -> None
+        expires = params.get("expires", "")
+        signature = params.get("signature", "")
+        if not hmac.compare_digest(signature, self._sign(kind, item_id, expires)):
+            raise FakeAPIError(403, "Invalid signature")
+        if float(expires) < time.time():
+            raise FakeAPIError(400, "Signed URL expired")
+
+    # Transport
+
+    def _throttle(self, started, transferred):
+        # type: (float, int) -> None
+        bandwidth = self.bandwidth
+        if bandwidth:
+            delay = started + transferred / float(bandwidth) - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _read(self, handler, size):
+        # type: (BaseHTTPRequestHandler, int) -> bytes
+        started = time.time()
+        chunks = []
+        received = 0
+        while received < size:
+            chunk = handler.rfile.read(min(THROTTLE_CHUNK_SIZE, size - received))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            received += len(chunk)
+            self._throttle(started, received)
+        return b"".join(chunks)
+
+    def _read_body(self, handler):
+        # type: (BaseHTTPRequestHandler) -> bytes
+        if handler.headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []  # type: List[bytes]
+            while True:
+                size = int(handler.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Skips the trailer headers, up to the final empty line.
+                    while handler.rfile.readline().strip():
+                        pass
+                    return b"".join(chunks)
+                chunks.append(self._read(handler, size))
+                handler.rfile.readline()
+        return self._read(handler, int(handler.headers.get("content-length") or 0))
+
+    def _write(self, handler, response):
+        # type: (BaseHTTPRequestHandler, _Response) -> None
+        handler.send_response(response.status)
+        for key, value in response.headers.items():
+            handler.send_header(key, value)
+        handler.send_header("Content-Length", str(len(response.body)))
+        handler.end_headers()
+        if handler.command == "HEAD":
+            return
+        started = time.time()
+        view = memoryview(response.body)
+        for offset in range(0, len(view), THROTTLE_CHUNK_SIZE):
+            end = min(offset + THROTTLE_CHUNK_SIZE, len(view))
+            handler.wfile.write(view[offset:end])
+            self._throttle(started, end)
+
+    def handle(self, handler):
+        # type: (BaseHTTPRequestHandler) -> None
+        """Answers a request received by the HTTP server.
+
+        Args:
+            handler (BaseHTTPRequestHandler): Handler of the request.
+        """
+        split = urlsplit(handler.path)
+        segments = [unquote(segment) for segment in split.path.split("/") if segment]
+        params = {
+            key: values[-1]
+            for key, values in parse_qs(split.query, keep_blank_values=True).items()
+        }
+        request = _Request(
+            handler.command, segments, params, handler.headers, None, handler
+        )
+        request.body = self._read_body(handler)
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        try:
+            response = self._route(request)
+        except FakeAPIError as err:
+            response = _Response(err.status_code, err.to_dict())
+        except Exception as err:  # pylint: disable=broad-except
+            log.exception(
+                "Fake Crux API failed on %s %s", handler.command, handler.path
+            )
+            response = _Response(500, {"statusCode": 500, "message": str(err)})
+
+        self._write(handler, self._revalidate(request, response))
+
+    def _revalidate(self, request, response):
+        # type: (_Request, _Response) -> _Response
+        """Adds the ETag of JSON responses, and answers If-None-Match with 304."""
+        if (
+            request.method != "GET"
+            or response.status != 200
+            or response.headers.get("Content-Type") != "application/json"
+        ):
+            return response
+        etag = '"{}"'.format(hashlib.sha1(response.body).hexdigest())
+        if_none_match = request.headers.get("if-none-match") or ""
+        tags = [tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return _Response(304, b"", {"ETag": etag})
+        response.headers["ETag"] = etag
+        return response
+
+    def _route(self, request):
+        # type: (_Request) -> _Response
+        segments = request.segments
+        if segments[:1] in (["storage"], ["upload"]) and len(segments) == 2:
+            self._count(request.method, "/{}/{{id}}".format(segments[0]))
+            self._check_error()
+            if segments[0] == "storage":
+                return self._storage_download(request, segments[1])
+            return self._storage_upload(request, segments[1])
+
+        if segments[:1] != [self.api_prefix]:
+            raise FakeAPIError(404, "Unknown path {}".format("/".join(segments)))
+        path = segments[1:]
+        self._count(request.method, endpoint_template(path))
+        self._check_error()
+
+        expected = "Bearer {}".format(self.api_key)
+        if request.headers.get("authorization") != expected:
+            raise FakeAPIError(401, "Invalid API key")
+
+        for method, parts, name in _COMPILED_ROUTES:
+            if method != request.method or len(parts) != len(path):
+                continue
+            args = []
+            for part, segment in zip(parts, path):
+                if part is None:
+                    args.append(segment)
+                elif part != segment:
+                    break
+            else:
+                return getattr(self, name)(request, *args)
+
+        raise FakeAPIError(
+            404, "Unknown endpoint {} /{}".format(request.method, "/".join(path))
+        )
+
+    def _check_error(self):
+        # type: () -> None
+        if self._inject_error():
+            raise FakeAPIError(503, "Injected error")
+
+    # Storage
+
+    def _storage_download(self, request, resource_id):
+        # type: (_Request, str) -> _Response
+        if request.method != "GET":
+            raise FakeAPIError(405, "Method not allowed")
+        self._check_signature("storage", resource_id, request.params)
+        content = self.store.get_content(resource_id)
+
+        requested = request.headers.get("range")
+        if not requested:
+            return _Response(200, content)
+        match = _RANGE_RE.match(requested)
+        if match is None or int(match.group(1)) >= len(content):
+            raise FakeAPIError(416, "Range not satisfiable")
+        start = int(match.group(1))
+        end = min(int(match.group(2) or len(content) - 1), len(content) - 1)
+        stop = end + 1
+        return _Response(
+            206,
+            content[start:stop],
+            {"Content-Range": "bytes {}-{}/{}".format(start, end, len(content))},
+        )
+
+    def _storage_upload(self, request, session_id):
+        # type: (_Request, str) -> _Response
+        session = self.store.get_upload(session_id)
+
+        # Initiation of the resumable upload, whose session URL is then returned.
+        if request.method == "POST":
+            self._check_signature("upload", session_id, request.params)
+            location = "{url}/upload/{id}?upload_id={id}".format(
+                url=self.url, id=session_id
+            )
+            return _Response(200, b"", {"Location": location})
+
+        if request.method != "PUT" or request.params.get("upload_id") != session_id:
+            raise FakeAPIError(405, "Method not allowed")
+
+        match = _CONTENT_RANGE_RE.match(request.headers.get("content-range", ""))
+        if match is None:
+            raise FakeAPIError(400, "Invalid content-range")
+        chunks = session["chunks"]
+        if match.group(1) is not None:
+            if int(match.group(1)) != len(chunks):
+                raise FakeAPIError(400, "Chunk doesn't start at the uploaded size")
+            chunks.extend(request.body)
+        if match.group(3) != "*":
+            session["total"] = int(match.group(3))
+
+        if session["total"] is not None and len(chunks) >= session["total"]:
+            session["finished"] = True
+            return _Response(200, {"name": session["resourceId"], "size": len(chunks)})
+        headers = {"Range": "bytes=0-{}".format(len(chunks) - 1)} if chunks else {}
+        return _Response(308, b"", headers)
+
+    # Identities and datasets
+
+    def _whoami(self, request):
+        return _Response(200, self.store.identity)
+
+    def _drives_my(self, request):
+        return _Response(
+            200, {"owned": self.store.list_datasets(), "subscriptions": []}
+        )
+
+    def _create_dataset(self, request):
+        body = request.json()
+        dataset = self.store.create_dataset(
+            body.get("name"), body.get("description"), body.get("tags")
+        )
+        return _Response(201, dataset)
+
+    def _public_datasets(self, request):
+        return _Response(200, self.store.list_datasets(public=True))
+
+    def _get_dataset(self, request, dataset_id):
+        return _Response(200, self.store.get_dataset(dataset_id))
+
+    def _update_dataset(self, request, dataset_id):
+        return _Response(200, self.store.update_dataset(dataset_id, request.json()))
+
+    def _delete_dataset(self, request, dataset_id):
+        self.store.delete_dataset(dataset_id)
+        return _Response(204)
+
+    # Resources
+
+    def _list_resources(self, request, dataset_id):
+        params = request.params
+        limit = params.get("limit")
+        resources = self.store.list_resources(
+            dataset_id,
+            folder=params.get("folder", "/"),
+            offset=int(params.get("offset") or 0),
+            limit=int(limit) if limit else None,
+            include_folders=params.get("includeFolders") == "true",
+            name=params.get("name"),
+            sort=params.get("sort"),
+        )
+        return _Response(200, resources)
+
+    def _create_resource(self, request, dataset_id):
+        return _Response(201, self.store.create_resource(dataset_id, request.json()))
+
+    def _get_resource(self, request, resource_id):
+        return _Response(200, self.store.get_resource(resource_id))
+
+    def _update_resource(self, request, resource_id):
+        return _Response(200, self.store.update_resource(resource_id, request.json()))
+
+    def _delete_resource(self, request, resource_id):
+        self.store.delete_resource(resource_id)
+        return _Response(204)
+
+    def _folderpath(self, request, resource_id):
+        resource = self.store.get_resource(resource_id)
+        return _Response(200, {"path": self.store.folder_path(resource["folderId"])})
+
+    def _get_content(self, request, resource_id):
+        resource = self.store.get_resource(resource_id)
+        content = self.store.get_content(resource_id)
+        media_type = resource["mediaType"] or "application/octet-stream"
+        return _Response(200, content, {"Content-Type": media_type})
+
+    def _put_content(self, request, resource_id):
+        resource = self.store.set_content(
+            resource_id, request.body, request.headers.get("content-type")
+        )
+        return _Response(200, resource)
+
+    def _content_url(self, request, resource_id):
+        self.store.get_resource(resource_id)
+        return _Response(200, {"url": self.signed_url("storage", resource_id)})
+
+    def _start_upload(self, request, resource_id):
+        session = self.store.start_upload(
+            resource_id, request.headers.get("x-upload-content-type")
+        )
+        return _Response(
+            200,
+            {
+                "sessionId": session["sessionId"],
+                "signedURL": {
+                    "url": self.signed_url("upload", session["sessionId"]),
+                    "headers": {
+                        "content-type": session["mediaType"],
+                        "x-goog-resumable": "start",
+                    },
+                },
+            },
+        )
+
+    def _complete_upload(self, request, resource_id):
+        session_id = request.json().get("sessionId")
+        if self.store.get_upload(session_id)["resourceId"] != resource_id:
+            raise FakeAPIError(400, "Upload session of another resource")
+        return _Response(200, self.store.complete_upload(session_id))
+
+    # Labels
+
+    def _search(self, request, dataset_id):
+        params = request.params
+        results = self.store.search(
+            dataset_id,
+            request.json().get("basic_query") or [],
+            limit=int(params.get("limit") or 1000),
+            after=params.get("after"),
+        )
+        return _Response(200, {"results": results})
+
+    def _get_dataset_label(self, request, dataset_id, label_key):
+        self.store.get_dataset(dataset_id)
+        labels = self.store.dataset_labels[dataset_id]
+        if label_key not in labels:
+            raise FakeAPIError(404, "Label {} not found".format(label_key))
+        return _Response(200, {"labelKey": label_key, "labelValue": labels[label_key]})
+
+    def _add_dataset_label(self, request, dataset_id, label_key, label_value):
+        self.store.get_dataset(dataset_id)
+        self.store.dataset_labels[dataset_id][label_key] = label_value
+        return _Response(204)
+
+    def _delete_dataset_label(self, request, dataset_id, label_key):
+        self.store.get_dataset(dataset_id)
+        self.store.dataset_labels[dataset_id].pop(label_key, None)
+        return _Response(204)
+
+    def _add_labels(self, request, dataset_id, resource_id):
+        labels = {
+            label["labelKey"]: label["labelValue"]
+            for label in request.json().get("labels") or []
+        }
+        self.store.set_labels(resource_id, labels)
+        return _Response(204)
+
+    def _add_label(self, request, dataset_id, resource_id, label_key, label_value):
+        self.store.set_labels(resource_id, {label_key: label_value})
+        return _Response(204)
+
+    def _delete_label(self, request, dataset_id, resource_id, label_key):
+        self.store.delete_label(resource_id, label_key)
+        return _Response(204)
+
+    # Permissions
+
+    def _list_permissions(self, request, target_id):
+        return _Response(200, self.store.list_permissions(target_id))
+
+    def _bulk_permissions(self, request):
+        self.store.bulk_permissions(request.json())
+        return _Response(204)
+
+    def _add_permission(self, request, target_id, identity_id, permission):
+        return _Response(
+            200, self.store.add_permission(target_id, identity_id, permission)
+        )
+
+    def _delete_permission(self, request, target_id, identity_id, permission):
+        self.store.delete_permission(target_id, identity_id, permission)
+        return _Response(204)
+
+    # Stitch, jobs and deliveries
+
+    def _stitch(self, request, dataset_id):
+        return _Response(200, self.store.stitch(dataset_id, request.json()))
+
+    def _get_job(self, request, job_id):
+        return _Response(200, self.store.get_job(job_id))
+
+    def _delivery_ids(self, request, dataset_id):
+        return _Response(
+            200,
+            self.store.delivery_ids(
+                dataset_id,
+                start_date=request.params.get("start_date"),
+                end_date=request.params.get("end_date"),
+            ),
+        )
+
+    def _get_delivery(self, request, dataset_id, delivery_id):
+        delivery = self.store.get_delivery(dataset_id, delivery_id)
+        summary = {
+            key: value
+            for key, value in delivery.items()
+            if key not in ("resource_ids", "raw_resource_ids")
+        }
+        return _Response(200, summary)
+
+    def _delivery_data(self, request, dataset_id, delivery_id):
+        delivery = self.store.get_delivery(dataset_id, delivery_id)
+        return _Response(
+            200,
+            {
+                "resources": [
+                    {"resource_id": resource_id}
+                    for resource_id in delivery["resource_ids"]
+                ]
+            },
+        )
+
+    def _delivery_raw(self, request, dataset_id, delivery_id):
+        delivery = self.store.get_delivery(dataset_id, delivery_id)
+        return _Response(200, {"resource_ids": delivery["raw_resource_ids"]})
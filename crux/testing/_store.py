@@ -0,0 +1,768 @@
+"""Module contains the in-memory state of the fake Crux API."""
+
+from bisect import bisect_left, bisect_right
+import itertools
+import mimetypes
+import posixpath
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional  # noqa: F401
+
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+DEFAULT_MEDIA_TYPE = "application/octet-stream"
+
+# Comparison operators of the label search predicates.
+_COMPARISONS = {
+    "eq": lambda value, val: value == val,
+    "ne": lambda value, val: value != val,
+    "lt": lambda value, val: value < val,
+    "gt": lambda value, val: value > val,
+    "lte": lambda value, val: value <= val,
+    "gte": lambda value, val: value >= val,
+}
+
+
+class FakeAPIError(Exception):
+    """Error answered by the fake API, with its status code."""
+
+    def __init__(self, status_code, message):
+        # type: (int, str) -> None
+        """
+        Args:
+            status_code (int): HTTP status code of the response.
+            message (str): Human readable string describing the error.
+        """
+        super(FakeAPIError, self).__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+    def to_dict(self):
+        # type: () -> Dict[str, Any]
+        """Returns the error as the body of an API error response.
+
+        Returns:
+            dict: Status code and message of the error.
+        """
+        return {"statusCode": self.status_code, "message": self.message}
+
+
+class _Folder(object):
+    """Children of a folder, in creation order, which is also the order of their IDs."""
+
+    __slots__ = ("entries", "files", "names")
+
+    def __init__(self):
+        self.entries = []  # type: List[str]
+        self.files = []  # type: List[str]
+        self.names = {}  # type: Dict[str, str]
+
+
+def _now():
+    # type: () -> str
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def _remove_sorted(ids, resource_id):
+    # type: (List[str], str) -> None
+    index = bisect_left(ids, resource_id)
+    if index < len(ids) and ids[index] == resource_id:
+        del ids[index]
+
+
+def _split_path(path):
+    # type: (str) -> List[str]
+    return [name for name in posixpath.normpath(path or "/").split("/") if name]
+
+
+def match_predicates(labels, predicates):
+    # type: (Dict[str, str], List[Dict[str, Any]]) -> bool
+    """Checks the labels of a resource against label search predicates.
+
+    Args:
+        labels (dict): Labels of the resource, by key.
+        predicates (:obj:`list` of :obj:`dict`): Predicates which must all match,
+            see crux.models.Dataset.find_resources_by_label.
+
+    Returns:
+        bool: True if all the predicates match.
+
+    Raises:
+        FakeAPIError: If a predicate has an unknown operator.
+    """
+    for predicate in predicates:
+        operator = predicate.get("op")
+        if operator == "and":
+            matched = match_predicates(labels, predicate.get("in") or [])
+        elif operator == "or":
+            matched = any(
+                match_predicates(labels, [nested])
+                for nested in predicate.get("in") or []
+            )
+        elif operator in _COMPARISONS:
+            value = labels.get(predicate.get("key", ""))
+            matched = value is not None and _COMPARISONS[operator](
+                value, predicate.get("val")
+            )
+        else:
+            raise FakeAPIError(400, "Unknown predicate operator {}".format(operator))
+        if not matched:
+            return False
+    return True
+
+
+class FakeStore(object):  # pylint: disable=too-many-public-methods
+    """Thread safe in-memory datasets, resources, contents and jobs of the fake API.
+
+    Resource IDs increase with creation time, so the resources of a dataset are
+    kept sorted by ID, which listings and label searches page through.
+    """
+
+    def __init__(self, identity_id="fake-identity"):
+        # type: (str) -> None
+        """
+        Args:
+            identity_id (str): Identity ID of the caller. Defaults to fake-identity.
+        """
+        self.identity = {
+            "identityId": identity_id,
+            "parentIdentityId": None,
+            "companyName": "Crux Testing",
+            "description": None,
+            "firstName": "Fake",
+            "lastName": "User",
+            "role": "admin",
+            "email": "{}@example.com".format(identity_id),
+            "website": None,
+            "landingPage": None,
+            "type": "user",
+            "phone": None,
+        }  # type: Dict[str, Any]
+        self.datasets = {}  # type: Dict[str, Dict[str, Any]]
+        self.resources = {}  # type: Dict[str, Dict[str, Any]]
+        self.contents = {}  # type: Dict[str, bytes]
+        self.dataset_labels = {}  # type: Dict[str, Dict[str, str]]
+        self.permissions = {}  # type: Dict[str, Dict[tuple, Dict[str, str]]]
+        self.jobs = {}  # type: Dict[str, Dict[str, Any]]
+        self.deliveries = {}  # type: Dict[str, Dict[str, Dict[str, Any]]]
+        self.upload_sessions = {}  # type: Dict[str, Dict[str, Any]]
+        self._public = set()  # type: set
+        self._roots = {}  # type: Dict[str, str]
+        self._folders = {}  # type: Dict[str, _Folder]
+        self._dataset_resources = {}  # type: Dict[str, List[str]]
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    def new_id(self):
+        # type: () -> str
+        """Returns a new ID, greater than all the previous ones.
+
+        Returns:
+            str: Hexadecimal ID.
+        """
+        return "{:024x}".format(next(self._ids))
+
+    def _get(self, collection, item_id, kind):
+        # type: (Mapping[str, Any], str, str) -> Any
+        item = collection.get(item_id)
+        if item is None:
+            raise FakeAPIError(404, "{} {} not found".format(kind, item_id))
+        return item
+
+    # Datasets
+
+    def create_dataset(self, name, description=None, tags=None, public=False):
+        # type: (str, Optional[str], Optional[List[str]], bool) -> Dict[str, Any]
+        """Creates a dataset with its root folder.
+
+        Args:
+            name (str): Name of the dataset.
+            description (str): Description of the dataset. Defaults to None.
+            tags (:obj:`list` of :obj:`str`): Tags of the dataset. Defaults to None.
+            public (bool): True if the dataset is listed as public. Defaults to False.
+
+        Returns:
+            dict: Dataset.
+        """
+        with self._lock:
+            dataset_id = self.new_id()
+            now = _now()
+            dataset = {
+                "datasetId": dataset_id,
+                "name": name,
+                "description": description,
+                "tags": list(tags or []),
+                "ownerIdentityId": self.identity["identityId"],
+                "contactIdentityId": self.identity["identityId"],
+                "website": None,
+                "createdAt": now,
+                "modifiedAt": now,
+                "provenance": None,
+            }
+            self.datasets[dataset_id] = dataset
+            self.dataset_labels[dataset_id] = {}
+            self._dataset_resources[dataset_id] = []
+            root_id = self.new_id()
+            self._roots[dataset_id] = root_id
+            self._folders[root_id] = _Folder()
+            if public:
+                self._public.add(dataset_id)
+            return dataset
+
+    def get_dataset(self, dataset_id):
+        # type: (str) -> Dict[str, Any]
+        """Returns a dataset, see create_dataset."""
+        return self._get(self.datasets, dataset_id, "Dataset")
+
+    def update_dataset(self, dataset_id, body):
+        # type: (str, Dict[str, Any]) -> Dict[str, Any]
+        """Updates the name, description and tags of a dataset.
+
+        Returns:
+            dict: Updated dataset.
+        """
+        with self._lock:
+            dataset = self.get_dataset(dataset_id)
+            for key in ("name", "description", "tags", "website"):
+                if key in body:
+                    dataset[key] = body[key]
+            dataset["modifiedAt"] = _now()
+            return dataset
+
+    def delete_dataset(self, dataset_id):
+        # type: (str) -> None
+        """Deletes a dataset and all its resources."""
+        with self._lock:
+            self.get_dataset(dataset_id)
+            for resource_id in self._dataset_resources.pop(dataset_id):
+                self._forget_resource(self.resources.pop(resource_id))
+            self._folders.pop(self._roots.pop(dataset_id), None)
+            self.dataset_labels.pop(dataset_id, None)
+            self.deliveries.pop(dataset_id, None)
+            self._public.discard(dataset_id)
+            del self.datasets[dataset_id]
+
+    def list_datasets(self, public=False):
+        # type: (bool) -> List[Dict[str, Any]]
+        """Returns the owned or the public datasets.
+
+        Args:
+            public (bool): True for the public datasets. Defaults to False.
+
+        Returns:
+            list: Datasets.
+        """
+        with self._lock:
+            return [
+                dataset
+                for dataset_id, dataset in sorted(self.datasets.items())
+                if not public or dataset_id in self._public
+            ]
+
+    # Resources
+
+    def folder_id(self, dataset_id, path):
+        # type: (str, str) -> str
+        """Returns the ID of a folder from its path.
+
+        Raises:
+            FakeAPIError: If the folder doesn't exist.
+        """
+        folder_id = self._roots.get(dataset_id)
+        if folder_id is None:
+            raise FakeAPIError(404, "Dataset {} not found".format(dataset_id))
+        for name in _split_path(path):
+            child_id = self._folders[folder_id].names.get(name)
+            if child_id is None or child_id not in self._folders:
+                raise FakeAPIError(404, "Folder {} not found".format(path))
+            folder_id = child_id
+        return folder_id
+
+    def folder_path(self, folder_id):
+        # type: (str) -> str
+        """Returns the path of a folder from its ID."""
+        names = []
+        while folder_id in self.resources:
+            folder = self.resources[folder_id]
+            names.append(folder["name"])
+            folder_id = folder["folderId"]
+        return "/" + "/".join(reversed(names))
+
+    def create_resource(self, dataset_id, body):
+        # type: (str, Dict[str, Any]) -> Dict[str, Any]
+        """Creates a file or folder resource.
+
+        Args:
+            dataset_id (str): ID of the dataset.
+            body (dict): Name, type, tags, description and folder path of the resource.
+
+        Returns:
+            dict: Resource.
+
+        Raises:
+            FakeAPIError: If the folder doesn't exist or already has a resource
+                of the same name.
+        """
+        name = body.get("name")
+        resource_type = body.get("type", "file")
+        if not name or resource_type not in ("file", "folder"):
+            raise FakeAPIError(400, "Invalid resource name or type")
+
+        with self._lock:
+            folder_id = self.folder_id(dataset_id, body.get("folder", "/"))
+            folder = self._folders[folder_id]
+            if name in folder.names:
+                raise FakeAPIError(409, "Resource {} already exists".format(name))
+
+            resource_id = self.new_id()
+            now = _now()
+            resource = {
+                "resourceId": resource_id,
+                "datasetId": dataset_id,
+                "folderId": folder_id,
+                "name": name,
+                "type": resource_type,
+                "size": None,
+                "tags": list(body.get("tags") or []),
+                "description": body.get("description"),
+                "labels": [],
+                "createdAt": now,
+                "modifiedAt": now,
+                "mediaType": (
+                    mimetypes.guess_type(name)[0] or DEFAULT_MEDIA_TYPE
+                    if resource_type == "file"
+                    else None
+                ),
+                "storageId": resource_id if resource_type == "file" else None,
+                "provenance": None,
+                "asOf": None,
+            }
+            self.resources[resource_id] = resource
+            self._dataset_resources[dataset_id].append(resource_id)
+            folder.entries.append(resource_id)
+            folder.names[name] = resource_id
+            if resource_type == "folder":
+                self._folders[resource_id] = _Folder()
+            else:
+                folder.files.append(resource_id)
+            return resource
+
+    def get_resource(self, resource_id):
+        # type: (str) -> Dict[str, Any]
+        """Returns a resource, see create_resource."""
+        return self._get(self.resources, resource_id, "Resource")
+
+    def update_resource(self, resource_id, body):
+        # type: (str, Dict[str, Any]) -> Dict[str, Any]
+        """Updates the name, description, tags and provenance of a resource.
+
+        Returns:
+            dict: Updated resource.
+        """
+        with self._lock:
+            resource = self.get_resource(resource_id)
+            name = body.get("name")
+            if name and name != resource["name"]:
+                folder = self._folders[resource["folderId"]]
+                if name in folder.names:
+                    raise FakeAPIError(409, "Resource {} already exists".format(name))
+                del folder.names[resource["name"]]
+                folder.names[name] = resource_id
+                resource["name"] = name
+            for key in ("description", "tags", "provenance"):
+                if key in body:
+                    resource[key] = body[key]
+            resource["modifiedAt"] = _now()
+            return resource
+
+    def delete_resource(self, resource_id):
+        # type: (str) -> None
+        """Deletes a resource, with all its descendants if it's a folder."""
+        with self._lock:
+            resource = self.get_resource(resource_id)
+            folder = self._folders[resource["folderId"]]
+            _remove_sorted(folder.entries, resource_id)
+            _remove_sorted(folder.files, resource_id)
+            del folder.names[resource["name"]]
+
+            pending = [resource_id]
+            while pending:
+                deleted = self.resources.pop(pending.pop())
+                _remove_sorted(
+                    self._dataset_resources[deleted["datasetId"]], deleted["resourceId"]
+                )
+                children = self._forget_resource(deleted)
+                if children is not None:
+                    pending.extend(children.entries)
+
+    def _forget_resource(self, resource):
+        # type: (Dict[str, Any]) -> Optional[_Folder]
+        resource_id = resource["resourceId"]
+        self.contents.pop(resource_id, None)
+        self.permissions.pop(resource_id, None)
+        return self._folders.pop(resource_id, None)
+
+    def list_resources(  # pylint: disable=too-many-arguments
+        self,
+        dataset_id,  # type: str
+        folder="/",  # type: str
+        offset=0,  # type: int
+        limit=None,  # type: Optional[int]
+        include_folders=False,  # type: bool
+        name=None,  # type: Optional[str]
+        sort=None,  # type: Optional[str]
+    ):
+        # type: (...) -> List[Dict[str, Any]]
+        """Lists the resources of a folder, in creation order unless sorted.
+
+        Args:
+            dataset_id (str): ID of the dataset.
+            folder (str): Path of the folder. Defaults to /.
+            offset (int): Number of resources skipped. Defaults to 0.
+            limit (int): Maximum number of resources. Defaults to None, for all.
+            include_folders (bool): True to list the folders too. Defaults to False.
+            name (str): Name of the only resource listed. Defaults to None.
+            sort (str): Resource key to sort by, descending if prefixed by -.
+                Defaults to None.
+
+        Returns:
+            list: Resources.
+        """
+        with self._lock:
+            children = self._folders[self.folder_id(dataset_id, folder)]
+            if name is not None:
+                resource_id = children.names.get(name)
+                ids = [resource_id] if resource_id else []
+            else:
+                ids = children.entries if include_folders else children.files
+
+            if sort:
+                key = sort.lstrip("-")
+                ids = sorted(
+                    ids,
+                    key=lambda resource_id: self.resources[resource_id].get(key) or "",
+                    reverse=sort.startswith("-"),
+                )
+
+            end = None if limit is None else offset + limit
+            resources = [self.resources[resource_id] for resource_id in ids[offset:end]]
+            if not include_folders:
+                resources = [
+                    resource for resource in resources if resource["type"] == "file"
+                ]
+            return resources
+
+    def set_content(self, resource_id, content, media_type=None):
+        # type: (str, bytes, Optional[str]) -> Dict[str, Any]
+        """Replaces the content of a file resource.
+
+        Args:
+            resource_id (str): ID of the file resource.
+            content (bytes): Content of the file.
+            media_type (str): Media type of the content. Defaults to None,
+                which keeps the media type of the resource.
+
+        Returns:
+            dict: Updated resource.
+        """
+        with self._lock:
+            resource = self.get_resource(resource_id)
+            if resource["type"] != "file":
+                raise FakeAPIError(400, "Resource {} is not a file".format(resource_id))
+            self.contents[resource_id] = content
+            resource["size"] = len(content)
+            resource["modifiedAt"] = _now()
+            if media_type:
+                resource["mediaType"] = media_type
+            return resource
+
+    def get_content(self, resource_id):
+        # type: (str) -> bytes
+        """Returns the content of a file resource, empty if none was uploaded."""
+        self.get_resource(resource_id)
+        return self.contents.get(resource_id, b"")
+
+    # Labels
+
+    def set_labels(self, resource_id, labels):
+        # type: (str, Dict[str, str]) -> Dict[str, Any]
+        """Adds or replaces labels of a resource.
+
+        Returns:
+            dict: Updated resource.
+        """
+        with self._lock:
+            resource = self.get_resource(resource_id)
+            merged = {
+                label["labelKey"]: label["labelValue"] for label in resource["labels"]
+            }
+            merged.update(labels)
+            resource["labels"] = [
+                {"labelKey": key, "labelValue": value}
+                for key, value in sorted(merged.items())
+            ]
+            return resource
+
+    def delete_label(self, resource_id, label_key):
+        # type: (str, str) -> Dict[str, Any]
+        """Deletes a label of a resource.
+
+        Returns:
+            dict: Updated resource.
+        """
+        with self._lock:
+            resource = self.get_resource(resource_id)
+            resource["labels"] = [
+                label for label in resource["labels"] if label["labelKey"] != label_key
+            ]
+            return resource
+
+    def search(self, dataset_id, predicates, limit=1000, after=None):
+        # type: (str, List[Dict[str, Any]], int, Optional[str]) -> List[Dict[str, Any]]
+        """Searches the resources of a dataset by label, by increasing ID.
+
+        Args:
+            dataset_id (str): ID of the dataset.
+            predicates (:obj:`list` of :obj:`dict`): Label predicates.
+            limit (int): Maximum number of resources. Defaults to 1000.
+            after (str): ID of the last resource of the previous page.
+                Defaults to None.
+
+        Returns:
+            list: Matching resources.
+        """
+        with self._lock:
+            self.get_dataset(dataset_id)
+            ids = self._dataset_resources[dataset_id]
+            start = bisect_right(ids, after) if after else 0
+            results = []
+            for resource_id in itertools.islice(ids, start, None):
+                resource = self.resources[resource_id]
+                labels = {
+                    label["labelKey"]: label["labelValue"]
+                    for label in resource["labels"]
+                }
+                if labels and match_predicates(labels, predicates):
+                    results.append(resource)
+                    if len(results) >= limit:
+                        break
+            return results
+
+    # Permissions
+
+    def add_permission(self, target_id, identity_id, permission):
+        # type: (str, str, str) -> Dict[str, str]
+        """Grants a permission on a dataset or resource.
+
+        Returns:
+            dict: Permission.
+        """
+        with self._lock:
+            granted = {
+                "targetId": target_id,
+                "identityId": identity_id,
+                "permissionName": permission,
+            }
+            permissions = self.permissions.setdefault(target_id, {})
+            permissions[(identity_id, permission)] = granted
+            return granted
+
+    def delete_permission(self, target_id, identity_id, permission):
+        # type: (str, str, str) -> None
+        """Revokes a permission on a dataset or resource."""
+        with self._lock:
+            self.permissions.get(target_id, {}).pop((identity_id, permission), None)
+
+    def list_permissions(self, target_id):
+        # type: (str) -> List[Dict[str, str]]
+        """Returns the permissions on a dataset or resource."""
+        with self._lock:
+            permissions = self.permissions.get(target_id, {})
+            return [granted for _, granted in sorted(permissions.items())]
+
+    def bulk_permissions(self, body):
+        # type: (Dict[str, Any]) -> None
+        """Grants or revokes a permission on resources or on a whole dataset.
+
+        Args:
+            body (dict): identityId, permission, action (add or delete), and
+                resourceIds or datasetId.
+        """
+        if body.get("action") not in ("add", "delete"):
+            raise FakeAPIError(400, "Unknown action {}".format(body.get("action")))
+        identity_id = body.get("identityId")
+        permission = body.get("permission")
+        if identity_id is None or permission is None:
+            raise FakeAPIError(400, "identityId and permission are required")
+        change = (
+            self.add_permission if body["action"] == "add" else self.delete_permission
+        )
+        with self._lock:
+            if body.get("resourceIds"):
+                targets = list(body["resourceIds"])
+            else:
+                dataset_id = body.get("datasetId", "")
+                self.get_dataset(dataset_id)
+                targets = [dataset_id] + self._dataset_resources[dataset_id]
+            for target_id in targets:
+                change(target_id, identity_id, permission)
+
+    # Stitch and jobs
+
+    def stitch(self, dataset_id, body):
+        # type: (str, Dict[str, Any]) -> Dict[str, Any]
+        """Concatenates the contents of source resources into a destination resource.
+
+        The job completes immediately.
+
+        Returns:
+            dict: destinationResource and jobId.
+        """
+        with self._lock:
+            self.get_dataset(dataset_id)
+            sources = body.get("sourceResourceIds") or []
+            destination_id = body.get("destinationResourceId")
+            if destination_id is None:
+                raise FakeAPIError(400, "destinationResourceId is required")
+            content = b"".join(self.get_content(source_id) for source_id in sources)
+            self.set_content(destination_id, content)
+            destination = self.set_labels(
+                destination_id, body.get("labelsToApply") or {}
+            )
+            job = self.add_job(
+                statistics={"sourceResources": len(sources), "bytes": len(content)}
+            )
+            return {"destinationResource": destination, "jobId": job["jobId"]}
+
+    def add_job(self, status="DONE", statistics=None):
+        # type: (str, Optional[Dict[str, Any]]) -> Dict[str, Any]
+        """Adds a job.
+
+        Args:
+            status (str): Status of the job. Defaults to DONE.
+            statistics (dict): Statistics of the job. Defaults to None.
+
+        Returns:
+            dict: Job.
+        """
+        job = {
+            "jobId": self.new_id(),
+            "status": status,
+            "statistics": statistics or {},
+        }  # type: Dict[str, Any]
+        self.jobs[job["jobId"]] = job
+        return job
+
+    def get_job(self, job_id):
+        # type: (str) -> Dict[str, Any]
+        """Returns a job, see add_job."""
+        return self._get(self.jobs, job_id, "Job")
+
+    # Deliveries
+
+    def add_delivery(  # pylint: disable=too-many-arguments
+        self,
+        dataset_id,  # type: str
+        delivery_id,  # type: str
+        resource_ids=None,  # type: Optional[List[str]]
+        raw_resource_ids=None,  # type: Optional[List[str]]
+        status="DELIVERY_SUCCEEDED",  # type: str
+        schedule_dt=None,  # type: Optional[str]
+    ):
+        # type: (...) -> Dict[str, Any]
+        """Adds a delivery of a dataset.
+
+        Args:
+            dataset_id (str): ID of the dataset.
+            delivery_id (str): ID of the delivery, ingestion ID and version,
+                such as abc.0.
+            resource_ids (:obj:`list` of :obj:`str`): IDs of the processed
+                resources. Defaults to None.
+            raw_resource_ids (:obj:`list` of :obj:`str`): IDs of the raw resources.
+                Defaults to None.
+            status (str): Latest health status. Defaults to DELIVERY_SUCCEEDED.
+            schedule_dt (str): Schedule datetime, ISO formatted. Defaults to now.
+
+        Returns:
+            dict: Delivery summary.
+        """
+        with self._lock:
+            self.get_dataset(dataset_id)
+            delivery = {
+                "delivery_id": delivery_id,
+                "dataset_id": dataset_id,
+                "latest_health_status": status,
+                "schedule_dt": schedule_dt or _now(),
+                "resource_ids": list(resource_ids or []),
+                "raw_resource_ids": list(raw_resource_ids or []),
+            }
+            self.deliveries.setdefault(dataset_id, {})[delivery_id] = delivery
+            return delivery
+
+    def delivery_ids(self, dataset_id, start_date=None, end_date=None):
+        # type: (str, Optional[str], Optional[str]) -> List[str]
+        """Returns the IDs of the deliveries scheduled between two ISO datetimes."""
+        with self._lock:
+            return sorted(
+                delivery_id
+                for delivery_id, delivery in self.deliveries.get(dataset_id, {}).items()
+                if (not start_date or delivery["schedule_dt"] >= start_date)
+                and (not end_date or delivery["schedule_dt"] <= end_date)
+            )
+
+    def get_delivery(self, dataset_id, delivery_id):
+        # type: (str, str) -> Dict[str, Any]
+        """Returns a delivery summary, see add_delivery."""
+        deliveries = self.deliveries.get(dataset_id) or {}  # type: Dict[str, Any]
+        return self._get(deliveries, delivery_id, "Delivery")
+
+    # Upload sessions
+
+    def start_upload(self, resource_id, media_type=None):
+        # type: (str, Optional[str]) -> Dict[str, Any]
+        """Starts a resumable upload session of a file resource.
+
+        Returns:
+            dict: Upload session.
+        """
+        with self._lock:
+            resource = self.get_resource(resource_id)
+            session = {
+                "sessionId": self.new_id(),
+                "resourceId": resource_id,
+                "mediaType": media_type or resource["mediaType"],
+                "chunks": bytearray(),
+                "total": None,
+                "finished": False,
+            }  # type: Dict[str, Any]
+            self.upload_sessions[session["sessionId"]] = session
+            return session
+
+    def get_upload(self, session_id):
+        # type: (str) -> Dict[str, Any]
+        """Returns an upload session, see start_upload."""
+        return self._get(self.upload_sessions, session_id, "Upload session")
+
+    def complete_upload(self, session_id):
+        # type: (str) -> Dict[str, Any]
+        """Replaces the content of the file resource by the uploaded bytes.
+
+        Returns:
+            dict: Updated resource.
+
+        Raises:
+            FakeAPIError: If the upload isn't finished.
+        """
+        with self._lock:
+            session = self.get_upload(session_id)
+            if not session["finished"]:
+                raise FakeAPIError(
+                    400, "Upload session {} isn't finished".format(session_id)
+                )
+            del self.upload_sessions[session_id]
+            return self.set_content(
+                session["resourceId"], bytes(session["chunks"]), session["mediaType"]
+            )
@@ -0,0 +1,372 @@
+"""Module contains the tracing hooks of API calls and file transfers.
+
+A tracer registered with set_tracer receives the start and end events of the
+spans of API calls, downloads and uploads. Spans started while another one is
+active in the same thread are its children. When no tracer is registered,
+nothing is recorded.
+"""
+
+import functools
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional  # noqa: F401
+
+from crux._cache import monotonic
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+_tracer = None  # type: Optional[Tracer]
+_local = threading.local()
+
+
+class Span(object):
+    """Timed operation with attributes, such as an API call or a file upload."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_time",
+        "end_time",
+        "duration",
+        "error",
+        "_started",
+    )
+
+    def __init__(self, name, parent=None, attributes=None):
+        # type: (str, Optional[Span], Optional[Dict[str, Any]]) -> None
+        """
+        Attributes:
+            name (str): Name of the operation.
+            parent (Span): Span of the operation this one is part of.
+                Defaults to None.
+            attributes (dict): Attributes of the operation. Defaults to None.
+        """
+        self.name = name
+        self.trace_id = (
+            parent.trace_id if parent is not None else "%032x" % random.getrandbits(128)
+        )  # type: str
+        self.span_id = "%016x" % random.getrandbits(64)  # type: str
+        self.parent_id = (
+            parent.span_id if parent is not None else None
+        )  # type: Optional[str]
+        self.attributes = dict(attributes or {})  # type: Dict[str, Any]
+        self.start_time = time.time()  # type: float
+        self.end_time = None  # type: Optional[float]
+        self.duration = None  # type: Optional[float]
+        self.error = None  # type: Optional[str]
+        self._started = monotonic()
+
+    def __repr__(self):
+        # type: () -> str
+        return "Span({name!r}, span_id={span_id!r})".format(
+            name=self.name, span_id=self.span_id
+        )
+
+    def set_attribute(self, key, value):
+        # type: (str, Any) -> None
+        """Sets an attribute of the span.
+
+        Args:
+            key (str): Name of the attribute.
+            value: Value of the attribute, which should be serializable to JSON.
+        """
+        self.attributes[key] = value
+
+    def increment(self, key, amount=1):
+        # type: (str, int) -> None
+        """Adds to a counter attribute of the span, such as a number of retries.
+
+        Args:
+            key (str): Name of the attribute.
+            amount (int): Number added to the attribute. Defaults to 1.
+        """
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def end(self, error=None):
+        # type: (Optional[BaseException]) -> None
+        """Ends the span.
+
+        Args:
+            error (Exception): Exception which ended the operation. Defaults to None.
+        """
+        self.duration = monotonic() - self._started
+        self.end_time = self.start_time + self.duration
+        if error is not None:
+            self.error = "{type}: {error}".format(
+                type=type(error).__name__, error=error
+            )
+
+    def to_dict(self):
+        # type: () -> Dict[str, Any]
+        """Returns the span as a dict.
+
+        Returns:
+            dict: Span dict.
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration": self.duration,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class Tracer(object):
+    """Receives the start and end events of spans.
+
+    Subclasses override on_start and on_end. They are called in the thread
+    running the operation, so they should be thread safe and return quickly.
+    """
+
+    def on_start(self, span):
+        # type: (Span) -> None
+        """Called when a span starts.
+
+        Args:
+            span (crux.tracing.Span): Started span.
+        """
+
+    def on_end(self, span):
+        # type: (Span) -> None
+        """Called when a span ends.
+
+        Args:
+            span (crux.tracing.Span): Ended span.
+        """
+
+
+class FileExporter(Tracer):
+    """Tracer which appends ended spans to a file, one JSON document per line."""
+
+    def __init__(self, path):
+        # type: (str) -> None
+        """
+        Args:
+            path (str): Path of the file.
+        """
+        self.path = path
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def on_end(self, span):
+        # type: (Span) -> None
+        line = json.dumps(span.to_dict(), sort_keys=True, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        # type: () -> None
+        """Closes the file."""
+        with self._lock:
+            self._file.close()
+
+
+def set_tracer(tracer):
+    # type: (Optional[Tracer]) -> None
+    """Registers the tracer receiving the spans.
+
+    Args:
+        tracer (crux.tracing.Tracer): Tracer, None stops tracing.
+    """
+    global _tracer  # pylint: disable=global-statement
+    _tracer = tracer
+    log.debug("Setting tracer to %s", tracer)
+
+
+def get_tracer():
+    # type: () -> Optional[Tracer]
+    """Returns the registered tracer.
+
+    Returns:
+        crux.tracing.Tracer: Registered tracer, None if there is none.
+    """
+    return _tracer
+
+
+def _stack():
+    # type: () -> List[Span]
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def current_span():
+    # type: () -> Optional[Span]
+    """Returns the active span of the thread.
+
+    Returns:
+        crux.tracing.Span: Active span, None if there is none.
+    """
+    if _tracer is None:
+        return None
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def set_attributes(**attributes):
+    # type: (**Any) -> None
+    """Sets attributes of the active span, if there is one.
+
+    Args:
+        **attributes: Attributes of the span.
+    """
+    active = current_span()
+    if active is not None:
+        active.attributes.update(attributes)
+
+
+def increment(key, amount=1):
+    # type: (str, int) -> None
+    """Adds to a counter attribute of the active span, if there is one.
+
+    Args:
+        key (str): Name of the attribute.
+        amount (int): Number added to the attribute. Defaults to 1.
+    """
+    active = current_span()
+    if active is not None:
+        active.increment(key, amount)
+
+
+class _SpanContext(object):
+    def __init__(self, tracer, name, attributes, active=True):
+        self._tracer = tracer
+        self._span = Span(name, parent=current_span(), attributes=attributes)
+        self._active = active
+
+    def __enter__(self):
+        if self._active:
+            _stack().append(self._span)
+        try:
+            self._tracer.on_start(self._span)
+        except Exception as err:  # pylint: disable=broad-except
+            log.debug("Tracer failed on start of %s: %s", self._span, err)
+        return self._span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._span.end(error=exc_value)
+        if self._active:
+            _stack().pop()
+        try:
+            self._tracer.on_end(self._span)
+        except Exception as err:  # pylint: disable=broad-except
+            log.debug("Tracer failed on end of %s: %s", self._span, err)
+        return False
+
+
+class _NoSpanContext(object):
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NO_SPAN = _NoSpanContext()
+
+
+def span(name, **attributes):
+    # type: (str, **Any) -> Any
+    """Returns a context manager timing an operation in a span.
+
+    Args:
+        name (str): Name of the operation.
+        **attributes: Attributes of the span.
+
+    Returns:
+        Context manager whose value is the span, None if no tracer is registered.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return _SpanContext(tracer, name, attributes)
+
+
+def detached_span(name, **attributes):
+    # type: (str, **Any) -> Any
+    """Returns a context manager timing an operation in a span which isn't active.
+
+    The coroutines of asyncio tasks take turns in one thread, so the span of one
+    of them can't be the active span of the thread. The span is a child of the
+    span active when it's created, the spans started during it aren't its
+    children.
+
+    Args:
+        name (str): Name of the operation.
+        **attributes: Attributes of the span.
+
+    Returns:
+        Context manager whose value is the span, None if no tracer is registered.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return _SpanContext(tracer, name, attributes, active=False)
+
+
+def traced(name):
+    # type: (str) -> Callable
+    """Decorates a function to run it in a span.
+
+    Args:
+        name (str): Name of the span.
+
+    Returns:
+        Decorator.
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with _SpanContext(tracer, name, None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def bind(func):
+    # type: (Callable) -> Callable
+    """Binds a function to the active span, for it to run in another thread.
+
+    Spans started by the function are children of the active span, rather than
+    of the active span of the thread it runs in.
+
+    Args:
+        func (callable): Function.
+
+    Returns:
+        callable: Bound function, func itself if there is no active span.
+    """
+    parent = current_span()
+    if parent is None:
+        return func
+
+    @functools.wraps(func)
+    def bound(*args, **kwargs):
+        stack = _stack()
+        stack.append(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stack.pop()
+
+    return bound
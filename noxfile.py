@@ -30,6 +30,9 @@ def unit(session):
     """Run unit tests."""
     session.install("pytest")
     session.install("-r", "requirements.txt")
+    session.install("numpy")
+    if session.python not in ("2.7", "3.5"):
+        session.install("aiohttp")
     session.run("python", "-m", "pytest", "tests/unit")
 
 
@@ -55,3 +58,16 @@ def type_check(session):
     session.install("-r", "requirements.txt")
     session.install("mypy")
     session.run("mypy", "crux")
+
+
+@nox.session(python=["3.7"])
+def benchmark(session):
+    """Run benchmarks against the fake Crux API.
+
+    Arguments after -- are passed to benchmarks/suite.py, for example:
+    nox -s benchmark -- --quick --compare benchmarks/baseline.json
+    """
+    session.install("-r", "requirements.txt")
+    session.run(
+        "python", "benchmarks/suite.py", *session.posargs, env={"PYTHONPATH": "."}
+    )
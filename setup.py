@@ -10,9 +10,12 @@ from setuptools import find_packages, setup
 here = os.path.abspath(os.path.dirname(__file__))
 requirements = [
     "enum34;python_version<'3.4'",
+    "futures;python_version<'3.2'",
+    "scandir;python_version<'3.5'",
     "google-resumable-media[requests]",
     "typing;python_version<'3.5'",
 ]
+extras = {"async": ["aiohttp>=3.5;python_version>='3.6'"], "numpy": ["numpy"]}
 packages = [pkg for pkg in find_packages() if pkg.startswith("crux")]
 
 version = {}
@@ -35,6 +38,7 @@ setup(
     python_requires=">=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*, !=3.4.*",
     license="MIT",
     install_requires=requirements,
+    extras_require=extras,
     keywords=["crux-python"],
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -0,0 +1,7 @@
+import sys
+
+collect_ignore = []
+
+# The asyncio client uses async generators, which need Python 3.6.
+if sys.version_info < (3, 6):
+    collect_ignore.append("test_aio.py")
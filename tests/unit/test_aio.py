@@ -0,0 +1,299 @@
+import asyncio
+import io
+
+import pytest
+
+web = pytest.importorskip("aiohttp.web")
+
+from crux import RetryPolicy  # noqa: E402
+from crux.aio import AsyncCrux, AsyncFile, AsyncFolder  # noqa: E402
+from crux.exceptions import CruxAPIError, CruxResourceNotFoundError  # noqa: E402
+from crux.models import File  # noqa: E402
+
+CONTENT = b"a,b\n" * 1000
+
+
+def resource_model(resource_id, name, resource_type="file", size=None):
+    return {
+        "resourceId": resource_id,
+        "datasetId": "ds1",
+        "folderId": "root",
+        "name": name,
+        "type": resource_type,
+        "size": size,
+        "tags": [],
+        "description": None,
+    }
+
+
+def make_app(state):
+    resources = {
+        "r0": resource_model("r0", "folder1", resource_type="folder"),
+        "r1": resource_model("r1", "file_1.csv", size=len(CONTENT)),
+        "r2": resource_model("r2", "file_2.csv", size=len(CONTENT)),
+    }
+    state["resources"] = resources
+
+    async def get_dataset(request):
+        if state.get("failures"):
+            state["failures"] -= 1
+            return web.json_response(
+                {"statusCode": 503, "message": "Unavailable"}, status=503
+            )
+        return web.json_response({"datasetId": request.match_info["id"], "name": "ds"})
+
+    async def list_resources(request):
+        state["listings"].append(dict(request.query))
+        offset = int(request.query["offset"])
+        limit = int(request.query["limit"])
+        listing = sorted(resources.values(), key=lambda r: r["resourceId"])
+        if request.query["includeFolders"] == "false":
+            listing = [r for r in listing if r["type"] == "file"]
+        if "name" in request.query:
+            listing = [r for r in listing if r["name"] == request.query["name"]]
+        return web.json_response(listing[offset : offset + limit])  # noqa: E203
+
+    async def create_resource(request):
+        body = await request.json()
+        resource = resource_model("r{}".format(len(resources)), body["name"])
+        resources[resource["resourceId"]] = resource
+        return web.json_response(resource, status=201)
+
+    async def get_resource(request):
+        if request.match_info["id"] not in resources:
+            return web.json_response({"statusCode": 404}, status=404)
+        return web.json_response(resources[request.match_info["id"]])
+
+    async def search(request):
+        results = [r for r in resources.values() if r["type"] == "file"]
+        after = request.query.get("after")
+        if after:
+            results = [r for r in results if r["resourceId"] > after]
+        return web.json_response({"results": results[: int(request.query["limit"])]})
+
+    async def content_url(request):
+        state["signed_urls"] += 1
+        return web.json_response(
+            {"url": "{}/storage/{}".format(state["url"], request.match_info["id"])}
+        )
+
+    async def storage(request):
+        return web.Response(body=CONTENT)
+
+    async def upload_session_start(request):
+        return web.json_response(
+            {
+                "signedURL": {
+                    "url": "{}/upload".format(state["url"]),
+                    "headers": {
+                        "content-type": "text/csv",
+                        "x-goog-resumable": "start",
+                    },
+                },
+                "sessionId": "session1",
+            }
+        )
+
+    async def upload_initiate(request):
+        state["upload_headers"] = dict(request.headers)
+        return web.Response(
+            status=201, headers={"location": "{}/upload/1".format(state["url"])}
+        )
+
+    async def upload_chunk(request):
+        state["uploaded"] += await request.read()
+        total = int(request.headers["content-range"].split("/")[1])
+        if len(state["uploaded"]) < total:
+            return web.Response(
+                status=308,
+                headers={"range": "bytes=0-{}".format(len(state["uploaded"]) - 1)},
+            )
+        return web.Response(status=200)
+
+    async def upload_session_complete(request):
+        state["completed"] = (await request.json())["sessionId"]
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_get("/datasets/{id}", get_dataset)
+    app.router.add_get("/datasets/{id}/resources", list_resources)
+    app.router.add_post("/datasets/{id}/resources", create_resource)
+    app.router.add_post("/datasets/{id}/labels/search", search)
+    app.router.add_get("/resources/{id}", get_resource)
+    app.router.add_post("/resources/{id}/content-url", content_url)
+    app.router.add_post("/resources/{id}/upload-session-start", upload_session_start)
+    app.router.add_post(
+        "/resources/{id}/upload-session-complete", upload_session_complete
+    )
+    app.router.add_get("/storage/{id}", storage)
+    app.router.add_post("/upload", upload_initiate)
+    app.router.add_put("/upload/1", upload_chunk)
+    return app
+
+
+def run(coroutine_function, **crux_kwargs):
+    loop = asyncio.new_event_loop()
+    state = {"listings": [], "signed_urls": 0, "uploaded": b""}
+
+    async def main():
+        runner = web.AppRunner(make_app(state))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        state["url"] = "http://127.0.0.1:{}".format(port)
+        conn = AsyncCrux(
+            api_key="1235",
+            api_host=state["url"],
+            api_prefix="",
+            only_use_crux_domains=False,
+            **crux_kwargs
+        )
+        try:
+            await coroutine_function(conn, state)
+        finally:
+            await conn.close()
+            await runner.cleanup()
+
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+    return state
+
+
+def test_list_resources():
+    async def list_resources(conn, state):
+        dataset = await conn.get_dataset("ds1")
+        resources = [
+            resource
+            async for resource in dataset.list_resources(
+                page_size=2, include_folders=True
+            )
+        ]
+        assert [type(resource) for resource in resources] == [
+            AsyncFolder,
+            AsyncFile,
+            AsyncFile,
+        ]
+        assert [resource.path for resource in resources] == [
+            "/folder1",
+            "/file_1.csv",
+            "/file_2.csv",
+        ]
+        assert [listing["offset"] for listing in state["listings"]] == ["0", "2"]
+
+    run(list_resources)
+
+
+def test_find_resources_by_label():
+    async def find_resources(conn, state):
+        dataset = await conn.get_dataset("ds1")
+        names = [
+            resource.name
+            async for resource in dataset.find_resources_by_label(
+                predicates=[{"op": "eq", "key": "k", "val": "v"}], max_per_page=1
+            )
+        ]
+        assert names == ["file_1.csv", "file_2.csv"]
+
+    run(find_resources)
+
+
+def test_download_and_iter_content():
+    async def download(conn, state):
+        dataset = await conn.get_dataset("ds1")
+        file_resource = await dataset.get_file("/file_1.csv")
+
+        file_obj = io.BytesIO()
+        assert await file_resource.download(file_obj)
+        assert file_obj.getvalue() == CONTENT
+
+        chunks = [chunk async for chunk in file_resource.iter_content()]
+        assert b"".join(chunks) == CONTENT
+        assert state["signed_urls"] == 1
+
+        # Downloads run concurrently on the event loop.
+        file_objs = [io.BytesIO() for _ in range(10)]
+        await asyncio.gather(
+            *[file_resource.download(file_obj) for file_obj in file_objs]
+        )
+        assert all(file_obj.getvalue() == CONTENT for file_obj in file_objs)
+
+    run(download)
+
+
+def test_upload_file(monkeypatch):
+    monkeypatch.setattr("crux.aio.models.DEFAULT_CHUNK_SIZE", 1024)
+
+    async def upload(conn, state):
+        dataset = await conn.get_dataset("ds1")
+        file_obj = io.BytesIO(CONTENT)
+        file_obj.name = "upload.csv"
+        file_resource = await dataset.upload_file(file_obj, "/upload.csv")
+
+        assert file_resource.name == "upload.csv"
+        assert file_resource.path == "/upload.csv"
+        assert state["uploaded"] == CONTENT
+        assert state["upload_headers"]["x-goog-resumable"] == "start"
+        assert state["completed"] == "session1"
+
+        cache = conn.api_client.signed_url_cache
+        file_resource = await dataset.get_file("/file_1.csv")
+        await file_resource.download(io.BytesIO())
+        assert cache.get(file_resource.id)
+        # A new upload makes the cached signed URL stale.
+        await file_resource.upload(io.BytesIO(CONTENT), media_type="text/csv")
+        assert cache.get(file_resource.id) is None
+
+    run(upload)
+
+
+def test_resource_not_found():
+    async def missing(conn, state):
+        dataset = await conn.get_dataset("ds1")
+        with pytest.raises(CruxResourceNotFoundError):
+            await dataset.get_file("/missing.csv")
+        with pytest.raises(CruxResourceNotFoundError) as error:
+            await conn.get_resource("missing")
+        assert error.value.status_code == 404
+
+    run(missing)
+
+
+def test_sync_methods_not_inherited():
+    async def sync_methods(conn, state):
+        dataset = await conn.get_dataset("ds1")
+        file_resource = await dataset.get_file("/file_1.csv")
+
+        # Only the fields of the synchronous models are shared.
+        assert not isinstance(file_resource, File)
+        assert file_resource.path == "/file_1.csv"
+        assert not hasattr(file_resource, "add_label")
+        assert not hasattr(dataset, "walk")
+        assert not hasattr(dataset, "download_files")
+
+    run(sync_methods)
+
+
+def test_retries_share_the_policy():
+    retry_policy = RetryPolicy(backoff_factor=0, budget_ratio=0, budget_reserve=2)
+
+    async def retries(conn, state):
+        state["failures"] = 1
+        dataset = await conn.get_dataset("ds1")
+        assert dataset.id == "ds1"
+        assert retry_policy.stats()["retries"] == 1
+
+        endpoint = conn.api_client.metrics.snapshot()["endpoints"]["GET /datasets/{id}"]
+        assert endpoint["calls"] == 1
+        assert endpoint["retries"] == 1
+
+        # The budget has one retry left, so the second failure is returned.
+        state["failures"] = 2
+        with pytest.raises(CruxAPIError) as error:
+            await conn.get_dataset("ds1")
+        assert error.value.status_code == 503
+        assert retry_policy.stats()["denied"] == 1
+
+    run(retries, retry_policy=retry_policy, metrics=True)
@@ -0,0 +1,145 @@
+import copy
+
+from crux import _cache
+from crux._cache import CachedResponse, ConditionalCache, TTLCache
+
+
+def test_ttl_cache_lru_eviction():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2}
+
+
+def test_ttl_cache_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(_cache, "monotonic", lambda: now[0])
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+
+    now[0] += 20
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.pop("b") == 2
+    assert cache.get("b", "default") == "default"
+
+
+def test_ttl_cache_disabled():
+    cache = TTLCache(ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_copy():
+    cache = TTLCache()
+    cache.set("a", 1)
+    assert copy.deepcopy(cache).get("a") == 1
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+def test_conditional_cache_revalidation():
+    cache = ConditionalCache(maxsize=2)
+    sent = []
+
+    def send(status_code):
+        def send_request(headers):
+            sent.append(headers)
+            return FakeResponse(status_code, b"{}", {"etag": '"v1"'})
+
+        return send_request
+
+    assert cache.fetch("a", send(200)).status_code == 200
+    cached = cache.fetch("a", send(304))
+
+    assert isinstance(cached, CachedResponse)
+    assert cached.content == b"{}"
+    assert sent == [{}, {"if-none-match": '"v1"'}]
+
+    cache.fetch("b", send(200))
+    cache.fetch("c", send(200))
+    assert len(cache) == 2
+    assert cache.invalidate("c") == 1
+    assert cache.stats() == {"hits": 0, "revalidations": 1, "misses": 3, "entries": 1}
+
+
+def test_conditional_cache_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(_cache, "monotonic", lambda: now[0])
+    cache = ConditionalCache(maxsize=10, ttl=5)
+    sent = []
+
+    def send(headers):
+        sent.append(headers)
+        return FakeResponse(200, b"[]")
+
+    cache.fetch("a", send)
+    assert isinstance(cache.fetch("a", send), CachedResponse)
+    now[0] += 10
+    assert cache.fetch("a", send).status_code == 200
+
+    assert sent == [{}, {}]
+    assert cache.stats()["hits"] == 1
+
+    disabled = ConditionalCache()
+    disabled.fetch("a", send)
+    assert len(disabled) == 0
+    assert copy.deepcopy(cache).stats() == cache.stats()
+
+
+def test_conditional_cache_invalidate_path_segments():
+    cache = ConditionalCache(maxsize=10)
+    urls = [
+        "https://api/resources/1",
+        "https://api/resources/1/content",
+        "https://api/resources/10",
+        "https://api/resources/1xyz",
+    ]
+
+    def send(status_code):
+        return lambda headers: FakeResponse(status_code, b"{}", {"etag": '"v1"'})
+
+    for url in urls:
+        cache.fetch((url, (), None), send(200))
+
+    assert cache.invalidate("https://api/resources/1/") == 2
+    revalidated = [
+        url
+        for url in urls
+        if isinstance(cache.fetch((url, (), None), send(304)), CachedResponse)
+    ]
+    assert revalidated == ["https://api/resources/10", "https://api/resources/1xyz"]
+
+
+def test_conditional_cache_invalidate_related():
+    cache = ConditionalCache(maxsize=10, ttl=60)
+    urls = [
+        "https://api/resources/1",
+        "https://api/resources/10",
+        "https://api/datasets/a",
+        "https://api/datasets/a/resources",
+        "https://api/datasets/b/resources",
+        "https://api/datasets/b/permissions",
+    ]
+    for url in urls:
+        cache.fetch((url, (), None), lambda headers: FakeResponse(200, b"{}", {}))
+
+    assert cache.invalidate_related("https://api/datasets/a/resources/1/labels/k") == 3
+    cached = [url for url in urls if cache._responses.get((url, (), None))]
+    assert cached == [
+        "https://api/resources/10",
+        "https://api/datasets/a",
+        "https://api/datasets/b/permissions",
+    ]
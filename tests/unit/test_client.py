@@ -1,4 +1,7 @@
+import io
 import os
+import threading
+import time
 
 import pytest
 import requests
@@ -14,6 +17,7 @@ from requests.models import Response
 
 
 from crux._client import CruxClient
+from crux._config import CruxConfig
 from crux.exceptions import (
     CruxClientConnectionError,
     CruxClientHTTPError,
@@ -367,3 +371,144 @@ def test_client_too_many_redirects_exception(client, monkeypatch):
 
     with pytest.raises(CruxClientTooManyRedirects):
         client.api_call(method="GET", path=["test-path"], model=SampleModel)
+
+
+def test_client_decodes_json_once(client, monkeypatch):
+    sent = {}
+
+    def request(self, method=None, url=None, headers=None, data=None, json=None, **kwargs):
+        sent["data"] = data
+        sent["json"] = json
+        get_resp = Response()
+        get_resp.status_code = 200
+        get_resp._content = b'[{"attr1":"dummy1"},{"attr1":"dummy2"}]'
+        return get_resp
+
+    codec = client.crux_config.json_codec
+    loads_calls = []
+    monkeypatch.setattr(
+        codec, "loads", lambda content: loads_calls.append(content) or [{"attr1": "a"}]
+    )
+    monkeypatch.setattr(requests.sessions.Session, "request", request)
+
+    resp = client.api_call(
+        method="POST", path=["test-path"], model=SampleModel, json={"query": 1}
+    )
+
+    assert [obj.attr_1 for obj in resp] == ["a"]
+    assert len(loads_calls) == 1
+    assert sent["json"] is None
+    assert sent["data"] == codec.dumps({"query": 1})
+
+
+def test_client_iterates_list_response(client, monkeypatch):
+    responses = []
+
+    def request(self, method=None, url=None, stream=None, **kwargs):
+        get_resp = Response()
+        get_resp.status_code = 200
+        get_resp.raw = io.BytesIO(b'[{"attr1":"dummy1"},{"attr1":"dummy2"}]')
+        responses.append((stream, get_resp))
+        return get_resp
+
+    monkeypatch.setattr(requests.sessions.Session, "request", request)
+
+    resp = client.api_call(
+        method="GET", path=["test-path"], model=SampleModel, iterate=True
+    )
+
+    assert not isinstance(resp, list)
+    assert [obj.attr_1 for obj in resp] == ["dummy1", "dummy2"]
+    stream, get_resp = responses[0]
+    assert stream is True
+    assert get_resp.raw.closed
+
+
+def test_client_metadata_cache(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    client = CruxClient(crux_config=CruxConfig(metadata_cache_size=10))
+    sent = []
+
+    def request(self, method=None, url=None, headers=None, **kwargs):
+        sent.append((method, headers.get("if-none-match")))
+        resp = Response()
+        if method == "GET" and headers.get("if-none-match") == '"v1"':
+            resp.status_code = 304
+            resp._content = b""
+        else:
+            resp.status_code = 200
+            resp.headers["ETag"] = '"v1"'
+            resp._content = b'{"attr1":"dummy1"}'
+        return resp
+
+    monkeypatch.setattr(requests.sessions.Session, "request", request)
+
+    first = client.api_call("GET", ["test-path"], model=SampleModel)
+    second = client.api_call("GET", ["test-path"], model=SampleModel)
+    client.api_call("PUT", ["test-path"], model=SampleModel, json={})
+    client.api_call("GET", ["test-path"], model=SampleModel)
+
+    assert first.attr_1 == second.attr_1 == "dummy1"
+    assert first.raw_model is not second.raw_model
+    assert sent == [("GET", None), ("GET", '"v1"'), ("PUT", None), ("GET", None)]
+    assert client.metadata_cache.stats()["revalidations"] == 1
+
+
+def test_client_single_flight(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    client = CruxClient(crux_config=CruxConfig(single_flight=True))
+    sent = []
+    release = threading.Event()
+
+    def request(self, method=None, url=None, **kwargs):
+        sent.append(method)
+        release.wait(5)
+        resp = Response()
+        resp.status_code = 200
+        resp._content = b'{"attr1":"dummy1"}'
+        return resp
+
+    monkeypatch.setattr(requests.sessions.Session, "request", request)
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                client.api_call("GET", ["test-path"], model=SampleModel)
+            )
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert sent == ["GET"]
+    assert [obj.attr_1 for obj in results] == ["dummy1"] * 4
+    assert len(set(id(obj.raw_model) for obj in results)) == 4
+    assert client.single_flight.shared == 3
+
+
+def test_client_adaptive_concurrency(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    client = CruxClient(crux_config=CruxConfig(adaptive_concurrency=True))
+    statuses = [429, 503, 200]
+
+    def request(self, method=None, url=None, **kwargs):
+        resp = Response()
+        resp.status_code = statuses.pop(0)
+        resp.headers["Retry-After"] = "0"
+        resp._content = b'{"attr1":"dummy1"}'
+        return resp
+
+    monkeypatch.setattr(requests.sessions.Session, "request", request)
+
+    resp = client.api_call("GET", ["test-path"], model=SampleModel)
+
+    assert resp.attr_1 == "dummy1"
+    assert statuses == []
+    assert client.limiter.stats()["overloads"] == 2
+    assert client.limiter.limit == 2
@@ -0,0 +1,78 @@
+import copy
+import json
+import os
+
+import pytest
+
+from crux._client import CruxClient
+from crux.models import CompactResource, File, Folder
+
+
+RAW_MODEL = {
+    "resourceId": "12345",
+    "name": "test_file.csv",
+    "type": "file",
+    "datasetId": "67890",
+    "folderId": "54321",
+    "mediaType": "text/csv",
+    "size": 10,
+    "tags": [],
+    "labels": [{"labelKey": "key", "labelValue": "value"}],
+    "provenance": {},
+}
+
+
+@pytest.fixture
+def conn():
+    os.environ["CRUX_API_KEY"] = "1235"
+    return CruxClient(crux_config=None)
+
+
+def test_compact_resource_fields(conn):
+    record = CompactResource.from_dict(dict(RAW_MODEL), connection=conn)
+
+    assert record.id == "12345"
+    assert record.size == 10
+    assert record.tags == []
+    assert record.labels == {"key": "value"}
+    assert record.to_dict() == RAW_MODEL
+    assert copy.deepcopy(record).to_dict() == RAW_MODEL
+    with pytest.raises(KeyError):
+        record.description
+    assert not hasattr(record, "__dict__")
+
+
+def test_compact_resource_interns_shared_fields(conn):
+    first = CompactResource.from_dict(dict(RAW_MODEL), connection=conn)
+    second = CompactResource.from_dict(json.loads(json.dumps(RAW_MODEL)), connection=conn)
+
+    assert first.dataset_id is second.dataset_id
+    assert first.media_type is second.media_type
+
+
+def test_compact_resource_folder_from_cache(conn):
+    record = CompactResource.from_dict(dict(RAW_MODEL), connection=conn)
+    record._set_folder("/folder1")
+
+    other = CompactResource.from_dict(
+        dict(RAW_MODEL, resourceId="23456", name="other.csv"), connection=conn
+    )
+
+    assert other.path == "/folder1/other.csv"
+    assert conn.resource_id_cache.get(("67890", "/folder1/other.csv")) is None
+    assert conn.resource_id_cache.get(("67890", "/folder1/test_file.csv")) == "12345"
+
+
+def test_compact_resource_expands_on_mutation(conn):
+    record = CompactResource.from_dict(dict(RAW_MODEL), connection=conn)
+    record._set_folder("/folder1")
+
+    record.name = "renamed.csv"
+
+    assert isinstance(record.expand(), File)
+    assert record.name == "renamed.csv"
+    assert record.path == "/folder1/renamed.csv"
+    assert record.download == record.expand().download
+
+    folder = CompactResource.from_dict(dict(RAW_MODEL, type="folder"), connection=conn)
+    assert isinstance(folder.expand(), Folder)
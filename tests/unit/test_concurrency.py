@@ -0,0 +1,75 @@
+import copy
+import threading
+
+import pytest
+
+from crux import _concurrency
+from crux._concurrency import AdaptiveLimiter, parse_retry_after, SingleFlight
+
+
+def test_adaptive_limiter_aimd(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(_concurrency, "monotonic", lambda: now[0])
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=5)
+
+    for _ in range(8):
+        limiter.release(limiter.acquire())
+    assert limiter.limit == 5
+
+    tokens = [limiter.acquire() for _ in range(3)]
+    # Requests sent before the decrease don't decrease the limit again.
+    assert limiter.release(tokens[0], overloaded=True, retry_after=2) == 2
+    limiter.release(tokens[1], overloaded=True, retry_after=1)
+    assert limiter.limit == 2
+    assert limiter.release(tokens[2], overloaded=True) == pytest.approx(1.2)
+
+    now[0] += 5
+    limiter.release(limiter.acquire(), overloaded=True)
+    assert limiter.limit == 1
+    assert limiter.stats() == {
+        "limit": 1,
+        "in_flight": 0,
+        "queue_depth": 0,
+        "overloads": 4,
+    }
+    assert copy.deepcopy(limiter).limit == 1
+
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(initial_limit=0)
+
+
+def test_adaptive_limiter_bounds_in_flight():
+    limiter = AdaptiveLimiter(initial_limit=1)
+    token = limiter.acquire()
+    assert limiter.try_acquire() is None
+    acquired = threading.Event()
+
+    def acquire():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    assert not acquired.wait(0.1)
+    assert limiter.queue_depth == 1
+
+    limiter.release(token)
+    thread.join(1)
+    assert acquired.is_set()
+    assert limiter.in_flight == 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+def test_single_flight_error():
+    flight = SingleFlight()
+
+    with pytest.raises(KeyError):
+        flight.do("key", lambda: {}["missing"])
+
+    assert flight.do("key", lambda: 1) == (1, False)
@@ -3,7 +3,21 @@ import os
 import pytest
 
 from crux._client import CruxClient
-from crux.models import Dataset, Delivery, File, Folder, Label, Resource, StitchJob
+from crux.exceptions import (
+    CruxClientError,
+    CruxResourceNotFoundError,
+    CruxTransferError,
+)
+from crux.models import (
+    CompactResource,
+    Dataset,
+    Delivery,
+    File,
+    Folder,
+    Label,
+    Resource,
+    StitchJob,
+)
 
 
 @pytest.fixture(scope="module")
@@ -209,6 +223,140 @@ def test_download_files(dataset, monkeypatch):
     assert file_path_list[1] == "/tmp/file_2.csv"
 
 
+def monkeypatch_list_resources_tree(folder=None, **kwargs):
+    listing = {
+        "/": [
+            Resource(raw_model={"name": "folder1", "type": "folder"}),
+            Resource(raw_model={"name": "file_1.csv", "type": "file", "size": 10}),
+        ],
+        "/folder1": [
+            Resource(raw_model={"name": "file_2.csv", "type": "file", "size": 20}),
+            Resource(raw_model={"name": "broken.csv", "type": "file", "size": 30}),
+        ],
+    }
+    return listing[folder]
+
+
+def monkeypatch_file_download(self, dest, only_use_crux_domains=None):
+    if self.name == "broken.csv":
+        raise CruxClientError("Unable to download")
+    with open(dest, "w") as file_obj:
+        file_obj.write(self.name)
+    return True
+
+
+def test_download_files_concurrently(dataset, monkeypatch, tmpdir):
+    monkeypatch.setattr(dataset, "_list_resources", monkeypatch_list_resources_tree)
+    monkeypatch.setattr(File, "download", monkeypatch_file_download)
+    local_path = str(tmpdir)
+
+    with pytest.raises(CruxTransferError) as transfer_error:
+        dataset.download_files(
+            folder="/", local_path=local_path, workers=2, max_bytes_in_flight=25
+        )
+
+    broken_path = os.path.join(local_path, "folder1", "broken.csv")
+    assert list(transfer_error.value.errors) == [broken_path]
+    assert transfer_error.value.completed == [
+        os.path.join(local_path, "file_1.csv"),
+        os.path.join(local_path, "folder1", "file_2.csv"),
+    ]
+    with open(os.path.join(local_path, "folder1", "file_2.csv")) as file_obj:
+        assert file_obj.read() == "file_2.csv"
+
+
+def test_download_files_while_listing(dataset, monkeypatch, tmpdir):
+    events = []
+
+    def list_resources(folder=None, **kwargs):
+        for resource in monkeypatch_list_resources_tree(folder=folder):
+            events.append("listed " + resource.name)
+            yield resource
+        events.append("listed " + folder)
+
+    def download(self, dest, only_use_crux_domains=None):
+        events.append("downloaded " + self.name)
+        return True
+
+    monkeypatch.setattr(dataset, "_list_resources", list_resources)
+    monkeypatch.setattr(File, "download", download)
+    local_path = str(tmpdir)
+
+    file_path_list = dataset.download_files(folder="/", local_path=local_path)
+
+    assert file_path_list == [
+        os.path.join(local_path, "file_1.csv"),
+        os.path.join(local_path, "folder1", "file_2.csv"),
+        os.path.join(local_path, "folder1", "broken.csv"),
+    ]
+    assert events == [
+        "listed folder1",
+        "listed file_1.csv",
+        "downloaded file_1.csv",
+        "listed /",
+        "listed file_2.csv",
+        "downloaded file_2.csv",
+        "listed broken.csv",
+        "downloaded broken.csv",
+        "listed /folder1",
+    ]
+
+
+def test_walk(dataset, monkeypatch):
+    monkeypatch.setattr(dataset, "_list_resources", monkeypatch_list_resources_tree)
+
+    def fail_get_folder(self):
+        raise AssertionError("walk should set the folder of the resources")
+
+    monkeypatch.setattr(Resource, "_get_folder", fail_get_folder)
+
+    tree = {}
+    for folder_path, folders, files in dataset.walk(workers=2):
+        tree[folder_path] = (
+            [folder.path for folder in folders],
+            [file_resource.path for file_resource in files],
+        )
+
+    assert tree == {
+        "/": (["/folder1"], ["/file_1.csv"]),
+        "/folder1": ([], ["/folder1/file_2.csv", "/folder1/broken.csv"]),
+    }
+
+
+def test_walk_prune(dataset, monkeypatch):
+    monkeypatch.setattr(dataset, "_list_resources", monkeypatch_list_resources_tree)
+
+    walked = []
+    for folder_path, folders, _ in dataset.walk():
+        walked.append(folder_path)
+        del folders[:]
+
+    assert walked == ["/"]
+
+
+def test_walk_onerror(dataset, monkeypatch):
+    def list_resources(folder=None, **kwargs):
+        if folder == "/folder1":
+            raise CruxClientError("Unable to list")
+        return monkeypatch_list_resources_tree(folder=folder, **kwargs)
+
+    monkeypatch.setattr(dataset, "_list_resources", list_resources)
+
+    errors = []
+    walked = [
+        folder_path
+        for folder_path, _, _ in dataset.walk(
+            onerror=lambda folder_path, err: errors.append(folder_path)
+        )
+    ]
+
+    assert walked == ["/"]
+    assert errors == ["/folder1"]
+
+    with pytest.raises(CruxClientError):
+        list(dataset.walk())
+
+
 def monkeypatch_upload_files(
     media_type, folder, local_path, description=None, tags=None
 ):
@@ -246,6 +394,38 @@ def test_upload_files(dataset, monkeypatch):
     assert file_list[1].name == "test_file_2.txt"
 
 
+def test_upload_files_concurrently(dataset, monkeypatch, tmpdir):
+    tmpdir.join("file_1.csv").write("1")
+    tmpdir.mkdir("folder1").join("file_2.csv").write("2")
+    tmpdir.join("folder1", "broken.csv").write("3")
+    created_folders = []
+
+    def create_folder(path, tags=None, description=None):
+        created_folders.append(path)
+        return Folder(raw_model={"name": os.path.basename(path), "type": "folder"})
+
+    def upload_file(src, dest, **kwargs):
+        # Every folder must exist before files inside it are uploaded.
+        assert os.path.dirname(dest) in created_folders + ["/"]
+        if dest.endswith("broken.csv"):
+            raise CruxClientError("Unable to upload")
+        return File(raw_model={"name": os.path.basename(dest), "type": "file"})
+
+    monkeypatch.setattr(dataset, "create_folder", create_folder)
+    monkeypatch.setattr(dataset, "upload_file", upload_file)
+
+    with pytest.raises(CruxTransferError) as transfer_error:
+        dataset.upload_files(local_path=str(tmpdir), folder="/", workers=2)
+
+    assert created_folders == ["/folder1"]
+    assert list(transfer_error.value.errors) == [
+        str(tmpdir.join("folder1", "broken.csv"))
+    ]
+    assert sorted(
+        file_object.name for file_object in transfer_error.value.completed
+    ) == ["file_1.csv", "file_2.csv"]
+
+
 def monkeypatch_get_delivery(*args, **kwargs):
     return Delivery(
         raw_model={
@@ -280,3 +460,262 @@ def test_get_ingestions(dataset, monkeypatch):
             assert ingestion.versions == [0, 1]
         if ingestion.id == "xyz123":
             assert ingestion.versions == [0]
+
+
+def test_iter_resources(dataset, monkeypatch):
+    requested_offsets = []
+
+    def monkeypatch_list_resources(offset=None, limit=None, **kwargs):
+        requested_offsets.append(offset)
+        return [
+            Resource(raw_model={"name": "file_{}".format(index)})
+            for index in range(offset, min(offset + limit, 5))
+        ]
+
+    monkeypatch.setattr(dataset, "_list_resources", monkeypatch_list_resources)
+
+    resources = dataset.iter_resources(folder="/", page_size=2, prefetch=2)
+
+    assert [resource.name for resource in resources] == [
+        "file_0",
+        "file_1",
+        "file_2",
+        "file_3",
+        "file_4",
+    ]
+    assert requested_offsets == [0, 2, 4]
+
+
+def test_iter_resources_error(dataset, monkeypatch):
+    def monkeypatch_list_resources(offset=None, limit=None, **kwargs):
+        if offset:
+            raise CruxClientError("Unable to list")
+        return [Resource(raw_model={"name": "file_0"})]
+
+    monkeypatch.setattr(dataset, "_list_resources", monkeypatch_list_resources)
+
+    resources = dataset.iter_resources(folder="/", page_size=1)
+
+    assert next(resources).name == "file_0"
+    with pytest.raises(CruxClientError):
+        next(resources)
+
+
+def test_find_resources_by_label_prefetch(dataset, monkeypatch):
+    requested_params = []
+
+    class MockResponse(object):
+        def __init__(self, results):
+            self.results = results
+            self.content = b"{}" * len(results)
+
+        def json(self):
+            return {"results": self.results}
+
+    def monkeypatch_search(*args, **kwargs):
+        params = dict(kwargs["params"])
+        requested_params.append(params)
+        start = int(params.get("after", -1)) + 1
+        stop = min(start + params["limit"], 25)
+        return MockResponse(
+            [
+                {"resourceId": str(index), "type": "file", "name": str(index)}
+                for index in range(start, stop)
+            ]
+        )
+
+    monkeypatch.setattr(dataset.connection, "api_call", monkeypatch_search)
+
+    resources = dataset.find_resources_by_label(
+        predicates=[{"op": "eq", "key": "key1", "val": "value1"}],
+        max_per_page=10,
+        prefetch=1,
+        auto_page_size=True,
+    )
+
+    assert [resource.id for resource in resources] == [str(i) for i in range(25)]
+    assert [params["limit"] for params in requested_params] == [10, 20, 40]
+    assert [params.get("after") for params in requested_params] == [None, "9", "24"]
+
+
+def test_find_resources_by_label_as_table(dataset, monkeypatch):
+    calls = []
+
+    class MockResponse(object):
+        def __init__(self, data):
+            self.data = data
+            self.content = b"{}"
+
+        def json(self):
+            return self.data
+
+    def monkeypatch_api_call(method, path, **kwargs):
+        calls.append("/".join(path))
+        if path[-1] == "folderpath":
+            return MockResponse({"path": "/folder_" + path[1][-1]})
+        if "after" in kwargs["params"]:
+            return MockResponse({"results": []})
+        return MockResponse(
+            {
+                "results": [
+                    {
+                        "resourceId": "r{}".format(index),
+                        "type": "file",
+                        "name": str(index),
+                        "folderId": "f{}".format(index % 2),
+                    }
+                    for index in range(4)
+                ]
+            }
+        )
+
+    monkeypatch.setattr(dataset.connection, "api_call", monkeypatch_api_call)
+    monkeypatch.setattr(dataset.connection, "folder_path_cache", None)
+
+    table = dataset.find_resources_by_label(predicates=[], as_table=True)
+
+    # The folder path is read once per folder.
+    assert list(table.column("folder")) == ["/folder_0", "/folder_1"] * 2
+    assert calls.count("resources/r0/folderpath") == 1
+    assert calls.count("resources/r1/folderpath") == 1
+    assert len(calls) == 4
+
+
+class FakeJSONResponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeResourcesAPI(object):
+    def __init__(self, connection, resources):
+        self.connection = connection
+        self.resources = resources
+        self.calls = []
+
+    def __call__(self, method, path, model=None, headers=None, params=None, **kwargs):
+        self.calls.append((method, "/".join(path), params))
+        if path[0] == "resources":
+            for resource in self.resources:
+                if resource["resourceId"] != path[1]:
+                    continue
+                if path[-1] == "folderpath":
+                    return FakeJSONResponse({"path": resource["folder"]})
+                return model.from_dict(dict(resource), connection=self.connection)
+            raise CruxResourceNotFoundError({"statusCode": 404})
+        listing = [
+            resource
+            for resource in self.resources
+            if resource["folder"] == params["folder"]
+            and params.get("name", resource["name"]) == resource["name"]
+        ]
+        return [
+            model.from_dict(dict(resource), connection=self.connection)
+            for resource in listing
+        ]
+
+
+@pytest.fixture
+def resources_dataset(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    conn = CruxClient(crux_config=None)
+    api = FakeResourcesAPI(
+        conn,
+        [
+            {
+                "resourceId": "r{}".format(i),
+                "datasetId": "12345",
+                "name": "file_{}.csv".format(i),
+                "type": "file",
+                "folder": "/folder1",
+                "folderId": "f1",
+            }
+            for i in range(3)
+        ]
+    )
+    monkeypatch.setattr(conn, "api_call", api)
+    return Dataset(raw_model={"datasetId": "12345"}, connection=conn), api
+
+
+def test_resolve_paths(resources_dataset):
+    dataset, api = resources_dataset
+
+    paths = ["/folder1/file_0.csv", "/folder1/file_2.csv"]
+    assert dataset.resolve_paths(paths) == {
+        "/folder1/file_0.csv": "r0",
+        "/folder1/file_2.csv": "r2",
+    }
+    assert len(api.calls) == 1
+
+    # The listing cached the other resources of the folder too, whose cached
+    # IDs are checked by fetching the resource.
+    assert dataset.resolve_paths(["/folder1/file_1.csv"]) == {"/folder1/file_1.csv": "r1"}
+    assert dataset._resource_exists("/folder1/file_1.csv")
+    assert [call[:2] for call in api.calls[1:]] == [
+        ("GET", "resources/r1"),
+        ("GET", "resources/r1"),
+    ]
+
+    with pytest.raises(CruxResourceNotFoundError):
+        dataset.resolve_paths(["/folder1/missing.csv"])
+
+
+def test_get_resource_cached_id(resources_dataset):
+    dataset, api = resources_dataset
+
+    dataset.get_file("/folder1/file_0.csv")
+    file_resource = dataset.get_file("/folder1/file_0.csv")
+
+    assert file_resource.id == "r0"
+    assert file_resource.path == "/folder1/file_0.csv"
+    assert [call[:2] for call in api.calls] == [
+        ("GET", "datasets/12345/resources"),
+        ("GET", "resources/r0"),
+    ]
+
+    # A deleted resource falls back to the listing.
+    del api.resources[0]
+    with pytest.raises(CruxResourceNotFoundError):
+        dataset.get_file("/folder1/file_0.csv")
+    assert [call[:2] for call in api.calls[2:]] == [
+        ("GET", "resources/r0"),
+        ("GET", "datasets/12345/resources"),
+    ]
+
+
+def test_get_resource_cached_id_moved(resources_dataset):
+    dataset, api = resources_dataset
+
+    assert dataset._resource_exists("/folder1/file_0.csv")
+
+    # Another client moved the resource, its cached path is stale.
+    api.resources[0].update({"folder": "/folder2", "folderId": "f2"})
+    assert not dataset._resource_exists("/folder1/file_0.csv")
+    assert dataset._cached_resource_id("/folder1/file_0.csv") is None
+    assert [call[:2] for call in api.calls[1:]] == [
+        ("GET", "resources/r0"),
+        ("GET", "resources/r0/folderpath"),
+        ("GET", "datasets/12345/resources"),
+    ]
+
+
+def test_list_resources_compact(resources_dataset):
+    dataset, _ = resources_dataset
+
+    resources = dataset.list_resources(folder="/folder1", limit=None, compact=True)
+
+    assert [type(resource) for resource in resources] == [CompactResource] * 3
+    assert resources[0].path == "/folder1/file_0.csv"
+    assert dataset.resolve_paths(["/folder1/file_2.csv"]) == {"/folder1/file_2.csv": "r2"}
+
+
+def test_list_resources_as_table(resources_dataset):
+    dataset, _ = resources_dataset
+
+    table = dataset.list_resources(folder="/folder1", limit=None, as_table=True)
+
+    assert list(table.column("name")) == ["file_0.csv", "file_1.csv", "file_2.csv"]
+    assert list(table.column("folder")) == ["/folder1"] * 3
+    assert table[1].path == "/folder1/file_1.csv"
@@ -1,6 +1,16 @@
+import io
+import os
+import time
+
 import pytest
+import requests
+from requests.models import Response
 
+from crux._client import CruxClient
+from crux._config import CruxConfig
+from crux.exceptions import CruxClientError
 from crux.models import File, Permission
+from crux.testing import FakeCruxServer
 
 
 @pytest.fixture(scope="module")
@@ -89,3 +99,183 @@ def test_download(monkeypatch, file):
     monkeypatch.setattr(file, "download", monkeypatch_download)
     result = file.download("/tmp/test.csv")
     assert result is True
+
+
+def test_download_ranges(monkeypatch, tmpdir):
+    os.environ["CRUX_API_KEY"] = "1235"
+    chunk_size = 256 * 1024
+    content = bytes(bytearray(i % 251 for i in range(chunk_size * 5 + 100)))
+    ranged_file = File(
+        raw_model={"resourceId": "12345", "name": "big.bin", "size": len(content)},
+        connection=CruxClient(crux_config=None),
+    )
+    signed_urls = iter(["https://signed/{}".format(i) for i in range(100)])
+    expired = set()
+
+    def monkeypatch_get_signed_url(refresh=False):
+        return next(signed_urls)
+
+    def monkeypatch_range_request(self, method, url, headers=None, **kwargs):
+        start, end = [int(i) for i in headers["range"].split("=")[1].split("-")]
+        response = Response()
+        # Expire the signed URL the first time the second range is requested.
+        if start == chunk_size * 2 and not expired:
+            expired.add(url)
+            response.status_code = 400
+            return response
+        response.status_code = 206
+        response.headers["content-range"] = "bytes {}-{}/{}".format(
+            start, min(end, len(content) - 1), len(content)
+        )
+        stop = end + 1
+        response._content = content[start:stop]
+        response.headers["content-length"] = str(len(response._content))
+        return response
+
+    monkeypatch.setattr(ranged_file, "_get_signed_url", monkeypatch_get_signed_url)
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_range_request)
+
+    dest = str(tmpdir.join("big.bin"))
+    assert ranged_file.download(
+        dest, chunk_size=chunk_size, only_use_crux_domains=False, connections=3
+    )
+
+    with open(dest, "rb") as file_obj:
+        assert file_obj.read() == content
+    assert len(expired) == 1
+
+
+def test_download_ranges_at_position(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    chunk_size = 256 * 1024
+    content = bytes(bytearray(i % 251 for i in range(chunk_size * 4)))
+    ranged_file = File(
+        raw_model={"resourceId": "12345", "name": "big.bin", "size": len(content)},
+        connection=CruxClient(crux_config=None),
+    )
+
+    def monkeypatch_range_request(self, method, url, headers=None, **kwargs):
+        start, end = [int(i) for i in headers["range"].split("=")[1].split("-")]
+        response = Response()
+        response.status_code = 206
+        response.headers["content-range"] = "bytes {}-{}/{}".format(
+            start, end, len(content)
+        )
+        stop = end + 1
+        response._content = content[start:stop]
+        response.headers["content-length"] = str(len(response._content))
+        return response
+
+    monkeypatch.setattr(
+        ranged_file, "_get_signed_url", lambda refresh=False: "https://signed/1"
+    )
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_range_request)
+
+    dest = io.BytesIO()
+    dest.write(b"header")
+    ranged_file.download(
+        dest, chunk_size=chunk_size, only_use_crux_domains=False, connections=4
+    )
+
+    assert dest.getvalue() == b"header" + content
+    assert dest.tell() == len(b"header") + len(content)
+
+
+def test_download_ranges_stop_after_failure(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    chunk_size = 256 * 1024
+    size = chunk_size * 40
+    ranged_file = File(
+        raw_model={"resourceId": "12345", "name": "big.bin", "size": size},
+        connection=CruxClient(crux_config=CruxConfig(transfer_pool_maxsize=2)),
+    )
+    requested = []
+
+    def monkeypatch_range_request(self, method, url, headers=None, **kwargs):
+        start, end = [int(i) for i in headers["range"].split("=")[1].split("-")]
+        requested.append(start)
+        response = Response()
+        if start == 0:
+            response.status_code = 404
+            return response
+        # Let the first range fail while the others are downloading.
+        time.sleep(0.01)
+        response.status_code = 206
+        response.headers["content-range"] = "bytes {}-{}/{}".format(start, end, size)
+        response._content = b"0" * (end - start + 1)
+        response.headers["content-length"] = str(len(response._content))
+        return response
+
+    monkeypatch.setattr(
+        ranged_file, "_get_signed_url", lambda refresh=False: "https://signed/1"
+    )
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_range_request)
+
+    with pytest.raises(CruxClientError):
+        ranged_file.download(
+            io.BytesIO(),
+            chunk_size=chunk_size,
+            only_use_crux_domains=False,
+            connections=4,
+        )
+
+    # 2 workers for 4 ranges of 10 chunks: the ranges which hadn't started are
+    # cancelled and the running one stops at its next chunk.
+    assert len(requested) < 10
+
+
+def test_signed_url_cache(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    conn = CruxClient(crux_config=None)
+    cached_file = File(raw_model={"resourceId": "12345"}, connection=conn)
+    signed_urls = iter(["https://signed/1", "https://signed/2"])
+    requested_urls = []
+
+    class MockResponse(object):
+        def json(self):
+            return {"url": next(signed_urls)}
+
+    def monkeypatch_api_call(method, path, **kwargs):
+        assert path == ["resources", "12345", "content-url"]
+        return MockResponse()
+
+    def monkeypatch_get(self, url, **kwargs):
+        requested_urls.append(url)
+        response = Response()
+        response.status_code = 200 if url == "https://signed/2" else 403
+        response._content = b"crux"
+        response._content_consumed = True
+        return response
+
+    monkeypatch.setattr(conn, "api_call", monkeypatch_api_call)
+    monkeypatch.setattr(requests.sessions.Session, "get", monkeypatch_get)
+
+    assert cached_file._get_signed_url() == "https://signed/1"
+    assert cached_file._get_signed_url() == "https://signed/1"
+    # The cached URL is rejected, so it is replaced by a new one.
+    assert b"".join(cached_file.iter_content(only_use_crux_domains=False)) == b"crux"
+    assert requested_urls == ["https://signed/1", "https://signed/2"]
+    assert conn.signed_url_cache.get("12345") == "https://signed/2"
+
+
+def test_signed_url_cache_forgotten():
+    with FakeCruxServer() as server:
+        conn = server.connection()
+        dataset = conn.create_dataset("dataset")
+        file_object = dataset.upload_file(
+            io.BytesIO(b"crux"), "/file.csv", media_type="text/csv"
+        )
+        cache = file_object.connection.signed_url_cache
+
+        file_object.download(io.BytesIO())
+        assert cache.get(file_object.id)
+
+        # A new upload replaces the content the cached URL pointed to.
+        file_object.upload(io.BytesIO(b"crux2"), media_type="text/csv")
+        assert cache.get(file_object.id) is None
+        downloaded = io.BytesIO()
+        file_object.download(downloaded)
+        assert downloaded.getvalue() == b"crux2"
+
+        file_object.delete()
+        assert cache.get(file_object.id) is None
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+def _run(code):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))]
+        + [path for path in [env.get("PYTHONPATH")] if path]
+    )
+    return subprocess.check_output([sys.executable, "-c", code], env=env).decode()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="Requires module __getattr__")
+def test_import_doesnt_load_heavy_modules():
+    output = _run(
+        "import sys, crux\n"
+        "print(' '.join(sorted(name for name in ("
+        "'requests', 'urllib3', 'google.resumable_media', 'platform',"
+        " 'crux.apis', 'crux.models') if name in sys.modules)))"
+    )
+
+    assert output.strip() == ""
+
+
+def test_lazy_exports_resolve():
+    output = _run(
+        "import crux\n"
+        "from crux.models import Dataset, File\n"
+        "print(crux.Crux.__module__, crux.models.File is File, Dataset.__module__)\n"
+        "print('Crux' in dir(crux), 'File' in dir(crux.models))"
+    )
+
+    assert output.split() == [
+        "crux.apis",
+        "True",
+        "crux.models.dataset",
+        "True",
+        "True",
+    ]
+
+
+def test_unknown_attribute_raises():
+    import crux  # pylint: disable=import-outside-toplevel
+
+    with pytest.raises(AttributeError):
+        crux.not_an_attribute  # pylint: disable=pointless-statement
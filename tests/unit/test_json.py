@@ -0,0 +1,60 @@
+import copy
+
+import pytest
+
+from crux._json import get_json_codec, iter_json_array, JSONCodec
+
+
+def test_json_codec_roundtrip():
+    codec = JSONCodec("json")
+    document = {"name": "file.csv", "labels": [{"labelKey": "k", "labelValue": "v"}]}
+
+    assert codec.loads(codec.dumps(document)) == document
+    assert isinstance(codec.dumps(document), bytes)
+    assert codec.loads(u'{"name": "café"}'.encode("utf-8")) == {"name": u"café"}
+
+
+def test_get_json_codec():
+    assert get_json_codec("json").name == "json"
+
+    codec = JSONCodec("json")
+    assert get_json_codec(codec) is codec
+
+    with pytest.raises(ValueError):
+        get_json_codec("yaml")
+
+
+def test_get_json_codec_prefers_fast_library():
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        pytest.skip("orjson is not installed")
+
+    assert get_json_codec().name == "orjson"
+
+
+def test_json_codec_copy():
+    codec = copy.deepcopy(get_json_codec())
+
+    assert codec.loads(b"[1, 2]") == [1, 2]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64])
+def test_iter_json_array(chunk_size):
+    items = [{"name": u"\u00e9t\u00e9", "sizes": [1, 2]}, -1.5e10, 42, True, None, "x"]
+    content = JSONCodec("json").dumps(items)
+    chunks = [
+        content[start:start + chunk_size]
+        for start in range(0, len(content), chunk_size)
+    ]
+
+    assert list(iter_json_array(chunks)) == items
+    assert list(iter_json_array([b" [ ] "])) == []
+
+
+@pytest.mark.parametrize(
+    "content", [b"", b'{"name": "x"}', b"[1, 2", b"[1 2]", b"[1,]", b"[,1]", b"[1,,2]"]
+)
+def test_iter_json_array_invalid(content):
+    with pytest.raises(ValueError):
+        list(iter_json_array([content[:2], content[2:]]))
@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+import requests
+from requests.models import Response
+
+from crux._client import CruxClient
+from crux._config import CruxConfig
+from crux._metrics import endpoint_template, MetricsRegistry
+from crux.models import File
+
+
+@pytest.fixture
+def client():
+    os.environ["CRUX_API_KEY"] = "1235"
+    return CruxClient(crux_config=CruxConfig(metrics=True))
+
+
+def test_endpoint_template():
+    assert endpoint_template(["resources", "12345", "content-url"]) == (
+        "/resources/{id}/content-url"
+    )
+    assert endpoint_template(["datasets", "12345", "labels", "search"]) == (
+        "/datasets/{id}/labels/search"
+    )
+    assert endpoint_template(["identities", "whoami"]) == "/identities/whoami"
+
+
+def test_metrics_registry_exports():
+    registry = MetricsRegistry()
+    registry.record_request("GET", "/resources/{id}", 200, 0.02, response_bytes=100)
+    registry.record_request("GET", "/resources/{id}", 404, 0.2, response_bytes=10)
+    registry.record_request("POST", "/datasets/{id}/resources", None, 1.5, 50)
+    registry.record_retry("POST", "/datasets/{id}/resources")
+    registry.record_transfer("download", 4000000, 2.0)
+
+    snapshot = registry.snapshot()
+    resources = snapshot["endpoints"]["GET /resources/{id}"]
+    assert resources["calls"] == 2
+    assert resources["statuses"] == {"200": 1, "404": 1}
+    assert resources["response_bytes"] == 110
+    assert resources["latency_seconds"]["buckets"]["0.025"] == 1
+    assert resources["latency_seconds"]["buckets"]["+Inf"] == 2
+
+    created = snapshot["endpoints"]["POST /datasets/{id}/resources"]
+    assert (created["errors"], created["retries"], created["request_bytes"]) == (1, 1, 50)
+    assert snapshot["transfers"]["download"]["bytes_per_second"] == 2000000
+
+    assert json.loads(registry.to_json()) == snapshot
+
+    text = registry.to_prometheus()
+    assert "# TYPE crux_request_duration_seconds histogram" in text
+    assert (
+        'crux_requests_total{method="GET",endpoint="/resources/{id}",status="404"} 1'
+        in text
+    )
+    assert (
+        'crux_requests_total{method="POST",endpoint="/datasets/{id}/resources",'
+        'status="error"} 1' in text
+    )
+    assert (
+        'crux_request_duration_seconds_bucket{method="GET",endpoint="/resources/{id}",'
+        'le="0.25"} 2' in text
+    )
+    assert 'crux_transfer_bytes_total{direction="download"} 4000000' in text
+
+    registry.reset()
+    assert registry.snapshot() == {"endpoints": {}, "transfers": {}}
+
+
+def test_client_records_metrics(client, monkeypatch):
+    def request(self, method=None, url=None, data=None, **kwargs):
+        resp = Response()
+        resp.status_code = 200
+        resp._content = b'{"resourceId": "12345"}'
+        return resp
+
+    monkeypatch.setattr(requests.sessions.Session, "request", request)
+
+    client.api_call("GET", ["resources", "12345"])
+    client.api_call("GET", ["resources", "67890"])
+    client.api_call("POST", ["resources", "12345", "content-url"], json={"a": 1})
+
+    endpoints = client.metrics.snapshot()["endpoints"]
+    assert endpoints["GET /resources/{id}"]["calls"] == 2
+    assert endpoints["GET /resources/{id}"]["response_bytes"] == 46
+    assert endpoints["POST /resources/{id}/content-url"]["request_bytes"] == len(
+        client.crux_config.json_codec.dumps({"a": 1})
+    )
+
+
+def test_file_transfer_metrics(client, monkeypatch, tmpdir):
+    file_resource = File(
+        raw_model={"resourceId": "12345", "name": "file.csv", "size": 1000},
+        connection=client,
+    )
+    monkeypatch.setattr(file_resource, "_download_file", lambda *args, **kwargs: True)
+
+    assert file_resource.download(str(tmpdir.join("file.csv")))
+
+    transfers = client.metrics.snapshot()["transfers"]
+    assert transfers["download"]["transfers"] == 1
+    assert transfers["download"]["bytes"] == 1000
@@ -0,0 +1,40 @@
+import threading
+
+from crux._pagination import PageSizeTuner, prefetch
+
+
+def test_prefetch_is_bounded():
+    produced = []
+    consumed = threading.Event()
+
+    def items():
+        for index in range(10):
+            produced.append(index)
+            yield index
+
+    iterator = prefetch(items(), depth=2)
+    assert next(iterator) == 0
+    consumed.wait(0.2)
+
+    # One item handed out, two queued and one waiting to be queued.
+    assert len(produced) <= 4
+    iterator.close()
+
+
+def test_prefetch_without_depth():
+    assert list(prefetch(iter([1, 2, 3]), depth=0)) == [1, 2, 3]
+
+
+def test_page_size_tuner():
+    tuner = PageSizeTuner(100, max_page_size=1000, target_seconds=1.0)
+
+    # Fast and small pages grow twofold at most.
+    assert tuner.update(items=100, seconds=0.1, size=1000) == 200
+    assert tuner.update(items=200, seconds=0.1, size=2000) == 400
+    # A slow page shrinks to the size expected to take target_seconds.
+    assert tuner.update(items=400, seconds=4.0, size=4000) == 100
+    # A large page shrinks to the size expected to fit in target_bytes.
+    assert tuner.update(items=100, seconds=0.1, size=tuner.target_bytes * 4) == 25
+    # Page size stays in bounds.
+    assert tuner.update(items=25, seconds=100.0, size=100) == 10
+    assert tuner.update(items=0, seconds=100.0, size=100) == 10
@@ -3,7 +3,7 @@ import os
 import pytest
 
 from crux._client import CruxClient
-from crux.models import Permission, Resource
+from crux.models import File, Permission, Resource
 
 
 @pytest.fixture(scope="module")
@@ -133,3 +133,83 @@ def test_update_resource(resource, monkeypatch):
 
     assert resource.name == "test_dataset2"
     assert resource.description == "test_description_2"
+
+
+def test_resource_folder_path_cache(monkeypatch):
+    conn = CruxClient(crux_config=None)
+    calls = []
+
+    def get_folder(self):
+        calls.append(self.id)
+        return "/folder1"
+
+    monkeypatch.setattr(Resource, "_get_folder", get_folder)
+
+    resources = [
+        Resource(
+            raw_model={"resourceId": str(i), "name": "file_{}".format(i), "folderId": "f1"},
+            connection=conn,
+        )
+        for i in range(3)
+    ]
+
+    assert [resource.path for resource in resources] == [
+        "/folder1/file_0",
+        "/folder1/file_1",
+        "/folder1/file_2",
+    ]
+    assert calls == ["0"]
+
+
+def test_resource_set_folder(monkeypatch):
+    conn = CruxClient(crux_config=None)
+    folder = Resource(
+        raw_model={
+            "resourceId": "f2",
+            "name": "folder2",
+            "type": "folder",
+            "folderId": "f1",
+        },
+        connection=conn,
+    )
+    folder._set_folder("/folder1")
+
+    assert conn.folder_path_cache.get("f1") == "/folder1"
+    assert conn.folder_path_cache.get("f2") == "/folder1/folder2"
+
+    monkeypatch.setattr(conn, "api_call", lambda *args, **kwargs: True)
+    folder.delete()
+
+    assert len(conn.folder_path_cache) == 0
+
+
+def test_resource_to_dict_view():
+    resource = Resource(raw_model={"name": "test_file", "tags": ["tags"]})
+    view = resource.to_dict(copy=False)
+
+    assert view == resource.raw_model
+    assert view["tags"] == ["tags"]
+    with pytest.raises(TypeError):
+        view["name"] = "other"
+    with pytest.raises(AttributeError):
+        view["tags"].append("other")
+
+    copied = view.copy()
+    copied["tags"].append("other")
+    assert resource.tags == ["tags"]
+    assert resource.to_dict() == view
+
+
+def test_resource_cast():
+    resource = Resource(raw_model={"name": "test_file", "type": "file"})
+    resource._folder = "/folder1"
+
+    file_resource = resource.cast(File)
+
+    assert isinstance(file_resource, File)
+    assert file_resource.raw_model is resource.raw_model
+    assert file_resource.path == "/folder1/test_file"
+    assert isinstance(resource.cast(), File)
+    assert file_resource.cast(File) is file_resource
+    with pytest.raises(TypeError):
+        Resource(raw_model={"type": "table"}).cast()
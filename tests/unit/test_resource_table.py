@@ -0,0 +1,124 @@
+import os
+
+import pytest
+
+from crux._client import CruxClient
+from crux.models import File, Folder, ResourceTable
+
+
+@pytest.fixture
+def table():
+    os.environ["CRUX_API_KEY"] = "1235"
+    conn = CruxClient(crux_config=None)
+    table = ResourceTable(connection=conn)
+    for index, (media_type, size) in enumerate(
+        [("text/csv", 30), ("application/json", 10), ("text/csv", 20)]
+    ):
+        table.append(
+            {
+                "resourceId": "r{}".format(index),
+                "name": "file_{}".format(index),
+                "type": "file",
+                "datasetId": "12345",
+                "folderId": "f1",
+                "mediaType": media_type,
+                "size": size,
+                "createdAt": "2020-01-0{}T00:00:00Z".format(index + 1),
+                "labels": [{"labelKey": "index", "labelValue": str(index)}],
+                "tags": ["tag"],
+            },
+            folder="/folder1",
+        )
+    table.append(
+        {"resourceId": "r3", "name": "sub", "type": "folder", "datasetId": "12345"},
+        folder="/folder1",
+    )
+    return table
+
+
+def test_resource_table_rows(table):
+    assert len(table) == 4
+    assert list(table.column("size")) == [30, 10, 20, 0]
+    assert table.column("labels")[0] == {"index": "0"}
+
+    row = table[0]
+    assert isinstance(row, File)
+    assert row.path == "/folder1/file_0"
+    assert row.tags == ["tag"]
+    assert row.labels == {"index": "0"}
+    assert isinstance(table[3], Folder)
+    assert table.connection.folder_path_cache.get("r3") == "/folder1/sub"
+
+
+def test_resource_table_operations(table):
+    files = table.where("mediaType", lambda media_type: media_type == "text/csv")
+    assert list(files.column("id")) == ["r0", "r2"]
+
+    assert list(table.sort("size", reverse=True).column("id")) == ["r0", "r2", "r1", "r3"]
+    assert list(table.sort("mediaType").column("id")) == ["r3", "r1", "r0", "r2"]
+
+    groups = table.group_by("mediaType")
+    assert {media_type: len(rows) for media_type, rows in groups.items()} == {
+        "text/csv": 2,
+        "application/json": 1,
+        None: 1,
+    }
+
+    assert list(table.filter([True, False, False, True]).column("id")) == ["r0", "r3"]
+    assert list(table[1:3].column("id")) == ["r1", "r2"]
+
+    with pytest.raises(ValueError):
+        table.filter([True])
+    with pytest.raises(TypeError):
+        table.sort("labels")
+
+
+def test_resource_table_to_numpy(table):
+    numpy = pytest.importorskip("numpy")
+
+    sizes = table.to_numpy("size")
+    assert sizes.dtype == numpy.int64
+    assert list(table.filter(sizes >= 20).column("id")) == ["r0", "r2"]
+
+    created_at = table.to_numpy("createdAt")
+    assert created_at[1] == numpy.datetime64("2020-01-02T00:00:00")
+    assert numpy.isnat(created_at[3])
+    assert table.to_numpy("id").tolist() == ["r0", "r1", "r2", "r3"]
+
+
+def test_resource_table_row_without_type(table):
+    table.append({"resourceId": "r4", "name": "other", "datasetId": "12345"})
+
+    row = table[4]
+    assert not isinstance(row, (File, Folder))
+    assert row.id == "r4"
+    assert list(table.sort("mediaType", reverse=True).column("id")) == [
+        "r0",
+        "r2",
+        "r1",
+        "r3",
+        "r4",
+    ]
+
+
+def test_resource_table_numpy_operations(table):
+    numpy = pytest.importorskip("numpy")
+
+    assert list(table.sort("size").column("id")) == ["r3", "r1", "r2", "r0"]
+    assert list(table.sort("size", reverse=True).column("id")) == [
+        "r0",
+        "r2",
+        "r1",
+        "r3",
+    ]
+    assert list(table.take(numpy.array([2, 0])).column("size")) == [20, 30]
+
+    table.append(
+        {"resourceId": "r4", "type": "file", "createdAt": "2020-01-05T02:30:00+02:30"}
+    )
+    table.append(
+        {"resourceId": "r5", "type": "file", "createdAt": "2020-01-05T00:00:00-0100"}
+    )
+    created_at = table.to_numpy("createdAt")
+    assert created_at[4] == numpy.datetime64("2020-01-05T00:00:00")
+    assert created_at[5] == numpy.datetime64("2020-01-05T01:00:00")
@@ -0,0 +1,129 @@
+import copy
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from crux._client import CruxClient
+from crux._config import CruxConfig
+from crux._retry import RetryBudget, RetryPolicy
+from crux.exceptions import CruxAPIError
+
+
+class UnavailableHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.hits += 1
+        body = b'{"statusCode": 503, "message": "Service Unavailable"}'
+        self.send_response(503)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        # The single threaded server doesn't wait for kept alive connections.
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = HTTPServer(("127.0.0.1", 0), UnavailableHandler)
+    server.hits = 0
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, reserve=2)
+
+    assert budget.withdraw()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+    for _ in range(10):
+        budget.deposit()
+    assert budget.available == 2
+
+    with pytest.raises(ValueError):
+        RetryBudget(ratio=-1)
+
+
+def test_retry_policy_overrides():
+    policy = RetryPolicy(total=5, overrides={r"/uploads/": {"total": 0}})
+    policy.override(r"/datasets/", backoff_factor=2)
+
+    assert policy.settings("/plat-api/uploads/1") == (0, 0.3)
+    assert policy.settings("/plat-api/datasets/1") == (5, 2)
+    assert not policy.allow_retry("/plat-api/uploads/1")
+    assert policy.allow_retry("/plat-api/datasets/1", attempt=5)
+    assert not policy.allow_retry("/plat-api/datasets/1", attempt=6)
+    assert 0 <= policy.backoff("/plat-api/datasets/1", attempt=3) <= 8
+    assert policy.backoff("/plat-api/uploads/1") <= 0.3
+
+
+def test_retry_policy_budget_bounds_retries(server):
+    url = "http://127.0.0.1:{}/".format(server.server_address[1])
+    policy = RetryPolicy(total=3, backoff_factor=0, budget_ratio=0.5, budget_reserve=2)
+    session = policy.get_session()
+
+    # One request, then two retries from the reserve, and the budget is spent.
+    assert session.get(url).status_code == 503
+    assert server.hits == 3
+    assert policy.stats() == {"requests": 1, "retries": 2, "denied": 1, "available": 0}
+
+    assert session.get(url).status_code == 503
+    assert server.hits == 4
+    assert policy.stats()["denied"] == 2
+
+    assert copy.deepcopy(session).adapters["http://"].max_retries.policy is not policy
+
+
+def test_api_call_with_spent_retry_budget(server, monkeypatch):
+    monkeypatch.setenv("CRUX_API_KEY", "1235")
+    policy = RetryPolicy(backoff_factor=0, budget_ratio=0, budget_reserve=1)
+    config = CruxConfig(
+        api_host="http://127.0.0.1:{}".format(server.server_address[1]),
+        retry_policy=policy,
+    )
+
+    with pytest.raises(CruxAPIError):
+        CruxClient(crux_config=config).api_call("GET", ["datasets", "1"])
+    assert server.hits == 2
+    assert policy.stats()["denied"] == 1
+
+
+def test_config_shares_retry_policy(monkeypatch):
+    monkeypatch.setenv("CRUX_API_KEY", "1235")
+    policy = RetryPolicy()
+    config = CruxConfig(retry_policy=policy)
+
+    assert config.retry_policy is policy
+    assert config.session.adapters["https://"].max_retries.policy is policy
+    assert config.transport.session.adapters["https://"].max_retries.policy is policy
+    assert 429 not in config.session.adapters["https://"].max_retries.status_forcelist
+
+    transfer_retries = config.transport.session.adapters["https://"].max_retries
+    assert 429 in transfer_retries.status_forcelist
+    assert transfer_retries.allowed_methods is False
+
+    adaptive_config = CruxConfig(retry_policy=policy, adaptive_concurrency=True)
+    retries = adaptive_config.session.adapters["https://"].max_retries
+    status_forcelist = retries.status_forcelist
+    assert 429 not in status_forcelist and 503 not in status_forcelist
+    assert 500 in status_forcelist
@@ -0,0 +1,146 @@
+import io
+import os
+import time
+
+import pytest
+
+from crux import RetryPolicy
+from crux.testing import FakeAPIError, FakeCruxServer, FakeStore
+
+
+@pytest.fixture
+def server():
+    with FakeCruxServer() as server:
+        yield server
+
+
+def test_store_lists_and_searches():
+    store = FakeStore()
+    dataset_id = store.create_dataset("dataset")["datasetId"]
+    store.create_resource(dataset_id, {"name": "folder", "type": "folder"})
+    ids = [
+        store.create_resource(
+            dataset_id, {"name": "{}.csv".format(index), "folder": "/folder"}
+        )["resourceId"]
+        for index in range(5)
+    ]
+    for index, resource_id in enumerate(ids):
+        store.set_labels(resource_id, {"index": str(index)})
+
+    listed = store.list_resources(dataset_id, folder="/folder", offset=1, limit=2)
+    assert [resource["name"] for resource in listed] == ["1.csv", "2.csv"]
+    assert store.list_resources(dataset_id, include_folders=True)[0]["name"] == "folder"
+    assert store.list_resources(dataset_id) == []
+
+    predicates = [
+        {
+            "op": "or",
+            "in": [
+                {"op": "lt", "key": "index", "val": "2"},
+                {"op": "eq", "key": "index", "val": "4"},
+            ],
+        }
+    ]
+    page = store.search(dataset_id, predicates, limit=2)
+    assert [resource["resourceId"] for resource in page] == ids[:2]
+    page = store.search(dataset_id, predicates, limit=2, after=page[-1]["resourceId"])
+    assert [resource["resourceId"] for resource in page] == [ids[4]]
+
+    with pytest.raises(FakeAPIError) as err:
+        store.create_resource(dataset_id, {"name": "0.csv", "folder": "/folder"})
+    assert err.value.status_code == 409
+
+    store.delete_resource(store.folder_id(dataset_id, "/folder"))
+    assert not store.resources
+    assert store.search(dataset_id, predicates) == []
+
+
+def test_transfers_round_trip(server):
+    conn = server.connection()
+    dataset = conn.create_dataset("dataset")
+    content = os.urandom(1024 * 1024 + 17)
+
+    uploaded = dataset.upload_file(
+        io.BytesIO(content), "/data.bin", media_type="application/octet-stream"
+    )
+    assert uploaded.size == len(content)
+    assert server.store.contents[uploaded.id] == content
+
+    for kwargs in ({}, {"connections": 3}, {"only_use_crux_domains": True}):
+        downloaded = io.BytesIO()
+        dataset.get_file("/data.bin").download(
+            downloaded, chunk_size=256 * 1024, **kwargs
+        )
+        assert downloaded.getvalue() == content
+
+    counts = server.counts()
+    assert counts["POST /resources/{id}/upload-session-complete"] == 1
+    assert counts["GET /storage/{id}"] > 3
+
+
+def test_signed_url_expiry(server):
+    server.signed_url_ttl = 0.2
+    conn = server.connection()
+    dataset = conn.create_dataset("dataset")
+    file_resource = dataset.create_file("/file.csv")
+    server.store.set_content(file_resource.id, b"crux")
+    file_resource.refresh()
+
+    assert b"".join(file_resource.iter_content()) == b"crux"
+    time.sleep(0.3)
+    # The cached signed URL has expired, so a new one is fetched.
+    assert b"".join(file_resource.iter_content()) == b"crux"
+    assert server.counts()["POST /resources/{id}/content-url"] == 2
+
+
+def test_metadata_cache_revalidation(server):
+    conn = server.connection(metadata_cache_size=10)
+    dataset_id = conn.create_dataset("dataset").id
+    cache = conn.api_client.metadata_cache
+
+    assert conn.get_dataset(dataset_id).name == "dataset"
+    assert conn.get_dataset(dataset_id).name == "dataset"
+    assert cache.stats()["revalidations"] == 1
+
+    server.store.datasets[dataset_id]["name"] = "renamed"
+    assert conn.get_dataset(dataset_id).name == "renamed"
+    assert server.counts()["GET /datasets/{id}"] == 3
+
+
+def test_metadata_cache_label_writes(server):
+    conn = server.connection(metadata_cache_size=10, metadata_cache_ttl=60)
+    dataset = conn.create_dataset("dataset")
+    file_resource = dataset.create_file("/file.csv")
+
+    assert conn.get_resource(file_resource.id).labels == {}
+    assert [resource.labels for resource in dataset.list_resources()] == [{}]
+
+    file_resource.add_label("key", "value")
+    assert conn.get_resource(file_resource.id).labels == {"key": "value"}
+    assert [resource.labels for resource in dataset.list_resources()] == [
+        {"key": "value"}
+    ]
+
+    conn.get_resource(file_resource.id).delete()
+    assert dataset.list_resources() == []
+    assert server.counts()["GET /datasets/{id}/resources"] == 3
+
+
+def test_injected_latency_bandwidth_and_errors():
+    with FakeCruxServer(error_rate=0.3, seed=7, bandwidth=1024 * 1024) as server:
+        conn = server.connection(retry_policy=RetryPolicy(backoff_factor=0))
+        dataset = conn.create_dataset("dataset")
+        for index in range(10):
+            dataset.create_file("/{}.csv".format(index))
+        assert len(dataset.list_files(limit=20)) == 10
+        # The failed requests have been retried.
+        assert server.counts()["POST /datasets/{id}/resources"] > 10
+
+        server.error_rate = 0
+        server.latency = 0.05
+        file_resource = dataset.get_file("/0.csv")
+        server.store.set_content(file_resource.id, b"x" * 262144)
+        started = time.time()
+        assert len(b"".join(conn.get_resource(file_resource.id).iter_content())) == 262144
+        # Three requests with latency, and a quarter of a second of transfer.
+        assert time.time() - started >= 0.3
@@ -0,0 +1,124 @@
+import json
+import os
+
+import pytest
+import requests
+from requests.models import Response
+
+from crux import tracing
+from crux._client import CruxClient
+from crux.models import Dataset
+
+
+RESOURCE = {
+    "resourceId": "67890",
+    "datasetId": "12345",
+    "name": "file.csv",
+    "type": "file",
+    "folderId": "f1",
+    "tags": [],
+    "size": 4,
+}
+
+
+@pytest.fixture
+def exporter(tmpdir):
+    exporter = tracing.FileExporter(str(tmpdir.join("spans.jsonl")))
+    tracing.set_tracer(exporter)
+    yield exporter
+    tracing.set_tracer(None)
+    exporter.close()
+
+
+def read_spans(exporter):
+    with open(exporter.path) as spans_file:
+        return [json.loads(line) for line in spans_file]
+
+
+def upload_request(self, method, url, headers=None, data=None, **kwargs):
+    response = Response()
+    response.status_code = 200
+    response.url = url
+    if url.endswith("/upload-session-start"):
+        response._content = json.dumps(
+            {
+                "sessionId": "s1",
+                "signedURL": {
+                    "url": "https://storage/upload",
+                    "headers": {"content-type": "text/csv"},
+                },
+            }
+        ).encode("utf-8")
+    elif url == "https://storage/upload":
+        response.headers["location"] = "https://storage/upload?id=1"
+        response._content = b""
+    elif url.startswith("https://storage/upload?"):
+        response._content = b"{}"
+    else:
+        response._content = json.dumps(RESOURCE).encode("utf-8")
+    return response
+
+
+def test_spans_nest_through_upload_files(exporter, monkeypatch, tmpdir):
+    os.environ["CRUX_API_KEY"] = "1235"
+    dataset = Dataset(
+        raw_model={"datasetId": "12345", "name": "dataset"},
+        connection=CruxClient(crux_config=None),
+    )
+    tmpdir.mkdir("upload").join("file.csv").write("crux")
+    monkeypatch.setattr(requests.sessions.Session, "request", upload_request)
+
+    dataset.upload_files(str(tmpdir.join("upload")), "/", only_use_crux_domains=False)
+
+    spans = read_spans(exporter)
+    by_name = {}
+    for span in spans:
+        by_name.setdefault(span["name"], []).append(span)
+    by_id = {span["span_id"]: span for span in spans}
+
+    signed_upload = by_name["crux.file.upload_signed_url"][0]
+    assert signed_upload["attributes"] == {"resource_id": "67890", "bytes": 4}
+
+    chain = [signed_upload]
+    while chain[-1]["parent_id"] is not None:
+        chain.append(by_id[chain[-1]["parent_id"]])
+    assert [span["name"] for span in chain] == [
+        "crux.file.upload_signed_url",
+        "crux.file.upload",
+        "crux.dataset.upload_file",
+        "crux.dataset.upload_files",
+    ]
+    assert len(set(span["trace_id"] for span in spans)) == 1
+
+    api_calls = [by_id[span["span_id"]] for span in by_name["crux.api_call"]]
+    assert {
+        span["attributes"]["endpoint"]
+        for span in api_calls
+        if span["parent_id"] == signed_upload["span_id"]
+    } == {"/resources/{id}/upload-session-start", "/resources/{id}/upload-session-complete"}
+    assert api_calls[0]["attributes"]["status"] == 200
+    assert api_calls[0]["attributes"]["retries"] == 0
+
+
+def test_span_records_error(exporter):
+    with pytest.raises(ValueError):
+        with tracing.span("outer", job="nightly"):
+            with tracing.span("inner") as inner:
+                inner.increment("signed_url_refreshes")
+                raise ValueError("failed")
+
+    inner, outer = read_spans(exporter)
+    assert inner["parent_id"] == outer["span_id"]
+    assert inner["attributes"] == {"signed_url_refreshes": 1}
+    assert outer["attributes"] == {"job": "nightly"}
+    assert inner["error"] == outer["error"] == "ValueError: failed"
+    assert outer["duration"] >= inner["duration"]
+
+
+def test_no_tracer():
+    assert tracing.get_tracer() is None
+    with tracing.span("ignored") as span:
+        assert span is None
+        assert tracing.current_span() is None
+        tracing.set_attributes(ignored=True)
+    assert tracing.bind(test_no_tracer) is test_no_tracer
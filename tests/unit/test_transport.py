@@ -0,0 +1,66 @@
+import copy
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from crux._transport import Transport
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "4")
+        self.end_headers()
+        self.wfile.write(b"crux")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = HTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield "http://127.0.0.1:{}/".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def test_transport_reuses_connections(server_url):
+    transport = Transport(pool_maxsize=2)
+    for _ in range(3):
+        response = transport.session.get(server_url)
+        assert response.content == b"crux"
+
+    assert transport.stats() == {
+        "requests": 3,
+        "connections": 1,
+        "hits": 2,
+        "misses": 1,
+    }
+    transport.close()
+
+
+def test_signed_session_shares_pools():
+    transport = Transport()
+    signed_session = transport.signed_session({"x-goog-resumable": "start"})
+
+    assert signed_session.headers == {"x-goog-resumable": "start"}
+    assert signed_session.adapters["https://"] is transport.session.adapters["https://"]
+
+
+def test_transport_copy():
+    transport = Transport(proxies={"https": "http://proxy:3128"})
+    transport_copy = copy.deepcopy(transport)
+
+    assert transport_copy.proxies == {"https": "http://proxy:3128"}
+    assert transport_copy.session is not transport.session